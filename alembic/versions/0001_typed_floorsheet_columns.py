@@ -0,0 +1,88 @@
+"""typed floorsheet trade_date/trade_time and composite indexes
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00.000000
+
+Databases created by ``Base.metadata.create_all`` before this revision store
+``floorsheet.trade_date`` and ``trade_time`` as VARCHAR(50). This rebuilds the table
+with a DATE column, an integer microseconds-since-midnight time column and the
+(trade_date, script_id, trade_time) / (trade_date, buyer_broker_id) indexes.
+Databases already created from the current models are left untouched.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_COPIED_COLUMNS = (
+    "id, contract_id, script_id, buyer_broker_id, seller_broker_id, contract_quantity, "
+    "contract_rate, contract_amount, trade_book_id"
+)
+
+# 'HH:MM:SS.ffffff' -> microseconds since midnight; a missing fraction counts as zero.
+_TIME_TO_MICROS = (
+    "((CAST(substr(trade_time, 1, 2) AS INTEGER) * 60 + CAST(substr(trade_time, 4, 2) AS INTEGER)) * 60"
+    " + CAST(substr(trade_time, 7, 2) AS INTEGER)) * 1000000"
+    " + CAST(substr(substr(trade_time, 10) || '000000', 1, 6) AS INTEGER)"
+)
+_MICROS_TO_TIME = (
+    "printf('%02d:%02d:%02d.%06d', trade_time / 3600000000, (trade_time / 60000000) % 60,"
+    " (trade_time / 1000000) % 60, trade_time % 1000000)"
+)
+
+
+def _floorsheet_table(name: str, trade_date_type, trade_time_type) -> None:
+    op.create_table(
+        name,
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("contract_id", sa.Integer(), nullable=False),
+        sa.Column("script_id", sa.Integer(), sa.ForeignKey("script.id"), nullable=False),
+        sa.Column("buyer_broker_id", sa.Integer(), sa.ForeignKey("broker.id"), nullable=True),
+        sa.Column("seller_broker_id", sa.Integer(), sa.ForeignKey("broker.id"), nullable=True),
+        sa.Column("contract_quantity", sa.Integer(), nullable=False),
+        sa.Column("contract_rate", sa.Float(), nullable=False),
+        sa.Column("contract_amount", sa.Float(), nullable=False),
+        sa.Column("trade_book_id", sa.Integer(), nullable=False),
+        sa.Column("trade_date", trade_date_type, nullable=False),
+        sa.Column("trade_time", trade_time_type, nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("contract_id", "trade_date", name="uq_contract_trade_date"),
+    )
+
+
+def _rebuild(trade_date_type, trade_time_type, trade_time_expr: str) -> None:
+    _floorsheet_table("_floorsheet_new", trade_date_type, trade_time_type)
+    op.execute(
+        f"INSERT INTO _floorsheet_new ({_COPIED_COLUMNS}, trade_date, trade_time, created_at) "
+        f"SELECT {_COPIED_COLUMNS}, trade_date, {trade_time_expr}, created_at FROM floorsheet"
+    )
+    op.drop_table("floorsheet")
+    op.rename_table("_floorsheet_new", "floorsheet")
+    op.create_index("ix_floorsheet_contract_id", "floorsheet", ["contract_id"])
+    op.create_index("ix_floorsheet_script_id", "floorsheet", ["script_id"])
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "floorsheet" not in inspector.get_table_names():
+        return
+    if "ix_floorsheet_date_script_time" in {index["name"] for index in inspector.get_indexes("floorsheet")}:
+        return
+
+    _rebuild(sa.Date(), sa.Integer(), _TIME_TO_MICROS)
+    op.create_index("ix_floorsheet_date_script_time", "floorsheet", ["trade_date", "script_id", "trade_time"])
+    op.create_index("ix_floorsheet_date_buyer", "floorsheet", ["trade_date", "buyer_broker_id"])
+
+
+def downgrade() -> None:
+    _rebuild(sa.String(50), sa.String(50), _MICROS_TO_TIME)
+    op.create_index("ix_floorsheet_trade_date", "floorsheet", ["trade_date"])
@@ -0,0 +1,64 @@
+"""floorsheet_broker_daily aggregates
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00.000000
+
+Per-(trade_date, script, broker, side) totals maintained by the floorsheet fetcher.
+The table is created if the application has not already created it, then filled
+from the existing floorsheet history when empty.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_BACKFILL = """
+INSERT INTO floorsheet_broker_daily (
+    trade_date, script_id, broker_id, side, quantity, amount, trades, min_rate, max_rate, first_time, last_time
+)
+SELECT trade_date, script_id, {column}, '{side}', SUM(contract_quantity), SUM(contract_amount), COUNT(*),
+       MIN(contract_rate), MAX(contract_rate), MIN(trade_time), MAX(trade_time)
+FROM floorsheet
+WHERE {column} IS NOT NULL
+GROUP BY trade_date, script_id, {column}
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if "floorsheet_broker_daily" not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            "floorsheet_broker_daily",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("trade_date", sa.Date(), nullable=False),
+            sa.Column("script_id", sa.Integer(), sa.ForeignKey("script.id"), nullable=False),
+            sa.Column("broker_id", sa.Integer(), sa.ForeignKey("broker.id"), nullable=False),
+            sa.Column("side", sa.String(4), nullable=False),
+            sa.Column("quantity", sa.Integer(), nullable=False),
+            sa.Column("amount", sa.Float(), nullable=False),
+            sa.Column("trades", sa.Integer(), nullable=False),
+            sa.Column("min_rate", sa.Float(), nullable=False),
+            sa.Column("max_rate", sa.Float(), nullable=False),
+            sa.Column("first_time", sa.Integer(), nullable=False),
+            sa.Column("last_time", sa.Integer(), nullable=False),
+            sa.UniqueConstraint("trade_date", "script_id", "broker_id", "side", name="uq_broker_daily_key"),
+        )
+        op.create_index("ix_broker_daily_date_broker", "floorsheet_broker_daily", ["trade_date", "broker_id"])
+
+    if bind.execute(sa.text("SELECT 1 FROM floorsheet_broker_daily LIMIT 1")).first() is None:
+        op.execute(_BACKFILL.format(column="buyer_broker_id", side="buy"))
+        op.execute(_BACKFILL.format(column="seller_broker_id", side="sell"))
+
+
+def downgrade() -> None:
+    op.drop_index("ix_broker_daily_date_broker", table_name="floorsheet_broker_daily")
+    op.drop_table("floorsheet_broker_daily")
@@ -0,0 +1,37 @@
+"""floorsheet_data_version counters
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00.000000
+
+Per-(trade_date, script) counter bumped by ingestion; the floorsheet API derives
+ETag and Last-Modified from it. Dates ingested before this revision start at
+version 0 with no Last-Modified until they are written again.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if "floorsheet_data_version" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "floorsheet_data_version",
+        sa.Column("trade_date", sa.Date(), primary_key=True),
+        sa.Column("script_id", sa.Integer(), sa.ForeignKey("script.id"), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("floorsheet_data_version")
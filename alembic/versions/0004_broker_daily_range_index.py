@@ -0,0 +1,40 @@
+"""covering index for broker range analytics
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00.000000
+
+Replaces ix_broker_daily_date_broker with an index that also carries the script,
+side and totals, so net-position queries over a date range are answered from the
+index alone.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COVER_COLUMNS = ["trade_date", "broker_id", "script_id", "side", "quantity", "amount", "trades"]
+
+
+def _index_names() -> set[str]:
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("floorsheet_broker_daily")}
+
+
+def upgrade() -> None:
+    names = _index_names()
+    if "ix_broker_daily_date_broker" in names:
+        op.drop_index("ix_broker_daily_date_broker", table_name="floorsheet_broker_daily")
+    if "ix_broker_daily_range_cover" not in names:
+        op.create_index("ix_broker_daily_range_cover", "floorsheet_broker_daily", _COVER_COLUMNS)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_broker_daily_range_cover", table_name="floorsheet_broker_daily")
+    op.create_index("ix_broker_daily_date_broker", "floorsheet_broker_daily", ["trade_date", "broker_id"])
@@ -0,0 +1,80 @@
+"""floorsheet_bar intraday OHLCV bars
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00.000000
+
+1, 5 and 15 minute bars per script maintained by the floorsheet fetcher. The table
+is created if the application has not already created it, then filled from the
+existing floorsheet history when empty.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_INTERVAL_MINUTES = (1, 5, 15)
+
+_BACKFILL = """
+INSERT INTO floorsheet_bar (
+    trade_date, script_id, interval_minutes, bucket, open, high, low, close, volume, amount, trades,
+    open_time, open_contract_id, close_time, close_contract_id
+)
+SELECT trade_date, script_id, {minutes}, bucket,
+       MAX(CASE WHEN from_open = 1 THEN contract_rate END), MAX(contract_rate), MIN(contract_rate),
+       MAX(CASE WHEN from_close = 1 THEN contract_rate END), SUM(contract_quantity), SUM(contract_amount), COUNT(*),
+       MAX(CASE WHEN from_open = 1 THEN trade_time END), MAX(CASE WHEN from_open = 1 THEN contract_id END),
+       MAX(CASE WHEN from_close = 1 THEN trade_time END), MAX(CASE WHEN from_close = 1 THEN contract_id END)
+FROM (
+    SELECT trade_date, script_id, trade_time / {width} * {width} AS bucket, trade_time, contract_id,
+           contract_rate, contract_quantity, contract_amount,
+           ROW_NUMBER() OVER (
+               PARTITION BY trade_date, script_id, trade_time / {width} ORDER BY trade_time, contract_id
+           ) AS from_open,
+           ROW_NUMBER() OVER (
+               PARTITION BY trade_date, script_id, trade_time / {width} ORDER BY trade_time DESC, contract_id DESC
+           ) AS from_close
+    FROM floorsheet
+)
+GROUP BY trade_date, script_id, bucket
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if "floorsheet_bar" not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            "floorsheet_bar",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("script_id", sa.Integer(), sa.ForeignKey("script.id"), nullable=False),
+            sa.Column("interval_minutes", sa.Integer(), nullable=False),
+            sa.Column("trade_date", sa.Date(), nullable=False),
+            sa.Column("bucket", sa.Integer(), nullable=False),
+            sa.Column("open", sa.Float(), nullable=False),
+            sa.Column("high", sa.Float(), nullable=False),
+            sa.Column("low", sa.Float(), nullable=False),
+            sa.Column("close", sa.Float(), nullable=False),
+            sa.Column("volume", sa.Integer(), nullable=False),
+            sa.Column("amount", sa.Float(), nullable=False),
+            sa.Column("trades", sa.Integer(), nullable=False),
+            sa.Column("open_time", sa.Integer(), nullable=False),
+            sa.Column("open_contract_id", sa.Integer(), nullable=False),
+            sa.Column("close_time", sa.Integer(), nullable=False),
+            sa.Column("close_contract_id", sa.Integer(), nullable=False),
+            sa.UniqueConstraint("script_id", "interval_minutes", "trade_date", "bucket", name="uq_floorsheet_bar_key"),
+        )
+
+    if bind.execute(sa.text("SELECT 1 FROM floorsheet_bar LIMIT 1")).first() is None:
+        for minutes in _INTERVAL_MINUTES:
+            op.execute(_BACKFILL.format(minutes=minutes, width=minutes * 60_000_000))
+
+
+def downgrade() -> None:
+    op.drop_table("floorsheet_bar")
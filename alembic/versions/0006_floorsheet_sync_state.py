@@ -0,0 +1,37 @@
+"""floorsheet_sync_state watermarks
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00.000000
+
+Per-(trade_date, script) contract id up to which a floorsheet fetch pass ran to
+completion; incremental syncs only fetch contracts above it. Dates ingested before
+this revision have no watermark, so their next incremental sync is a full pass.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if "floorsheet_sync_state" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "floorsheet_sync_state",
+        sa.Column("trade_date", sa.Date(), primary_key=True),
+        sa.Column("script_id", sa.Integer(), sa.ForeignKey("script.id"), primary_key=True),
+        sa.Column("synced_contract_id", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("floorsheet_sync_state")
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from fastapi import Request
 
+from src.core.nepse import NEPSE
 from src.modules.market_data import FloorsheetQueryService
 from src.modules.portfolio import PortfolioQueryService
 
@@ -13,3 +14,15 @@ def get_portfolio_service() -> PortfolioQueryService:
 async def get_floorsheet_service(request: Request) -> FloorsheetQueryService:
     return FloorsheetQueryService(request.state.db)
 
+
+def create_nepse_client() -> NEPSE:
+    """The app-scoped NEPSE client, shared by the scheduler jobs, bot handlers and webhooks."""
+    return NEPSE()
+
+
+def get_nepse_client(request: Request) -> NEPSE:
+    return request.app.state.nepse
+
+
+async def close_nepse_client(nepse: NEPSE) -> None:
+    await nepse.aclose()
@@ -6,14 +6,17 @@ from http import HTTPStatus
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from fastapi import FastAPI, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import RedirectResponse
 
+from src.app.container import close_nepse_client, create_nepse_client, get_nepse_client
 from src.infrastructure.db.session import SessionLocal
 from src.interfaces.http.api.routes.floorsheet import router as floorsheet_api_router
+from src.interfaces.http.api.routes.market import router as market_api_router
 from src.interfaces.http.api.routes.portfolio import router as portfolio_api_router
-from src.modules.market_data import ScriptRefreshService
+from src.modules.market_data import FloorsheetArchiveService, FloorsheetSyncService, ScriptRefreshService
 from src.services import Update, ptb, whatsapp_message_handler, check_trackers
 from src.shared.config import settings
 from src.shared.logging import configure_logging
@@ -21,11 +24,15 @@ from src.shared.logging import configure_logging
 
 configure_logging()
 scheduler = AsyncIOScheduler()
+# Small JSON bodies are not worth the compression overhead.
+_GZIP_MINIMUM_BYTES = 1024
 
 
 def create_api_app() -> FastAPI:
     @asynccontextmanager
-    async def lifespan(_: FastAPI):
+    async def lifespan(app: FastAPI):
+        nepse = create_nepse_client()
+        app.state.nepse = nepse
         tracker_schedule = {
             "trigger": "cron",
             "day_of_week": "0-4",
@@ -42,25 +49,53 @@ def create_api_app() -> FastAPI:
             "max_instances": 1,
             "timezone": "Asia/Kathmandu",
         }
+        floorsheet_sync_schedule = {
+            "trigger": "cron",
+            "day_of_week": "0-4",
+            "hour": "11-15",
+            "minute": "*/5",
+            "max_instances": 1,
+            "timezone": "Asia/Kathmandu",
+        }
+        floorsheet_archive_schedule = {
+            "trigger": "cron",
+            "hour": "17",
+            "minute": "0",
+            "max_instances": 1,
+            "timezone": "Asia/Kathmandu",
+        }
 
         async def refresh_tracked_scripts():
             async with SessionLocal() as db:
-                await ScriptRefreshService(db).refresh_tracked()
+                await ScriptRefreshService(db, nepse).refresh_tracked()
+
+        async def sync_tracked_floorsheets():
+            async with SessionLocal() as db:
+                await FloorsheetSyncService(db, nepse).sync_tracked()
+
+        async def archive_closed_floorsheets():
+            async with SessionLocal() as db:
+                await FloorsheetArchiveService(db).export_closed_dates()
 
         scheduler.add_job(refresh_tracked_scripts, **refresh_script_schedule)
+        scheduler.add_job(sync_tracked_floorsheets, **floorsheet_sync_schedule)
+        scheduler.add_job(archive_closed_floorsheets, **floorsheet_archive_schedule)
         scheduler.start()
         if ptb is None:
             yield
             scheduler.shutdown()
+            await close_nepse_client(nepse)
             return
         if settings.webhook_url:
             await ptb.bot.setWebhook(settings.webhook_url)
+        ptb.bot_data["nepse"] = nepse
         async with ptb:
             await ptb.start()
             ptb.job_queue.run_custom(check_trackers, name="tracker_checker", job_kwargs=tracker_schedule)
             yield
             await ptb.stop()
         scheduler.shutdown()
+        await close_nepse_client(nepse)
 
     app = FastAPI(lifespan=lifespan)
 
@@ -71,8 +106,10 @@ def create_api_app() -> FastAPI:
             response = await call_next(request)
         return response
 
+    app.add_middleware(GZipMiddleware, minimum_size=_GZIP_MINIMUM_BYTES)
     app.include_router(portfolio_api_router)
     app.include_router(floorsheet_api_router)
+    app.include_router(market_api_router)
 
     @app.post("/")
     async def process_update(request: Request):
@@ -88,7 +125,7 @@ def create_api_app() -> FastAPI:
         if request.method == "GET":
             return Response(status_code=HTTPStatus.OK)
         form_data = await request.form()
-        asyncio.create_task(whatsapp_message_handler(dict(form_data)))
+        asyncio.create_task(whatsapp_message_handler(dict(form_data), get_nepse_client(request)))
         return Response(status_code=HTTPStatus.OK)
 
     return app
@@ -106,8 +143,10 @@ def create_web_app() -> FastAPI:
             response = await call_next(request)
         return response
 
+    app.add_middleware(GZipMiddleware, minimum_size=_GZIP_MINIMUM_BYTES)
     app.include_router(portfolio_api_router)
     app.include_router(floorsheet_api_router)
+    app.include_router(market_api_router)
 
     @app.get("/")
     async def root():
@@ -1,5 +1,6 @@
 from .script import get_script_ltp, refresh_script_details, refresh_all_script_details, refresh_script_detail
 from .fetch import fetch_all_script_details, fetch_today_price_page
 from .client import NEPSE
+from .errors import NEPSEAuthenticationError, NEPSEError, NEPSERequestError, NEPSEUnavailableError
 from .meroshare import Meroshare, WaccReportGenerator
 from .tms import TradeBookFetcher
@@ -1,20 +1,107 @@
+import asyncio
+import base64
+import hashlib
 import json
 import logging
+import os
+import time
 from datetime import datetime
+from pathlib import Path
 from typing import Any, Optional
 
 import httpx
-from wasmtime import Instance, Module, Store
+from wasmtime import Engine, Instance, Module, Store, WasmtimeError
 
 from src.config.settings import config
+from src.core.nepse.errors import NEPSEAuthenticationError, NEPSEError, NEPSERequestError
+from src.core.nepse.throttle import AdaptiveRateLimiter, CircuitBreaker, RetryPolicy
+from src.infrastructure.files import RawPayloadStore
 
 logger = logging.getLogger(__name__)
 
 
+# One engine per process: compiled modules are only usable with the engine that built them.
+_WASM_ENGINE = Engine()
+_compiled_modules: dict[str, Module] = {}
+
+_SALT_EXPORTS = ("cdx", "rdx", "bdx", "ndx", "mdx")
+# Salt argument order (0-based indexes into the five salts) for each export above.
+_ACCESS_SALT_ORDERS = ((0, 1, 2, 3, 4), (0, 1, 3, 2, 4), (0, 1, 3, 2, 4), (0, 1, 3, 2, 4), (0, 1, 3, 2, 4))
+_REFRESH_SALT_ORDERS = ((1, 0, 2, 4, 3), (1, 0, 2, 3, 4), (1, 0, 3, 2, 4), (1, 0, 3, 2, 4), (1, 0, 3, 2, 4))
+_SALT_POSITIONS_MAX = 64
+
+# Lifetime assumed when an access token carries no readable ``exp`` claim.
+_TOKEN_TTL_SECONDS = 45.0
+# Tokens are refreshed this long before they expire so in-flight requests never carry a stale one.
+_TOKEN_REFRESH_MARGIN_SECONDS = 5.0
+
+
+def _token_ttl(token: str) -> float:
+    """Seconds until the JWT ``exp`` claim of ``token``, or the default lifetime when unreadable."""
+    try:
+        segment = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+        return float(claims["exp"]) - time.time()
+    except (IndexError, KeyError, TypeError, ValueError):
+        return _TOKEN_TTL_SECONDS
+
+
+FLOORSHEET_PATH = "/api/nots/nepse-data/floorsheet"
+TODAY_PRICE_PATH = "/api/nots/nepse-data/today-price"
+
+# Backfills page through thousands of floorsheet requests, so they get the most patience.
+DEFAULT_RETRY_POLICY = RetryPolicy()
+RETRY_POLICIES = {
+    FLOORSHEET_PATH: RetryPolicy(attempts=5),
+    TODAY_PRICE_PATH: RetryPolicy(attempts=4),
+}
+
+
+def _is_retryable(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+def load_wasm_module(wasm_path: Path) -> Module:
+    """Compile ``wasm_path`` once per process, reusing a serialized build across restarts.
+
+    The native build is stored next to the source as ``<stem>.<sha256>.cwasm``; a changed asset
+    gets a new file name, and a build from another wasmtime version is recompiled and replaced.
+    """
+    source = wasm_path.read_bytes()
+    digest = hashlib.sha256(source).hexdigest()[:16]
+    module = _compiled_modules.get(digest)
+    if module is not None:
+        return module
+
+    cache_path = wasm_path.with_name(f"{wasm_path.stem}.{digest}.cwasm")
+    if cache_path.exists():
+        try:
+            module = Module.deserialize_file(_WASM_ENGINE, str(cache_path))
+        except WasmtimeError:
+            logger.info("Discarding incompatible compiled wasm cache %s", cache_path)
+    if module is None:
+        module = Module(_WASM_ENGINE, source)
+        try:
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(module.serialize())
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            logger.warning("Could not write compiled wasm cache %s", cache_path, exc_info=True)
+    _compiled_modules[digest] = module
+    return module
+
+
 class NEPSE:
     """Centralized NEPSE API client with auth and endpoint helpers."""
 
-    def __init__(self):
+    def __init__(self, landing: Optional[RawPayloadStore] = None):
         self.base_url = "https://www.nepalstock.com"
         self.access_token: Optional[str] = None
         self.refresh_token: Optional[str] = None
@@ -22,6 +109,14 @@ class NEPSE:
         self.original_salt_values: list[int] = []
         self.market_status_id: Optional[int] = None
         self.client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Monotonic deadline after which the access token must be refreshed before use.
+        self._token_refresh_at = 0.0
+        self._auth_lock = asyncio.Lock()
+        # Every HTTP call on this client is paced by one limiter and guarded by one breaker.
+        self.rate_limiter = AdaptiveRateLimiter(config.nepse_max_rps)
+        self.breaker = CircuitBreaker()
+        self.retry_policies = dict(RETRY_POLICIES)
         self.headers = {
             "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:149.0) Gecko/20100101 Firefox/149.0",
             "Accept": "application/json, text/plain, */*",
@@ -37,6 +132,10 @@ class NEPSE:
             "Sec-Fetch-Site": "same-origin",
             "TE": "trailers",
         }
+        # Raw responses are landed when a store is given or NEPSE_LANDING_DIR is set.
+        if landing is None and config.nepse_landing_dir is not None:
+            landing = RawPayloadStore(config.nepse_landing_dir)
+        self.landing = landing
         self._setup_wasm()
 
     async def __aenter__(self) -> "NEPSE":
@@ -52,10 +151,46 @@ class NEPSE:
             self.client = None
 
     async def _ensure_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        # httpx pools are bound to the loop that opened them; a long-lived client outlives
+        # one-shot loops (CLI runs, tests), so it reconnects when the loop changes.
+        if self.client is not None and self._client_loop is not loop:
+            self.client = None
         if self.client is None:
             self.client = httpx.AsyncClient(timeout=30.0, verify=False)
+            self._client_loop = loop
+            # asyncio locks bind to the loop that first waits on them.
+            self._auth_lock = asyncio.Lock()
         return self.client
 
+    async def _send(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Issue one HTTP call through the shared rate limiter and circuit breaker."""
+        delay = self.rate_limiter.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self.breaker.before_call()
+        client = await self._ensure_client()
+        started = time.monotonic()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.abandon_probe()
+            raise
+
+        if response.status_code == 429 or response.status_code >= 500:
+            self.rate_limiter.record_throttled(_retry_after(response))
+        else:
+            self.rate_limiter.record_success(time.monotonic() - started)
+        # A 429 still proves NEPSE is up; only server errors and transport failures count against it.
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
     def _setup_wasm(self) -> None:
         wasm_path = config.data_dir / "css.wasm"
         if not wasm_path.exists():
@@ -68,14 +203,18 @@ class NEPSE:
                 response.raise_for_status()
                 wasm_path.write_bytes(response.content)
 
-        self.wasm_store = Store()
-        self.wasm_module = Module.from_file(self.wasm_store.engine, str(wasm_path))
+        self.wasm_module = load_wasm_module(wasm_path)
+        self.wasm_store = Store(_WASM_ENGINE)
         self.wasm_instance = Instance(self.wasm_store, self.wasm_module, [])
+        # Export lookups cross the FFI boundary, so the callables are resolved once per store.
+        exports = self.wasm_instance.exports(self.wasm_store)
+        self._salt_exports = tuple(exports[name] for name in _SALT_EXPORTS)
+        self._salt_positions: dict[tuple[tuple[int, ...], ...], tuple[int, ...]] = {}
 
     async def get_market_status(self) -> bool:
         try:
-            client = await self._ensure_client()
-            response = await client.get(
+            response = await self._send(
+                "GET",
                 f"{self.base_url}/api/nots/nepse-data/market-open",
                 headers=self.get_auth_headers(),
             )
@@ -83,14 +222,16 @@ class NEPSE:
             data = response.json()
             self.market_status_id = data.get("id")
             return self.market_status_id is not None
+        except NEPSEError:
+            raise
         except Exception as exc:
             logger.exception("Failed to get NEPSE market status")
             return False
 
     async def authenticate(self) -> bool:
         try:
-            client = await self._ensure_client()
-            response = await client.get(
+            response = await self._send(
+                "GET",
                 f"{self.base_url}/api/authenticate/prove",
                 headers=self.headers,
             )
@@ -108,9 +249,13 @@ class NEPSE:
             self.original_salt_values = self.salt_values.copy()
             self.access_token = self._trim_access_token(self.access_token, self.salt_values)
             self.refresh_token = self._trim_refresh_token(self.refresh_token, self.salt_values)
+            self._mark_token_issued()
             await self.get_market_status()
             logger.info("Authenticated with NEPSE API")
             return bool(self.access_token)
+        except NEPSEError:
+            # An open circuit must reach the caller as-is, not look like bad credentials.
+            raise
         except Exception as exc:
             logger.exception("NEPSE authentication failed")
             return False
@@ -121,9 +266,9 @@ class NEPSE:
 
         try:
             logger.info("Refreshing NEPSE access token")
-            client = await self._ensure_client()
             headers = {**self.headers, "Authorization": f"Salter {self.refresh_token}"}
-            response = await client.post(
+            response = await self._send(
+                "POST",
                 f"{self.base_url}/api/authenticate/refresh-token",
                 headers=headers,
             )
@@ -140,15 +285,37 @@ class NEPSE:
             ]
             self.access_token = self._trim_access_token(self.access_token, self.salt_values)
             self.refresh_token = self._trim_refresh_token(self.refresh_token, self.salt_values)
+            self._mark_token_issued()
             return bool(self.access_token)
+        except NEPSEError:
+            raise
         except Exception as exc:
             logger.exception("NEPSE token refresh failed")
             return await self.authenticate()
 
-    async def _ensure_authenticated(self) -> bool:
-        if self.access_token:
+    def _mark_token_issued(self) -> None:
+        ttl = _token_ttl(self.access_token) if self.access_token else 0.0
+        self._token_refresh_at = time.monotonic() + ttl - _TOKEN_REFRESH_MARGIN_SECONDS
+
+    def _token_is_fresh(self) -> bool:
+        return bool(self.access_token) and time.monotonic() < self._token_refresh_at
+
+    async def ensure_authenticated(self, rejected_token: Optional[str] = None) -> bool:
+        """Make sure a usable access token is set, refreshing at most once for all concurrent callers.
+
+        ``rejected_token`` is the token a request just got a 401 for; it forces a refresh unless
+        another caller has already replaced it.
+        """
+        if self._token_is_fresh() and self.access_token != rejected_token:
             return True
-        return await self.authenticate()
+        await self._ensure_client()
+        async with self._auth_lock:
+            # Whoever held the lock before us may have refreshed already.
+            if self._token_is_fresh() and self.access_token != rejected_token:
+                return True
+            if not self.access_token:
+                return await self.authenticate()
+            return await self.refresh_access_token()
 
     async def _post_authorized(
         self,
@@ -158,39 +325,78 @@ class NEPSE:
         payload: Optional[dict[str, Any]] = None,
         referer_path: str = "/today-price",
     ) -> httpx.Response:
-        client = await self._ensure_client()
-        if not await self._ensure_authenticated():
-            raise RuntimeError("NEPSE authentication failed")
-
-        headers = {
-            **self.get_auth_headers(),
-            "Referer": f"{self.base_url}{referer_path}",
-        }
-        body = json.dumps(payload or {"id": self.calculate_request_id()})
-        response = await client.post(
-            f"{self.base_url}{path}",
-            params=params,
-            headers=headers,
-            content=body,
-        )
-
-        if response.status_code == 401 and await self.refresh_access_token():
-            logger.warning("NEPSE request returned 401 for %s, retrying after token refresh", path)
+        """
+        POST to ``path``, retrying timeouts, connection errors, 429s and 5xx under the endpoint's
+        RetryPolicy with jittered backoff. Every attempt carries a fresh request id; a 401 refreshes
+        the token once and is replayed immediately.
+        Raises NEPSERequestError when attempts run out or the error is not retryable, and
+        NEPSEUnavailableError as soon as the circuit breaker is open.
+        """
+        policy = self.retry_policies.get(path, DEFAULT_RETRY_POLICY)
+        refreshed = False
+        attempt = 0
+        while True:
+            if not await self.ensure_authenticated():
+                raise NEPSEAuthenticationError("NEPSE authentication failed")
+
+            token = self.access_token
             headers = {
                 **self.get_auth_headers(),
                 "Referer": f"{self.base_url}{referer_path}",
             }
             body = json.dumps(payload or {"id": self.calculate_request_id()})
-            response = await client.post(
-                f"{self.base_url}{path}",
-                params=params,
-                headers=headers,
-                content=body,
+            cause: Optional[Exception] = None
+            try:
+                response = await self._send(
+                    "POST",
+                    f"{self.base_url}{path}",
+                    params=params,
+                    headers=headers,
+                    content=body,
+                )
+            except httpx.TransportError as exc:
+                cause = exc
+                error = NEPSERequestError(f"NEPSE {path} failed: {exc!r}")
+            else:
+                if response.status_code == 401 and not refreshed:
+                    logger.warning("NEPSE request returned 401 for %s, retrying after token refresh", path)
+                    refreshed = True
+                    await self.ensure_authenticated(rejected_token=token)
+                    continue
+                if response.is_success:
+                    logger.debug("NEPSE request succeeded: %s params=%s", path, params)
+                    return response
+                error = NEPSERequestError(
+                    f"NEPSE {path} returned HTTP {response.status_code}", status_code=response.status_code
+                )
+                if not _is_retryable(response.status_code):
+                    raise error
+
+            attempt += 1
+            if attempt >= policy.attempts:
+                raise error from cause
+            delay = policy.backoff(attempt)
+            logger.warning(
+                "%s params=%s; retry %s/%s in %.1fs", error, params, attempt, policy.attempts - 1, delay
             )
+            await asyncio.sleep(delay)
 
-        response.raise_for_status()
-        logger.debug("NEPSE request succeeded: %s params=%s", path, params)
-        return response
+    @staticmethod
+    def _json(response: httpx.Response) -> dict[str, Any]:
+        try:
+            return response.json() if response.text else {}
+        except ValueError as exc:
+            raise NEPSERequestError(
+                f"NEPSE {response.url.path} returned invalid JSON", status_code=response.status_code
+            ) from exc
+
+    async def _land(self, endpoint: str, business_date: str, params: dict[str, Any], payload: Any) -> None:
+        if self.landing is None or not payload:
+            return
+        try:
+            await asyncio.to_thread(self.landing.write, endpoint, business_date, params, payload)
+        except Exception:
+            logger.exception("Failed to land NEPSE %s payload for business_date=%s", endpoint, business_date)
 
     async def fetch_floorsheet(
         self,
@@ -200,26 +406,17 @@ class NEPSE:
         page: int = 0,
         size: int = 500,
     ) -> dict[str, Any]:
-        try:
-            response = await self._post_authorized(
-                "/api/nots/nepse-data/floorsheet",
-                params={
-                    "page": page,
-                    "size": size,
-                    "stockId": stock_id,
-                    "sort": "contractId,desc",
-                    "businessDate": business_date,
-                },
-                referer_path="/floor-sheet",
-            )
-            return response.json() if response.text else {}
-        except Exception as exc:
-            logger.exception(
-                "Error fetching floorsheet for stock_id=%s business_date=%s",
-                stock_id,
-                business_date,
-            )
-            return {}
+        params = {
+            "page": page,
+            "size": size,
+            "stockId": stock_id,
+            "sort": "contractId,desc",
+            "businessDate": business_date,
+        }
+        response = await self._post_authorized(FLOORSHEET_PATH, params=params, referer_path="/floor-sheet")
+        data = self._json(response)
+        await self._land("floorsheet", business_date, params, data)
+        return data
 
     async def fetch_today_price(
         self,
@@ -229,66 +426,45 @@ class NEPSE:
         size: int = 500,
     ) -> dict[str, Any]:
         target_date = business_date or datetime.now().strftime("%Y-%m-%d")
-        try:
-            response = await self._post_authorized(
-                "/api/nots/nepse-data/today-price",
-                params={
-                    "page": page,
-                    "size": size,
-                    "businessDate": target_date,
-                },
-                referer_path="/today-price",
+        params = {
+            "page": page,
+            "size": size,
+            "businessDate": target_date,
+        }
+        response = await self._post_authorized(TODAY_PRICE_PATH, params=params, referer_path="/today-price")
+        data = self._json(response)
+        await self._land("today-price", target_date, params, data)
+        return data
+
+    def _positions(self, salt_values: list[int], orders: tuple[tuple[int, ...], ...]) -> tuple[int, ...]:
+        # The exports are pure functions of the salts, which only change on authentication.
+        key = (tuple(salt_values), orders)
+        positions = self._salt_positions.get(key)
+        if positions is None:
+            if len(self._salt_positions) >= _SALT_POSITIONS_MAX:
+                self._salt_positions.clear()
+            positions = tuple(
+                func(self.wasm_store, *(salt_values[i] for i in order))
+                for func, order in zip(self._salt_exports, orders)
             )
-            return response.json() if response.text else {}
-        except Exception as exc:
-            logger.exception("Error fetching NEPSE today-price for business_date=%s", target_date)
-            return {}
+            self._salt_positions[key] = positions
+        return positions
+
+    @staticmethod
+    def _strip_positions(token: str, positions: tuple[int, ...]) -> str:
+        parts = []
+        start = 0
+        for position in positions:
+            parts.append(token[start:position])
+            start = position + 1
+        parts.append(token[start:])
+        return "".join(parts)
 
     def _trim_access_token(self, token: str, salt_values: list[int]) -> str:
-        s1, s2, s3, s4, s5 = salt_values
-        cdx = self.wasm_instance.exports(self.wasm_store)["cdx"]
-        rdx = self.wasm_instance.exports(self.wasm_store)["rdx"]
-        bdx = self.wasm_instance.exports(self.wasm_store)["bdx"]
-        ndx = self.wasm_instance.exports(self.wasm_store)["ndx"]
-        mdx = self.wasm_instance.exports(self.wasm_store)["mdx"]
-
-        cdx_pos = cdx(self.wasm_store, s1, s2, s3, s4, s5)
-        rdx_pos = rdx(self.wasm_store, s1, s2, s4, s3, s5)
-        bdx_pos = bdx(self.wasm_store, s1, s2, s4, s3, s5)
-        ndx_pos = ndx(self.wasm_store, s1, s2, s4, s3, s5)
-        mdx_pos = mdx(self.wasm_store, s1, s2, s4, s3, s5)
-
-        return (
-            token[:cdx_pos]
-            + token[cdx_pos + 1:rdx_pos]
-            + token[rdx_pos + 1:bdx_pos]
-            + token[bdx_pos + 1:ndx_pos]
-            + token[ndx_pos + 1:mdx_pos]
-            + token[mdx_pos + 1:]
-        )
+        return self._strip_positions(token, self._positions(salt_values, _ACCESS_SALT_ORDERS))
 
     def _trim_refresh_token(self, token: str, salt_values: list[int]) -> str:
-        s1, s2, s3, s4, s5 = salt_values
-        cdx = self.wasm_instance.exports(self.wasm_store)["cdx"]
-        rdx = self.wasm_instance.exports(self.wasm_store)["rdx"]
-        bdx = self.wasm_instance.exports(self.wasm_store)["bdx"]
-        ndx = self.wasm_instance.exports(self.wasm_store)["ndx"]
-        mdx = self.wasm_instance.exports(self.wasm_store)["mdx"]
-
-        cdx_pos = cdx(self.wasm_store, s2, s1, s3, s5, s4)
-        rdx_pos = rdx(self.wasm_store, s2, s1, s3, s4, s5)
-        bdx_pos = bdx(self.wasm_store, s2, s1, s4, s3, s5)
-        ndx_pos = ndx(self.wasm_store, s2, s1, s4, s3, s5)
-        mdx_pos = mdx(self.wasm_store, s2, s1, s4, s3, s5)
-
-        return (
-            token[:cdx_pos]
-            + token[cdx_pos + 1:rdx_pos]
-            + token[rdx_pos + 1:bdx_pos]
-            + token[bdx_pos + 1:ndx_pos]
-            + token[ndx_pos + 1:mdx_pos]
-            + token[mdx_pos + 1:]
-        )
+        return self._strip_positions(token, self._positions(salt_values, _REFRESH_SALT_ORDERS))
 
     def get_auth_headers(self) -> dict[str, str]:
         return {**self.headers, "Authorization": f"Salter {self.access_token}"}
@@ -311,3 +487,25 @@ class NEPSE:
         index = 1 if i % 10 < 4 else 3
         salt_values = self.original_salt_values or self.salt_values
         return i + salt_values[index] * day - salt_values[index - 1]
+
+
+_shared_client: Optional[NEPSE] = None
+
+
+def get_shared_nepse() -> NEPSE:
+    """The process-wide client, created on first use.
+
+    Reusing it keeps the wasm instance, connection pool and tokens across requests, scheduler
+    jobs and bot handlers instead of repeating the prove/market-open handshake per call.
+    """
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = NEPSE()
+    return _shared_client
+
+
+async def close_shared_nepse() -> None:
+    global _shared_client
+    client, _shared_client = _shared_client, None
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,21 @@
+from src.shared.exceptions import ExternalServiceError
+
+
+class NEPSEError(ExternalServiceError):
+    """A NEPSE API call failed."""
+
+
+class NEPSEUnavailableError(NEPSEError):
+    """NEPSE is failing repeatedly; calls are rejected until the circuit breaker lets a probe through."""
+
+
+class NEPSEAuthenticationError(NEPSEError):
+    """NEPSE did not issue an access token."""
+
+
+class NEPSERequestError(NEPSEError):
+    """A NEPSE request failed for good: retries were exhausted or the error is not retryable."""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
@@ -3,21 +3,60 @@ import asyncio
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable, Optional
 from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError
 from src.config.settings import config
-from src.database import get_db, Floorsheet, FloorsheetSchema, FetchListItemSchema, Scripts, Broker, BrokerSchema
-from src.core.nepse.client import NEPSE
+from src.database import get_db, Floorsheet, FetchListItemSchema, Scripts, parse_floorsheet_page
+from src.database.schemas import FloorsheetPage
+from src.core.nepse.client import NEPSE, get_shared_nepse
+from src.core.nepse.errors import NEPSEAuthenticationError
+from src.infrastructure.db.models import FloorsheetFetchJobItem
+from src.infrastructure.files import FloorsheetArchive
+from src.infrastructure.cache import floorsheet_query_cache
+from src.infrastructure.db.repositories import (
+    BrokerRepository,
+    FloorsheetBarRepository,
+    FloorsheetBrokerDailyRepository,
+    FloorsheetDataVersionRepository,
+    FloorsheetFetchJobRepository,
+    FloorsheetRepository,
+    FloorsheetSyncStateRepository,
+    ScriptRepository,
+)
 import json
 
 logger = logging.getLogger(__name__)
 
+_PREFETCH_PAGES = 2
+
 class FloorsheetFetcher:
     """Fetches floorsheet data from NEPSE API and stores in database."""
 
-    def __init__(self):
-        self.nepse = NEPSE()
+    def __init__(self, nepse: Optional[NEPSE] = None):
+        self._nepse = nepse
+        self.archive = FloorsheetArchive(config.floorsheet_archive_dir)
+        # SQLite allows one writer at a time; concurrent jobs queue their page writes here
+        # instead of racing each other into SQLITE_BUSY.
+        self._write_lock = asyncio.Lock()
+        self._broker_ids: Optional[dict[str, tuple[int, str]]] = None
+        self._scripts_by_nepse_id: Optional[dict[int, tuple[int, Optional[str]]]] = None
+
+    @property
+    def nepse(self) -> NEPSE:
+        # Resolved on first use so database-only callers (e.g. replay) never touch the network.
+        if self._nepse is None:
+            self._nepse = get_shared_nepse()
+        return self._nepse
+
+    async def __aenter__(self) -> "FloorsheetFetcher":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Nothing to release: the NEPSE client is process-wide, or owned by whoever passed it in."""
 
     async def get_stock_id(self, ticker: str) -> Optional[int]:
         """Get NEPSE stock ID from database by ticker symbol."""
@@ -60,6 +99,26 @@ class FloorsheetFetcher:
             )
             return result.scalars().first() is not None
 
+    async def get_synced_contract_id(self, ticker: str, date: str) -> Optional[int]:
+        """
+        Return the newest contract_id covered by a completed fetch pass for a ticker and date.
+        Rows stored by an interrupted pass don't count: older contracts below them may be missing.
+        """
+        async with get_db() as db:
+            script = await ScriptRepository(db).get_by_ticker(ticker)
+            if not script:
+                return None
+            return await FloorsheetSyncStateRepository(db).get_synced_contract_id(script.id, date)
+
+    async def mark_synced(self, ticker: str, date: str, contract_id: int) -> None:
+        """Record that every contract up to contract_id is stored for a ticker and date."""
+        async with self._write_lock, get_db() as db:
+            script = await ScriptRepository(db).get_by_ticker(ticker)
+            if not script:
+                return
+            await FloorsheetSyncStateRepository(db).mark_synced(script.id, date, contract_id)
+            await db.commit()
+
     async def fetch_floorsheet(
         self,
         stock_id: int,
@@ -68,224 +127,218 @@ class FloorsheetFetcher:
         page: int = 0,
         size: int = 500
     ) -> dict:
-        """Fetch floorsheet data from NEPSE API."""
-        try:
-            data = await self.nepse.fetch_floorsheet(
-                stock_id=stock_id,
-                business_date=date,
-                page=page,
-                size=size,
-            )
-            if not data:
-                logger.warning(
-                    "Empty floorsheet response for ticker=%s stock_id=%s business_date=%s",
-                    ticker,
-                    stock_id,
-                    date,
-                )
-                return {}
-            return data
-        except Exception as e:
-            logger.exception("Error fetching floorsheet for ticker=%s business_date=%s", ticker, date)
-            return {}
+        """Fetch floorsheet data from NEPSE API.
 
-    async def get_or_create_broker(self, db, member_id: str, name: str) -> int:
-        """Get or create a broker and return its ID."""
-        # Try to find existing broker
-        if not member_id:
-            return None
-        
-        result = await db.execute(
-            select(Broker).filter(Broker.member_id == member_id)
-        )
-        broker = result.scalars().first()
-
-        if broker:
-            # Update name if it's different (in case of data updates)
-            if broker.name != name:
-                broker.name = name
-                await db.commit()
-            return broker.id
-
-        # Create new broker
-        broker_schema = BrokerSchema(member_id=member_id, name=name)
-        broker = Broker(**broker_schema.model_dump())
-        db.add(broker)
-        await db.flush()  # Flush to get the ID without committing
-        return broker.id
-
-    async def get_or_update_script(self, db, stock_id: int, symbol: str, name: str) -> int:
-        """Get or update script and return its ID."""
-        # Try to find by NEPSE ID
-        result = await db.execute(
-            select(Scripts).filter(Scripts.nepse_id == stock_id)
-        )
-        script = result.scalars().first()
-
-        if script:
-            # Update name if provided and different
-            if name and script.name != name:
-                script.name = name
-                await db.commit()
-            return script.id
-
-        # Try to find by ticker
-        result = await db.execute(
-            select(Scripts).filter(Scripts.ticker == symbol)
+        NEPSE failures raise NEPSEError after the client's retries, so a broken page stops the fetch
+        (and is resumed from its checkpoint) instead of being read as the end of the day.
+        """
+        data = await self.nepse.fetch_floorsheet(
+            stock_id=stock_id,
+            business_date=date,
+            page=page,
+            size=size,
         )
-        script = result.scalars().first()
+        if not data:
+            logger.warning(
+                "Empty floorsheet response for ticker=%s stock_id=%s business_date=%s",
+                ticker,
+                stock_id,
+                date,
+            )
+            return {}
+        return data
+
+    async def _load_lookup_maps(self, db) -> None:
+        """Preload broker and script ids so page ingestion resolves them in memory."""
+        if self._broker_ids is None:
+            self._broker_ids = await BrokerRepository(db).get_id_map()
+        if self._scripts_by_nepse_id is None:
+            self._scripts_by_nepse_id = {
+                script.nepse_id: (script.id, script.name)
+                for script in await ScriptRepository(db).list_all()
+                if script.nepse_id is not None
+            }
 
-        if script:
-            # Update NEPSE ID and name
+    async def _resolve_broker_ids(self, db, page: FloorsheetPage) -> None:
+        """Insert unknown brokers and rename changed ones with a single upsert."""
+        pending: dict[str, str] = {}
+        for member_ids, names in (
+            (page.buyer_member_id, page.buyer_broker_name),
+            (page.seller_member_id, page.seller_broker_name),
+        ):
+            for member_id, name in zip(member_ids, names):
+                if not member_id:
+                    continue
+                name = name or f"Broker {member_id}"
+                known = self._broker_ids.get(member_id)
+                if known is None or known[1] != name:
+                    pending[member_id] = name
+
+        if pending:
+            self._broker_ids.update(await BrokerRepository(db).upsert_many(pending))
+
+    async def _resolve_script_id(self, db, stock_id: int, symbol: str, name: Optional[str]) -> Optional[int]:
+        """Resolve a script id from the preloaded map, creating or updating the script on a miss."""
+        known = self._scripts_by_nepse_id.get(stock_id)
+        if known is not None and (not name or known[1] == name):
+            return known[0]
+
+        scripts = ScriptRepository(db)
+        script = await scripts.get_by_nepse_id(stock_id) or await scripts.get_by_ticker(symbol)
+        if script is None:
+            logger.info("Creating missing script from floorsheet for ticker=%s stock_id=%s", symbol, stock_id)
+            script = await scripts.create(
+                ticker=symbol,
+                name=name,
+                href=f"/company/detail/{stock_id}",
+                nepse_id=stock_id,
+            )
+        else:
             script.nepse_id = stock_id
             if name:
                 script.name = name
-            await db.commit()
-            return script.id
-
-        logger.info("Creating missing script from floorsheet for ticker=%s stock_id=%s", symbol, stock_id)
-        script = Scripts(
-            ticker=symbol,
-            name=name,
-            href=f"/company/detail/{stock_id}",
-            nepse_id=stock_id,
-        )
-        db.add(script)
-        await db.flush()
-        await db.commit()
+            await db.flush()
+
+        self._scripts_by_nepse_id[stock_id] = (script.id, script.name)
         return script.id
 
-    async def get_or_update_floorsheet(
+    async def save_floorsheet_data(
         self,
-        db,
-        contract_id: int,
-        trade_date: str,
-        floorsheet_data: dict
-    ) -> tuple[Floorsheet, bool]:
-        """
-        Get existing floorsheet by contract_id or create new one.
-        Returns (floorsheet, is_new) tuple.
-        """
-        # Try to find existing floorsheet by contract_id
-        result = await db.execute(
-            select(Floorsheet).filter(Floorsheet.contract_id == contract_id)
-        )
-        floorsheet = result.scalars().first()
-
-        is_new = False
-        if floorsheet:
-            # Update existing record
-            for key, value in floorsheet_data.items():
-                if hasattr(floorsheet, key):
-                    setattr(floorsheet, key, value)
-        else:
-            # Create new record
-            floorsheet = Floorsheet(**floorsheet_data)
-            db.add(floorsheet)
-            is_new = True
-
-        return floorsheet, is_new
-
-    async def save_floorsheet_data(self, floorsheet_items: list[dict]) -> tuple[int, int, int]:
+        floorsheet_items: list[dict],
+        checkpoint: Optional[tuple[int, int]] = None,
+    ) -> tuple[int, int, int]:
         """
-        Save floorsheet data to database with broker and script relationships.
-        Returns (new_count, updated_count, skipped_count).
+        Save a page of floorsheet data with one bulk upsert in a single transaction.
+        checkpoint is a (job_item_id, page) pair recorded in the same transaction.
+        Returns (new_count, updated_count, skipped_count); a failed write is rolled back and re-raised.
         """
-        new_count = 0
-        updated_count = 0
-        skipped_count = 0
+        page = parse_floorsheet_page(floorsheet_items)
+        for error in page.errors:
+            logger.warning(
+                "Skipping invalid floorsheet record index=%s contract_id=%s field=%s: %s",
+                error.index,
+                error.contract_id,
+                error.field,
+                error.message,
+            )
+        skipped_count = len(page.errors)
 
-        async with get_db() as db:
-            for item in floorsheet_items:
-                try:
-                    # Parse the floorsheet schema
-                    floorsheet_schema = FloorsheetSchema(**item)
-
-                    # Get or create brokers
-                    buyer_broker_id = await self.get_or_create_broker(
-                        db,
-                        floorsheet_schema.buyer_member_id,
-                        floorsheet_schema.buyer_broker_name or f"Broker {floorsheet_schema.buyer_member_id}"
-                    )
-
-                    seller_broker_id = await self.get_or_create_broker(
-                        db,
-                        floorsheet_schema.seller_member_id,
-                        floorsheet_schema.seller_broker_name or f"Broker {floorsheet_schema.seller_member_id}"
-                    )
-
-                    # Get or update script
-                    script_id = await self.get_or_update_script(
-                        db,
-                        floorsheet_schema.stock_id,
-                        floorsheet_schema.stock_symbol,
-                        floorsheet_schema.security_name
-                    )
+        if not page and checkpoint is None:
+            return 0, 0, skipped_count
 
+        async with self._write_lock, get_db() as db:
+            try:
+                await self._load_lookup_maps(db)
+                await self._resolve_broker_ids(db, page)
+
+                script_ids = {}
+                for stock_id, symbol, name in set(zip(page.stock_id, page.stock_symbol, page.security_name)):
+                    script_ids[stock_id] = await self._resolve_script_id(db, stock_id, symbol, name)
+
+                broker_ids = {member_id: broker_id for member_id, (broker_id, _) in self._broker_ids.items()}
+                rows_by_key: dict[tuple[int, str], dict] = {}
+                duplicate_count = 0
+                for (
+                    contract_id,
+                    stock_id,
+                    buyer_member_id,
+                    seller_member_id,
+                    contract_quantity,
+                    contract_rate,
+                    contract_amount,
+                    trade_book_id,
+                    trade_date,
+                    trade_time,
+                ) in zip(
+                    page.contract_id,
+                    page.stock_id,
+                    page.buyer_member_id,
+                    page.seller_member_id,
+                    page.contract_quantity,
+                    page.contract_rate,
+                    page.contract_amount,
+                    page.trade_book_id,
+                    page.trade_date,
+                    page.trade_time,
+                ):
+                    script_id = script_ids[stock_id]
                     if not script_id:
-                        logger.warning("Skipping floorsheet record contract_id=%s: script not found", item.get("contractId"))
+                        logger.warning("Skipping floorsheet record contract_id=%s: script not found", contract_id)
                         skipped_count += 1
                         continue
 
-                    # Set the IDs in the schema
-                    floorsheet_schema.script_id = script_id
-                    floorsheet_schema.buyer_broker_id = buyer_broker_id
-                    floorsheet_schema.seller_broker_id = seller_broker_id
-
-                    # Prepare floorsheet data (exclude the temporary fields)
-                    floorsheet_data = floorsheet_schema.model_dump(
-                        exclude={'stock_symbol', 'stock_id', 'buyer_member_id', 'seller_member_id',
-                                'buyer_broker_name', 'seller_broker_name', 'security_name'}
-                    )
-
-                    # Get or update floorsheet record
-                    floorsheet, is_new = await self.get_or_update_floorsheet(
-                        db,
-                        floorsheet_schema.contract_id,
-                        floorsheet_schema.trade_date,
-                        floorsheet_data
-                    )
-
-                    await db.commit()
-                    if is_new:
-                        new_count += 1
-                    else:
-                        updated_count += 1
-
-                except IntegrityError as e:
-                    await db.rollback()
-                    logger.warning("Duplicate floorsheet record for contract_id=%s", item.get("contractId"))
-                    skipped_count += 1
-                except Exception as e:
-                    await db.rollback()
-                    logger.exception("Error saving floorsheet record contract_id=%s", item.get("contractId"))
-                    skipped_count += 1
-
+                    key = (contract_id, trade_date)
+                    if key in rows_by_key:
+                        duplicate_count += 1
+                    rows_by_key[key] = {
+                        "contract_id": contract_id,
+                        "script_id": script_id,
+                        "buyer_broker_id": broker_ids.get(buyer_member_id),
+                        "seller_broker_id": broker_ids.get(seller_member_id),
+                        "contract_quantity": contract_quantity,
+                        "contract_rate": contract_rate,
+                        "contract_amount": contract_amount,
+                        "trade_book_id": trade_book_id,
+                        "trade_date": trade_date,
+                        "trade_time": trade_time,
+                    }
+
+                floorsheets = FloorsheetRepository(db)
+                existing = await floorsheets.existing_contract_keys(list(rows_by_key))
+                await floorsheets.upsert_many(list(rows_by_key.values()))
+
+                # New contracts are folded into the broker aggregates and bars as deltas; a re-fetched
+                # contract may have changed, so its script-day is recomputed from the raw rows instead.
+                rebuild_keys = {(rows_by_key[key]["trade_date"], rows_by_key[key]["script_id"]) for key in existing}
+                new_rows = [
+                    row
+                    for key, row in rows_by_key.items()
+                    if key not in existing and (row["trade_date"], row["script_id"]) not in rebuild_keys
+                ]
+                for aggregates in (FloorsheetBrokerDailyRepository(db), FloorsheetBarRepository(db)):
+                    await aggregates.add_trades(new_rows)
+                    await aggregates.rebuild(rebuild_keys)
+                await FloorsheetDataVersionRepository(db).bump(
+                    {(row["trade_date"], row["script_id"]) for row in rows_by_key.values()}
+                )
+                if checkpoint is not None:
+                    await FloorsheetFetchJobRepository(db).advance_checkpoint(*checkpoint)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                self._reset_lookup_maps()
+                logger.exception("Error saving floorsheet page of %s records", len(floorsheet_items))
+                raise
+
+        # Archived copies of these dates are now stale until the next compaction re-exports them.
+        for trade_date in {trade_date for _, trade_date in rows_by_key}:
+            self.archive.invalidate(trade_date)
+            floorsheet_query_cache.invalidate(trade_date)
+
+        updated_count = len(existing) + duplicate_count
+        new_count = len(rows_by_key) - len(existing)
         return new_count, updated_count, skipped_count
 
-    async def fetch_and_save(
+    def _reset_lookup_maps(self) -> None:
+        self._broker_ids = None
+        self._scripts_by_nepse_id = None
+
+    async def _produce_pages(
         self,
+        queue: asyncio.Queue,
+        stock_id: int,
         ticker: str,
         date: str,
-        force: bool = False
-    ) -> dict:
-        """Fetch and save floorsheet data for a ticker and date."""
-        if not force and await self.check_existing_data(ticker, date):
-            logger.info("Floorsheet data already exists for ticker=%s business_date=%s", ticker, date)
-            return {"ticker": ticker, "date": date, "status": "skipped", "reason": "already_exists"}
-
-        stock_id = await self.get_stock_id(ticker)
-        if not stock_id:
-            logger.warning("Stock ID not found for ticker=%s", ticker)
-            return {"ticker": ticker, "date": date, "status": "error", "reason": "stock_not_found"}
-
+        after_contract_id: Optional[int] = None,
+        start_page: int = 0,
+    ) -> None:
+        """
+        Fetch pages in order onto the queue, ending with None (or the error that stopped it).
+        With after_contract_id, stop at the first contract at or below it: pages are sorted
+        contractId desc, so everything past that point is already stored.
+        """
         try:
-            logger.info("Fetching floorsheet for ticker=%s stock_id=%s business_date=%s", ticker, stock_id, date)
-            page = 0
-            total_new = 0
-            total_updated = 0
-            total_skipped = 0
-
+            page = start_page
             while True:
                 data = await self.fetch_floorsheet(stock_id, ticker, date, page)
 
@@ -298,10 +351,89 @@ class FloorsheetFetcher:
                 if not content:
                     break
 
-                new, updated, skipped = await self.save_floorsheet_data(content)
+                reached_stored = False
+                if after_contract_id is not None:
+                    fresh = [item for item in content if item.get("contractId", 0) > after_contract_id]
+                    reached_stored = len(fresh) < len(content)
+                    content = fresh
+
+                if content:
+                    await queue.put((page, content))
+
+                if reached_stored or floorsheet_data.get("last", True):
+                    break
+
+                page += 1
+        except Exception as exc:
+            await queue.put(exc)
+            return
+        await queue.put(None)
+
+    async def fetch_and_save(
+        self,
+        ticker: str,
+        date: str,
+        force: bool = False,
+        incremental: bool = False,
+        *,
+        job_item_id: Optional[int] = None,
+        start_page: int = 0,
+    ) -> dict:
+        """
+        Fetch and save floorsheet data for a ticker and date.
+        In incremental mode only contracts newer than the last completed pass are fetched,
+        which makes polling a live trading day cheap. With job_item_id every committed page
+        is checkpointed, and start_page resumes after the pages a previous run committed.
+        """
+        after_contract_id = None
+        # A resumed item continues below its committed pages, whose contracts are the newest
+        # stored ones; cutting off at them would end the fetch before the older pages.
+        if incremental and not force and start_page == 0:
+            after_contract_id = await self.get_synced_contract_id(ticker, date)
+        elif not force and start_page == 0 and await self.check_existing_data(ticker, date):
+            logger.info("Floorsheet data already exists for ticker=%s business_date=%s", ticker, date)
+            return {"ticker": ticker, "date": date, "status": "skipped", "reason": "already_exists"}
+
+        stock_id = await self.get_stock_id(ticker)
+        if not stock_id:
+            logger.warning("Stock ID not found for ticker=%s", ticker)
+            return {"ticker": ticker, "date": date, "status": "error", "reason": "stock_not_found"}
+
+        logger.info(
+            "Fetching floorsheet for ticker=%s stock_id=%s business_date=%s after_contract_id=%s start_page=%s",
+            ticker,
+            stock_id,
+            date,
+            after_contract_id,
+            start_page,
+        )
+        total_new = 0
+        total_updated = 0
+        total_skipped = 0
+        newest_contract_id = after_contract_id
+
+        # Fetch pages ahead of the writer so network time overlaps SQLite time; the bounded
+        # queue keeps at most _PREFETCH_PAGES pages in memory.
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_PREFETCH_PAGES)
+        producer = asyncio.create_task(
+            self._produce_pages(queue, stock_id, ticker, date, after_contract_id, start_page)
+        )
+        next_page = start_page
+        try:
+            while (item := await queue.get()) is not None:
+                if isinstance(item, Exception):
+                    raise item
+
+                page, content = item
+                checkpoint = (job_item_id, page) if job_item_id is not None else None
+                new, updated, skipped = await self.save_floorsheet_data(content, checkpoint)
+                next_page = page + 1
                 total_new += new
                 total_updated += updated
                 total_skipped += skipped
+                newest_contract_id = max(
+                    [newest_contract_id or 0, *(item.get("contractId") or 0 for item in content)]
+                )
 
                 logger.info(
                     "Floorsheet page processed ticker=%s business_date=%s page=%s new=%s updated=%s skipped=%s",
@@ -312,56 +444,169 @@ class FloorsheetFetcher:
                     updated,
                     skipped,
                 )
+        finally:
+            producer.cancel()
 
-                if floorsheet_data.get("last", True):
-                    break
-
-                page += 1
-
-            total_saved = total_new + total_updated
-            logger.info(
-                "Floorsheet fetch complete ticker=%s business_date=%s new=%s updated=%s skipped=%s",
-                ticker,
-                date,
-                total_new,
-                total_updated,
-                total_skipped,
+        if job_item_id is not None:
+            async with get_db() as db:
+                pages_done = await FloorsheetFetchJobRepository(db).get_pages_done(job_item_id)
+            if pages_done < next_page:
+                logger.warning(
+                    "Floorsheet pages not committed ticker=%s business_date=%s pages=%s-%s",
+                    ticker,
+                    date,
+                    pages_done,
+                    next_page - 1,
+                )
+                return {"ticker": ticker, "date": date, "status": "error", "reason": f"page_{pages_done}_not_saved"}
+
+        # Only a pass that started at page 0 and ran to its end covers every contract up to the
+        # newest one it saw; a resumed pass never saw the pages its earlier run committed.
+        if start_page == 0 and newest_contract_id and newest_contract_id != after_contract_id:
+            await self.mark_synced(ticker, date, newest_contract_id)
+
+        total_saved = total_new + total_updated
+        logger.info(
+            "Floorsheet fetch complete ticker=%s business_date=%s new=%s updated=%s skipped=%s",
+            ticker,
+            date,
+            total_new,
+            total_updated,
+            total_skipped,
+        )
+        return {
+            "ticker": ticker,
+            "date": date,
+            "status": "success",
+            "new": total_new,
+            "updated": total_updated,
+            "saved": total_saved,
+            "skipped": total_skipped
+        }
+
+    async def _run_fetch_item(self, item: dict, job_item: Optional[FloorsheetFetchJobItem] = None) -> dict:
+        try:
+            fetch_item = FetchListItemSchema(**item)
+            result = await self.fetch_and_save(
+                fetch_item.ticker,
+                fetch_item.date,
+                fetch_item.force,
+                fetch_item.incremental,
+                job_item_id=job_item.id if job_item else None,
+                start_page=job_item.pages_done if job_item else 0,
             )
-            return {
-                "ticker": ticker,
-                "date": date,
-                "status": "success",
-                "new": total_new,
-                "updated": total_updated,
-                "saved": total_saved,
-                "skipped": total_skipped
+        except Exception as e:
+            logger.exception("Error processing floorsheet fetch item: %s", item)
+            result = {
+                "ticker": item.get("ticker"),
+                "date": item.get("date"),
+                "status": "error",
+                "reason": str(e)
             }
+
+        if job_item is not None:
+            status = {"success": "done", "skipped": "skipped"}.get(result["status"], "failed")
+            async with get_db() as db:
+                await FloorsheetFetchJobRepository(db).set_item_status(job_item.id, status, result.get("reason"))
+                await db.commit()
+        return result
+
+    async def _run_bounded(
+        self,
+        jobs: list[Callable[[], Awaitable[dict]]],
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        semaphore = asyncio.Semaphore(max(1, concurrency or config.floorsheet_concurrency))
+        # Authenticate once up front so the first wave of jobs reuses one token.
+        if not await self.nepse.ensure_authenticated():
+            raise NEPSEAuthenticationError("NEPSE authentication failed")
+
+        async def run(job: Callable[[], Awaitable[dict]]) -> dict:
+            async with semaphore:
+                return await job()
+
+        tasks = [asyncio.create_task(run(job)) for job in jobs]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
         finally:
-            await self.nepse.aclose()
+            for task in tasks:
+                task.cancel()
 
-    async def fetch_from_list(self, fetch_list: list[dict]) -> list[dict]:
+    async def backfill(self, fetch_list: list[dict], concurrency: Optional[int] = None) -> AsyncIterator[dict]:
+        """
+        Run (ticker, date) fetch items concurrently over the shared NEPSE client.
+        Yields each item's result as soon as it finishes.
+        """
+        jobs = [partial(self._run_fetch_item, item) for item in fetch_list]
+        async for result in self._run_bounded(jobs, concurrency):
+            yield result
+
+    async def fetch_from_list(self, fetch_list: list[dict], concurrency: Optional[int] = None) -> list[dict]:
         """Fetch floorsheet data for multiple tickers and dates from a list."""
-        results = []
+        return [result async for result in self.backfill(fetch_list, concurrency)]
 
+    async def create_job(self, fetch_list: list[dict], source: Optional[str] = None) -> int:
+        """Persist a fetch list as a resumable job and return its id."""
+        items: dict[tuple[str, str], dict] = {}
         for item in fetch_list:
-            try:
-                fetch_item = FetchListItemSchema(**item)
-                
-                result = await self.fetch_and_save(
-                        fetch_item.ticker,
-                        fetch_item.date,
-                        fetch_item.force
-                    )
-                results.append(result)
-            except Exception as e:
-                logger.exception("Error processing floorsheet fetch item: %s", item)
-                results.append({
-                    "ticker": item.get("ticker"),
-                    "status": "error",
-                    "reason": str(e)
-                })
-
-        return results
+            fetch_item = FetchListItemSchema(**item)
+            items[(fetch_item.ticker, fetch_item.date)] = {
+                "ticker": fetch_item.ticker,
+                "trade_date": fetch_item.date,
+                "force": fetch_item.force,
+                "incremental": fetch_item.incremental,
+            }
+
+        async with get_db() as db:
+            job = await FloorsheetFetchJobRepository(db).create(list(items.values()), source=source)
+            await db.commit()
+        logger.info("Created floorsheet fetch job id=%s items=%s", job.id, len(items))
+        return job.id
+
+    async def run_job(self, job_id: int, concurrency: Optional[int] = None) -> AsyncIterator[dict]:
+        """
+        Run every unfinished item of a job, continuing partially fetched items from their
+        last committed page. Yields each item's result as soon as it finishes.
+        """
+        async with get_db() as db:
+            job_items = await FloorsheetFetchJobRepository(db).list_unfinished_items(job_id)
+
+        jobs = [
+            partial(
+                self._run_fetch_item,
+                {
+                    "ticker": job_item.ticker,
+                    "date": job_item.trade_date,
+                    "force": job_item.force,
+                    "incremental": job_item.incremental,
+                },
+                job_item,
+            )
+            for job_item in job_items
+        ]
+        async for result in self._run_bounded(jobs, concurrency):
+            yield result
+
+        async with get_db() as db:
+            jobs_repository = FloorsheetFetchJobRepository(db)
+            unfinished = await jobs_repository.count_unfinished_items(job_id)
+            await jobs_repository.set_job_status(job_id, "done" if unfinished == 0 else "failed")
+            await db.commit()
+        logger.info("Floorsheet fetch job id=%s finished unfinished_items=%s", job_id, unfinished)
+
+    async def resume_job(self, job_id: Optional[int] = None, concurrency: Optional[int] = None) -> AsyncIterator[dict]:
+        """Resume the given job, or the most recent unfinished one."""
+        async with get_db() as db:
+            jobs_repository = FloorsheetFetchJobRepository(db)
+            job = await jobs_repository.get_by_id(job_id) if job_id else await jobs_repository.get_latest_unfinished()
+        if job is None:
+            logger.warning("No floorsheet fetch job to resume job_id=%s", job_id)
+            return
+
+        logger.info("Resuming floorsheet fetch job id=%s source=%s", job.id, job.source)
+        async for result in self.run_job(job.id, concurrency):
+            yield result
 
 
 async def main():
@@ -370,31 +615,70 @@ async def main():
     parser.add_argument("--date", type=str, help="Date in YYYY-MM-DD format")
     parser.add_argument("--dates", type=str, nargs="+", help="Multiple dates in YYYY-MM-DD format")
     parser.add_argument("--force", action="store_true", help="Force refetch even if data exists")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch contracts newer than the last completed sync (for polling a live day)",
+    )
     parser.add_argument("--fetch-list", type=str, help="Path to JSON file with fetch list")
+    parser.add_argument("--all-scripts", action="store_true", help="Backfill every listed script for --date/--dates")
+    parser.add_argument(
+        "--resume",
+        type=int,
+        nargs="?",
+        const=0,
+        metavar="JOB_ID",
+        help="Resume a checkpointed fetch job (defaults to the latest unfinished one)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=config.floorsheet_concurrency,
+        help="Number of (ticker, date) jobs to run at once",
+    )
 
     args = parser.parse_args()
 
-    fetcher = FloorsheetFetcher()
+    dates = args.dates or ([args.date] if args.date else [datetime.now().strftime("%Y-%m-%d")])
 
-    if args.fetch_list:
-        fetch_list_path = Path(args.fetch_list)
-        if not fetch_list_path.exists():
-            logger.error("Fetch list file not found: %s", args.fetch_list)
+    async with FloorsheetFetcher() as fetcher:
+        if args.resume is not None:
+            async for result in fetcher.resume_job(args.resume or None, args.concurrency):
+                logger.info("Floorsheet fetch result: %s", result)
             return
 
-        with open(fetch_list_path, "r") as f:
-            fetch_list = json.load(f)
-
-        results = await fetcher.fetch_from_list(fetch_list)
-        for result in results:
-            logger.info("Floorsheet fetch result: %s", result)
+        if args.fetch_list:
+            fetch_list_path = Path(args.fetch_list)
+            if not fetch_list_path.exists():
+                logger.error("Fetch list file not found: %s", args.fetch_list)
+                return
+
+            with open(fetch_list_path, "r") as f:
+                fetch_list = json.load(f)
+
+        elif args.all_scripts:
+            async with get_db() as db:
+                tickers = sorted(script.ticker for script in await ScriptRepository(db).list_all())
+            fetch_list = [
+                {"ticker": ticker, "date": date, "force": args.force, "incremental": args.incremental}
+                for date in dates
+                for ticker in tickers
+            ]
+
+        elif args.ticker:
+            fetch_list = [
+                {"ticker": args.ticker, "date": date, "force": args.force, "incremental": args.incremental}
+                for date in dates
+            ]
 
-    elif args.ticker:
-        result = await fetcher.fetch_and_save(args.ticker, args.date, args.force)
-        logger.info("Floorsheet fetch result: %s", result)
+        else:
+            parser.print_help()
+            return
 
-    else:
-        parser.print_help()
+        source = args.fetch_list or ("all-scripts" if args.all_scripts else args.ticker)
+        job_id = await fetcher.create_job(fetch_list, source=source)
+        async for result in fetcher.run_job(job_id, args.concurrency):
+            logger.info("Floorsheet fetch result: %s", result)
 
 
 if __name__ == "__main__":
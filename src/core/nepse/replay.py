@@ -0,0 +1,87 @@
+"""
+Rebuild floorsheet and script details tables from landed NEPSE payloads.
+
+Reads the gzip NDJSON files written under NEPSE_LANDING_DIR and feeds them through the
+normal ingestion paths without touching the network.
+"""
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional
+
+from src.config.settings import config
+from src.core.nepse.floorsheet import FloorsheetFetcher
+from src.core.nepse.script import ScriptDetailsFetcher
+from src.infrastructure.files import RawPayloadStore
+from src.shared.logging import configure_logging
+
+logger = logging.getLogger(__name__)
+
+FLOORSHEET_ENDPOINT = "floorsheet"
+TODAY_PRICE_ENDPOINT = "today-price"
+
+
+async def replay_floorsheet(store: RawPayloadStore, dates: Optional[list[str]] = None) -> dict:
+    """Re-ingest every landed floorsheet page for the given dates (all landed dates by default)."""
+    totals = {"pages": 0, "new": 0, "updated": 0, "skipped": 0}
+    async with FloorsheetFetcher() as fetcher:
+        for business_date in dates or store.list_dates(FLOORSHEET_ENDPOINT):
+            for record in store.iter_records(FLOORSHEET_ENDPOINT, business_date):
+                content = record.get("payload", {}).get("floorsheets", {}).get("content", [])
+                if not content:
+                    continue
+                new, updated, skipped = await fetcher.save_floorsheet_data(content)
+                totals["pages"] += 1
+                totals["new"] += new
+                totals["updated"] += updated
+                totals["skipped"] += skipped
+            logger.info("Replayed floorsheet business_date=%s totals=%s", business_date, totals)
+    return totals
+
+
+async def replay_today_price(store: RawPayloadStore, dates: Optional[list[str]] = None) -> dict:
+    """Rebuild script details from landed today-price pages, latest fetch of each symbol winning."""
+    fetcher = ScriptDetailsFetcher()
+    replayed = 0
+    for business_date in dates or store.list_dates(TODAY_PRICE_ENDPOINT):
+        rows_by_symbol: dict[str, dict] = {}
+        for record in store.iter_records(TODAY_PRICE_ENDPOINT, business_date):
+            content = record.get("payload", {}).get("content", [])
+            rows_by_symbol.update((row["symbol"], row) for row in content if row.get("symbol"))
+        if not rows_by_symbol:
+            continue
+        await fetcher.save(list(rows_by_symbol.values()))
+        replayed += len(rows_by_symbol)
+        logger.info("Replayed today-price business_date=%s scripts=%s", business_date, len(rows_by_symbol))
+    return {"scripts": replayed}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Replay landed NEPSE payloads into the database")
+    parser.add_argument(
+        "--endpoint",
+        choices=[FLOORSHEET_ENDPOINT, TODAY_PRICE_ENDPOINT, "all"],
+        default="all",
+        help="Which landed endpoint to replay",
+    )
+    parser.add_argument("--dates", type=str, nargs="+", help="Business dates in YYYY-MM-DD format (default: all)")
+    parser.add_argument("--landing-dir", type=str, help="Landing directory (default: NEPSE_LANDING_DIR)")
+
+    args = parser.parse_args()
+
+    landing_dir = Path(args.landing_dir) if args.landing_dir else config.nepse_landing_dir
+    if landing_dir is None or not landing_dir.exists():
+        logger.error("Landing directory not found: %s", landing_dir)
+        return
+
+    store = RawPayloadStore(landing_dir)
+    if args.endpoint in (TODAY_PRICE_ENDPOINT, "all"):
+        logger.info("Today-price replay result: %s", await replay_today_price(store, args.dates))
+    if args.endpoint in (FLOORSHEET_ENDPOINT, "all"):
+        logger.info("Floorsheet replay result: %s", await replay_floorsheet(store, args.dates))
+
+
+if __name__ == "__main__":
+    configure_logging()
+    asyncio.run(main())
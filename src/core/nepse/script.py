@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 
 from sqlalchemy import select
 
@@ -7,6 +8,7 @@ from src.database import ScriptDetails
 from src.database import Tracker
 from sqlalchemy.orm import selectinload
 
+from .client import NEPSE
 from .fetch import fetch_all_script_details
 
 from src.utils import check_time_delta, valid_day_time
@@ -55,12 +57,18 @@ def _map_today_price_to_details(payload: dict, script_id: int) -> dict:
 class ScriptDetailsFetcher:
     """Refresh script details from the NEPSE today-price endpoint."""
 
+    def __init__(self, nepse: Optional[NEPSE] = None):
+        self.nepse = nepse
+
     async def fetch_and_save(self, only_tickers: set[str] | None = None) -> dict[str, dict]:
-        payloads = await fetch_all_script_details()
+        payloads = await fetch_all_script_details(nepse=self.nepse)
         if not payloads:
             logger.warning("No NEPSE today-price payloads returned for script detail refresh")
             return {}
+        return await self.save(payloads, only_tickers)
 
+    async def save(self, payloads: list[dict], only_tickers: set[str] | None = None) -> dict[str, dict]:
+        """Upsert scripts and their details from today-price rows."""
         data_by_ticker = {item["symbol"]: item for item in payloads if item.get("symbol")}
 
         async with get_db() as db:
@@ -124,13 +132,13 @@ async def _get_script_details_row(db: Session, script_id: int) -> ScriptDetails
     ).scalars().first()
 
 
-async def get_script_ltp(db: Session, script: Scripts):
+async def get_script_ltp(db: Session, script: Scripts, nepse: Optional[NEPSE] = None):
     details_row = await _get_script_details_row(db, script.id)
 
     if not details_row or (check_time_delta(details_row.updated_at, 30) and valid_day_time()):
         try:
             logger.debug("Refreshing LTP from NEPSE for ticker=%s", script.ticker)
-            await ScriptDetailsFetcher().fetch_and_save({script.ticker})
+            await ScriptDetailsFetcher(nepse).fetch_and_save({script.ticker})
             details_row = await _get_script_details_row(db, script.id)
             if not details_row:
                 logger.warning("No script details found after refresh for ticker=%s", script.ticker)
@@ -0,0 +1,126 @@
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from src.core.nepse.errors import NEPSEUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often a NEPSE call is attempted and how long to back off between attempts."""
+
+    attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential delay before retry number ``attempt`` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class AdaptiveRateLimiter:
+    """Token bucket whose refill rate backs off on throttling and creeps back up on success.
+
+    Rate changes are additive-increase / multiplicative-decrease. Callers reserve a token
+    synchronously and sleep for the returned delay, so no lock is needed. That keeps one limiter
+    usable across event loops: the shared client outlives one-shot ``asyncio.run`` calls.
+    """
+
+    def __init__(
+        self,
+        max_rate: float,
+        *,
+        min_rate: float = 0.5,
+        burst: Optional[float] = None,
+        increase: float = 0.25,
+        decrease: float = 0.5,
+        slow_seconds: float = 5.0,
+    ):
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.rate = max_rate
+        self.burst = burst if burst is not None else max(1.0, max_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_seconds = slow_seconds
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def reserve(self) -> float:
+        """Take one token and return how long to wait before using it."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        # A negative balance is the queue of callers already waiting on the refill.
+        self._tokens -= 1
+        delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        return max(delay, self._paused_until - now)
+
+    def record_success(self, elapsed: float) -> None:
+        if elapsed >= self.slow_seconds:
+            self._slow_down()
+        elif self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def record_throttled(self, retry_after: Optional[float] = None) -> None:
+        """NEPSE answered 429/5xx; cut the rate and honour ``Retry-After`` for everyone."""
+        self._slow_down()
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def _slow_down(self) -> None:
+        rate = max(self.min_rate, self.rate * self.decrease)
+        if rate < self.rate:
+            logger.info("Throttling NEPSE requests to %.2f/s", rate)
+        self.rate = rate
+
+
+class CircuitBreaker:
+    """Fail fast after ``failure_threshold`` consecutive failures, probing again after ``reset_seconds``.
+
+    While open every call is rejected with ``NEPSEUnavailableError``; once the timeout passes a single
+    probe is let through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def before_call(self) -> None:
+        if self._opened_at is None:
+            return
+        remaining = self._opened_at + self.reset_seconds - time.monotonic()
+        if remaining > 0 or self._probing:
+            raise NEPSEUnavailableError(f"NEPSE circuit open; retry in {max(remaining, 0):.0f}s")
+        self._probing = True
+
+    def abandon_probe(self) -> None:
+        """The probe ended without an answer (e.g. cancelled); let the next caller probe instead."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("NEPSE circuit closed")
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            if self._opened_at is None or self._probing:
+                logger.warning("NEPSE circuit opened after %d consecutive failures", self.failures)
+            self._opened_at = time.monotonic()
+            self._probing = False
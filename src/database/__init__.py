@@ -1,5 +1,5 @@
 from .models import Broker, Floorsheet, MeroShareUser, ScriptDetails, Scripts, Tracker, User
-from .schemas import ScriptDetailsSchema, WhatsAppMessageSchema, FloorsheetSchema, FetchListItemSchema, BrokerSchema
+from .schemas import ScriptDetailsSchema, WhatsAppMessageSchema, FloorsheetSchema, FetchListItemSchema, BrokerSchema, parse_floorsheet_page
 from .session import Base, engine, get_db
 
 ModelBase = Base
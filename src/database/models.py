@@ -1,6 +1,11 @@
 from src.infrastructure.db.models import (
     Broker,
     Floorsheet,
+    FloorsheetBar,
+    FloorsheetBrokerDaily,
+    FloorsheetDataVersion,
+    FloorsheetFetchJob,
+    FloorsheetFetchJobItem,
     MeroShareUser,
     ScriptDetails,
     Scripts,
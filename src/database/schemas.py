@@ -1,3 +1,6 @@
+import re
+from dataclasses import dataclass, field
+from operator import itemgetter
 from pydantic import BaseModel, Field, field_validator
 from typing import Any, Literal, Optional, Union
 from datetime import datetime
@@ -120,8 +123,170 @@ class FloorsheetSchema(BaseModel):
     class Config:
         populate_by_name = True
 
+_TRADE_TIME_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}")
+_TRADE_TIME_PAGE_PATTERN = re.compile(rf"(?:{_TRADE_TIME_PATTERN.pattern}\n)*{_TRADE_TIME_PATTERN.pattern}")
+
+
+def _coerce_int(value) -> int:
+    if type(value) is int:
+        return value
+    if isinstance(value, str):
+        return int(value.strip())
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    raise ValueError(f"expected an integer, got {value!r}")
+
+
+def _coerce_float(value) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        return float(value.strip())
+    raise ValueError(f"expected a number, got {value!r}")
+
+
+def _coerce_optional_str(value) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    raise ValueError(f"expected a string, got {value!r}")
+
+
+def _coerce_str(value) -> str:
+    if isinstance(value, str):
+        return value
+    raise ValueError(f"expected a string, got {value!r}")
+
+
+def _split_trade_time(value) -> tuple[str, str]:
+    """Split an ISO tradeTime into ('%Y-%m-%d', '%H:%M:%S.%f'), parsing it at most once."""
+    if not isinstance(value, str):
+        raise ValueError(f"expected an ISO datetime string, got {value!r}")
+    # NEPSE sends 2026-04-02T11:00:33.197375, which already is both output formats.
+    if len(value) == 26 and _TRADE_TIME_PATTERN.fullmatch(value):
+        return value[:10], value[11:]
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return dt.strftime('%Y-%m-%d'), dt.strftime('%H:%M:%S.%f')
+
+
+# (output column, payload key, coercion, types accepted as-is); trade_date/trade_time come from tradeTime.
+_FLOORSHEET_PAGE_FIELDS = (
+    ("contract_id", "contractId", _coerce_int, (int,)),
+    ("stock_symbol", "stockSymbol", _coerce_str, (str,)),
+    ("stock_id", "stockId", _coerce_int, (int,)),
+    ("buyer_member_id", "buyerMemberId", _coerce_optional_str, (str, type(None))),
+    ("seller_member_id", "sellerMemberId", _coerce_optional_str, (str, type(None))),
+    ("buyer_broker_name", "buyerBrokerName", _coerce_optional_str, (str, type(None))),
+    ("seller_broker_name", "sellerBrokerName", _coerce_optional_str, (str, type(None))),
+    ("contract_quantity", "contractQuantity", _coerce_int, (int,)),
+    ("contract_rate", "contractRate", _coerce_float, (float,)),
+    ("contract_amount", "contractAmount", _coerce_float, (float,)),
+    ("trade_book_id", "tradeBookId", _coerce_int, (int,)),
+    ("security_name", "securityName", _coerce_optional_str, (str, type(None))),
+)
+_OPTIONAL_PAGE_KEYS = {"buyerMemberId", "sellerMemberId", "buyerBrokerName", "sellerBrokerName", "securityName"}
+
+
+@dataclass
+class FloorsheetRowError:
+    index: int
+    contract_id: Any
+    field: str
+    message: str
+
+
+@dataclass
+class FloorsheetPage:
+    """A floorsheet API page parsed into one list per column; invalid rows land in errors."""
+
+    contract_id: list[int] = field(default_factory=list)
+    stock_symbol: list[str] = field(default_factory=list)
+    stock_id: list[int] = field(default_factory=list)
+    buyer_member_id: list[Optional[str]] = field(default_factory=list)
+    seller_member_id: list[Optional[str]] = field(default_factory=list)
+    buyer_broker_name: list[Optional[str]] = field(default_factory=list)
+    seller_broker_name: list[Optional[str]] = field(default_factory=list)
+    contract_quantity: list[int] = field(default_factory=list)
+    contract_rate: list[float] = field(default_factory=list)
+    contract_amount: list[float] = field(default_factory=list)
+    trade_book_id: list[int] = field(default_factory=list)
+    security_name: list[Optional[str]] = field(default_factory=list)
+    trade_date: list[str] = field(default_factory=list)
+    trade_time: list[str] = field(default_factory=list)
+    errors: list[FloorsheetRowError] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.contract_id)
+
+
+def parse_floorsheet_page(items: list[dict]) -> FloorsheetPage:
+    """
+    Parse a floorsheet ``content`` list column by column, with the same coercions as FloorsheetSchema.
+    Columns whose values already have the right type are taken as-is; only the others are coerced
+    value by value. Rows failing any field are dropped from every column and reported in errors
+    with their index and first failing field.
+    """
+    errors: dict[int, FloorsheetRowError] = {}
+
+    def reject(index: int, key: str, message: str) -> None:
+        if index not in errors:
+            errors[index] = FloorsheetRowError(index, items[index].get("contractId"), key, message)
+
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index] = FloorsheetRowError(index, None, "", f"expected an object, got {item!r}")
+    rows = [item if isinstance(item, dict) else {} for item in items]
+
+    columns: dict[str, list] = {}
+    for name, key, coerce, accepted in _FLOORSHEET_PAGE_FIELDS:
+        try:
+            values = list(map(itemgetter(key), rows))
+        except KeyError:
+            values = [row.get(key) for row in rows]
+        if not set(map(type, values)).issubset(accepted):
+            required = key not in _OPTIONAL_PAGE_KEYS
+            for index, value in enumerate(values):
+                if type(value) in accepted:
+                    continue
+                try:
+                    if value is None and required:
+                        raise ValueError("field required")
+                    values[index] = coerce(value)
+                except (TypeError, ValueError) as exc:
+                    reject(index, key, str(exc))
+        columns[name] = values
+
+    trade_time_values = [row.get("tradeTime") for row in rows]
+    if set(map(type, trade_time_values)).issubset((str,)) and _TRADE_TIME_PAGE_PATTERN.fullmatch(
+        "\n".join(trade_time_values)
+    ):
+        # Whole page in NEPSE's usual format: validated by one regex pass, split by slicing.
+        columns["trade_date"] = [value[:10] for value in trade_time_values]
+        columns["trade_time"] = [value[11:] for value in trade_time_values]
+    else:
+        trade_dates = []
+        trade_times = []
+        for index, value in enumerate(trade_time_values):
+            try:
+                trade_date, trade_time = _split_trade_time(value)
+            except (TypeError, ValueError) as exc:
+                reject(index, "tradeTime", str(exc))
+                trade_date = trade_time = None
+            trade_dates.append(trade_date)
+            trade_times.append(trade_time)
+        columns["trade_date"] = trade_dates
+        columns["trade_time"] = trade_times
+
+    if errors:
+        keep = [index for index in range(len(items)) if index not in errors]
+        columns = {name: [values[index] for index in keep] for name, values in columns.items()}
+    return FloorsheetPage(**columns, errors=sorted(errors.values(), key=lambda error: error.index))
+
+
 class FetchListItemSchema(BaseModel):
     ticker: str = Field(..., description="Stock ticker symbol")
     # add default values for date and force to make them optional in the input
     date: str = Field(default=datetime.now().strftime('%Y-%m-%d'), description="Date in YYYY-MM-DD format")
-    force: bool = Field(default=False, description="Force refetch even if data exists")
\ No newline at end of file
+    force: bool = Field(default=False, description="Force refetch even if data exists")
+    incremental: bool = Field(default=False, description="Only fetch contracts newer than the last completed sync")
\ No newline at end of file
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from src.shared.config import settings
+
+
+class TradeDateCache:
+    """Small in-process LRU cache for floorsheet query results, keyed by ``(trade_date, ...)`` tuples.
+
+    Ingestion calls :meth:`invalidate` for every date it writes, which also drops entries
+    keyed on ``None`` (queries across all dates). The TTL bounds staleness when another
+    process (the CLI fetcher) does the writing.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: tuple[Hashable, ...]) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: tuple[Hashable, ...], value: Any, ttl: float | None = None) -> None:
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, trade_date: str | None = None) -> None:
+        """Drop entries for ``trade_date`` and all-date entries; with no date, clear everything."""
+        if trade_date is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[0] in (trade_date, None)]:
+            del self._entries[key]
+
+
+floorsheet_query_cache = TradeDateCache(ttl=settings.floorsheet_cache_ttl)
@@ -2,12 +2,13 @@ import datetime
 from datetime import timedelta, timezone
 
 import sqlalchemy
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
 
 from src.shared.security import decrypt_password, encrypt_password
 
 from .session import Base, engine
+from .types import IsoDate, TimeOfDayMicros
 
 
 nepal_tz = timezone(timedelta(hours=5, minutes=45))
@@ -124,6 +125,8 @@ class Floorsheet(Base):
     __tablename__ = "floorsheet"
     __table_args__ = (
         sqlalchemy.UniqueConstraint("contract_id", "trade_date", name="uq_contract_trade_date"),
+        sqlalchemy.Index("ix_floorsheet_date_script_time", "trade_date", "script_id", "trade_time"),
+        sqlalchemy.Index("ix_floorsheet_date_buyer", "trade_date", "buyer_broker_id"),
     )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -135,8 +138,8 @@ class Floorsheet(Base):
     contract_rate = Column(Float, nullable=False)
     contract_amount = Column(Float, nullable=False)
     trade_book_id = Column(Integer, nullable=False)
-    trade_date = Column(String(50), nullable=False, index=True)
-    trade_time = Column(String(50), nullable=False)
+    trade_date = Column(IsoDate, nullable=False)
+    trade_time = Column(TimeOfDayMicros, nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.datetime.now(nepal_tz), nullable=False)
 
     script = relationship("Scripts", back_populates="floorsheets")
@@ -144,6 +147,138 @@ class Floorsheet(Base):
     seller_broker = relationship("Broker", foreign_keys=[seller_broker_id], back_populates="floorsheets_as_seller")
 
 
+class FloorsheetBrokerDaily(Base):
+    """Per-day totals for one broker on one side of one script, maintained as floorsheet pages land."""
+
+    __tablename__ = "floorsheet_broker_daily"
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint("trade_date", "script_id", "broker_id", "side", name="uq_broker_daily_key"),
+        # Covers date-range broker analytics so they never touch the table rows.
+        sqlalchemy.Index(
+            "ix_broker_daily_range_cover",
+            "trade_date",
+            "broker_id",
+            "script_id",
+            "side",
+            "quantity",
+            "amount",
+            "trades",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    trade_date = Column(IsoDate, nullable=False)
+    script_id = Column(Integer, ForeignKey("script.id"), nullable=False)
+    broker_id = Column(Integer, ForeignKey("broker.id"), nullable=False)
+    side = Column(String(4), nullable=False)  # "buy" or "sell"
+    quantity = Column(Integer, nullable=False)
+    amount = Column(Float, nullable=False)
+    trades = Column(Integer, nullable=False)
+    min_rate = Column(Float, nullable=False)
+    max_rate = Column(Float, nullable=False)
+    first_time = Column(TimeOfDayMicros, nullable=False)
+    last_time = Column(TimeOfDayMicros, nullable=False)
+
+
+class FloorsheetBar(Base):
+    """Intraday OHLCV bar for one script, built from floorsheet contracts as they are ingested.
+
+    ``bucket`` is the bar's start time; the open/close contract keys record which trade set
+    the open and close so bars can be extended with contracts that arrive out of order.
+    """
+
+    __tablename__ = "floorsheet_bar"
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint(
+            "script_id", "interval_minutes", "trade_date", "bucket", name="uq_floorsheet_bar_key"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    script_id = Column(Integer, ForeignKey("script.id"), nullable=False)
+    interval_minutes = Column(Integer, nullable=False)
+    trade_date = Column(IsoDate, nullable=False)
+    bucket = Column(TimeOfDayMicros, nullable=False)
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(Integer, nullable=False)
+    amount = Column(Float, nullable=False)
+    trades = Column(Integer, nullable=False)
+    open_time = Column(TimeOfDayMicros, nullable=False)
+    open_contract_id = Column(Integer, nullable=False)
+    close_time = Column(TimeOfDayMicros, nullable=False)
+    close_contract_id = Column(Integer, nullable=False)
+
+
+class FloorsheetDataVersion(Base):
+    """Counter bumped whenever ingestion writes rows for a (trade_date, script); drives HTTP validators."""
+
+    __tablename__ = "floorsheet_data_version"
+
+    trade_date = Column(IsoDate, primary_key=True)
+    script_id = Column(Integer, ForeignKey("script.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+    # Stored as naive UTC so it can be emitted directly as an HTTP Last-Modified date.
+    updated_at = Column(DateTime, nullable=False)
+
+
+class FloorsheetSyncState(Base):
+    """How far a completed fetch pass has covered a (trade_date, script); incremental syncs resume above it."""
+
+    __tablename__ = "floorsheet_sync_state"
+
+    trade_date = Column(IsoDate, primary_key=True)
+    script_id = Column(Integer, ForeignKey("script.id"), primary_key=True)
+    # Every contract at or below this id was stored by a pass that ran to its end.
+    synced_contract_id = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+
+
+class FloorsheetFetchJob(Base):
+    __tablename__ = "floorsheet_fetch_job"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    source = Column(String(500), nullable=True)
+    status = Column(String(20), nullable=False, default="running")
+    created_at = Column(DateTime, default=lambda: datetime.datetime.now(nepal_tz), nullable=False)
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.datetime.now(nepal_tz),
+        onupdate=lambda: datetime.datetime.now(nepal_tz),
+        nullable=False,
+    )
+
+    items = relationship("FloorsheetFetchJobItem", back_populates="job", cascade="all, delete-orphan")
+
+
+class FloorsheetFetchJobItem(Base):
+    __tablename__ = "floorsheet_fetch_job_item"
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint("job_id", "ticker", "trade_date", name="uq_job_ticker_trade_date"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(Integer, ForeignKey("floorsheet_fetch_job.id"), nullable=False, index=True)
+    ticker = Column(String(255), nullable=False)
+    trade_date = Column(String(50), nullable=False)
+    force = Column(Boolean, nullable=False, default=False)
+    incremental = Column(Boolean, nullable=False, default=False)
+    status = Column(String(20), nullable=False, default="pending")
+    # Number of leading pages whose rows are committed; resume continues from this page.
+    pages_done = Column(Integer, nullable=False, default=0)
+    reason = Column(String(500), nullable=True)
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.datetime.now(nepal_tz),
+        onupdate=lambda: datetime.datetime.now(nepal_tz),
+        nullable=False,
+    )
+
+    job = relationship("FloorsheetFetchJob", back_populates="items")
+
+
 async def create_tables_if_not_exists():
     async with engine.begin() as conn:
         await conn.run_sync(lambda conn: Base.metadata.create_all(conn, checkfirst=True))
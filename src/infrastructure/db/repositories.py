@@ -1,9 +1,36 @@
 from __future__ import annotations
 
-from sqlalchemy import and_, select
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+
+from sqlalchemy import Integer, and_, case, delete, func, literal, or_, select, tuple_, type_coerce, update
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import selectinload
 
-from .models import Broker, Floorsheet, MeroShareUser, ScriptDetails, Scripts, Tracker, User
+from .models import (
+    Broker,
+    Floorsheet,
+    FloorsheetBar,
+    FloorsheetBrokerDaily,
+    FloorsheetDataVersion,
+    FloorsheetFetchJob,
+    FloorsheetFetchJobItem,
+    FloorsheetSyncState,
+    MeroShareUser,
+    ScriptDetails,
+    Scripts,
+    Tracker,
+    User,
+)
+from .types import time_to_micros
+
+
+# SQLite caps bound parameters per statement (32766 since 3.32); keep multi-row statements under it.
+_SQLITE_MAX_VARIABLES = 32766
+_KEY_LOOKUP_BATCH_SIZE = 500
+# Intraday bar widths maintained by FloorsheetBarRepository.
+BAR_INTERVAL_MINUTES = (1, 5, 15)
+_MICROS_PER_MINUTE = 60_000_000
 
 
 class ScriptRepository:
@@ -112,6 +139,28 @@ class BrokerRepository:
             broker.name = name
         return broker
 
+    async def get_id_map(self) -> dict[str, tuple[int, str]]:
+        result = await self.db.execute(select(Broker.member_id, Broker.id, Broker.name))
+        return {member_id: (broker_id, name) for member_id, broker_id, name in result.all()}
+
+    async def upsert_many(self, names_by_member_id: dict[str, str]) -> dict[str, tuple[int, str]]:
+        """Insert or rename brokers in one statement and return their (id, name) by member id."""
+        if not names_by_member_id:
+            return {}
+        stmt = insert(Broker).values(
+            [{"member_id": member_id, "name": name} for member_id, name in names_by_member_id.items()]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Broker.member_id],
+            set_={"name": stmt.excluded.name},
+            where=Broker.name != stmt.excluded.name,
+        )
+        await self.db.execute(stmt)
+        result = await self.db.execute(
+            select(Broker.member_id, Broker.id, Broker.name).filter(Broker.member_id.in_(list(names_by_member_id)))
+        )
+        return {member_id: (broker_id, name) for member_id, broker_id, name in result.all()}
+
 
 class FloorsheetRepository:
     def __init__(self, db):
@@ -121,6 +170,25 @@ class FloorsheetRepository:
         result = await self.db.execute(select(Floorsheet.trade_date).distinct().order_by(Floorsheet.trade_date.desc()))
         return [row[0] for row in result.all()]
 
+    async def company_stats(
+        self, trade_date: str | None = None, date_from: str | None = None, date_to: str | None = None
+    ):
+        """(ticker, trades, turnover) per traded script, grouped in SQL over the (trade_date, script_id) index."""
+        query = (
+            select(
+                Scripts.ticker,
+                func.count(Floorsheet.id).label("trades"),
+                func.sum(Floorsheet.contract_amount).label("turnover"),
+            )
+            .join(Scripts, Floorsheet.script_id == Scripts.id)
+            .group_by(Floorsheet.script_id, Scripts.ticker)
+            .order_by(Scripts.ticker)
+        )
+        filters = self._date_filters(trade_date, date_from, date_to)
+        if filters:
+            query = query.filter(and_(*filters))
+        return (await self.db.execute(query)).all()
+
     async def exists_for_script_and_date(self, script_id: int, trade_date: str) -> bool:
         result = await self.db.execute(
             select(Floorsheet).filter(Floorsheet.script_id == script_id, Floorsheet.trade_date == trade_date)
@@ -130,32 +198,683 @@ class FloorsheetRepository:
     async def get_by_contract_id(self, contract_id: int) -> Floorsheet | None:
         return (await self.db.execute(select(Floorsheet).filter(Floorsheet.contract_id == contract_id))).scalars().first()
 
-    async def query_rows(self, date: str | None = None, ticker: str | None = None):
+    async def existing_contract_keys(self, keys: list[tuple[int, str]]) -> set[tuple[int, str]]:
+        """Return the subset of (contract_id, trade_date) keys already stored."""
+        found: set[tuple[int, str]] = set()
+        for start in range(0, len(keys), _KEY_LOOKUP_BATCH_SIZE):
+            chunk = keys[start:start + _KEY_LOOKUP_BATCH_SIZE]
+            result = await self.db.execute(
+                select(Floorsheet.contract_id, Floorsheet.trade_date).filter(
+                    tuple_(Floorsheet.contract_id, Floorsheet.trade_date).in_(chunk)
+                )
+            )
+            found.update((contract_id, trade_date) for contract_id, trade_date in result.all())
+        return found
+
+    async def upsert_many(self, rows: list[dict]) -> None:
+        """Write rows with multi-row INSERT ... ON CONFLICT (contract_id, trade_date) DO UPDATE."""
+        if not rows:
+            return
+        update_columns = [column for column in rows[0] if column not in ("contract_id", "trade_date")]
+        batch_size = max(1, _SQLITE_MAX_VARIABLES // (len(rows[0]) + 1))
+        for start in range(0, len(rows), batch_size):
+            stmt = insert(Floorsheet).values(rows[start:start + batch_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Floorsheet.contract_id, Floorsheet.trade_date],
+                set_={column: stmt.excluded[column] for column in update_columns},
+            )
+            await self.db.execute(stmt)
+
+    @staticmethod
+    def _date_filters(date: str | None = None, date_from: str | None = None, date_to: str | None = None) -> list:
+        """A single trade date, or an inclusive range; either bound of the range may be open."""
+        if date:
+            return [Floorsheet.trade_date == date]
+        filters = []
+        if date_from:
+            filters.append(Floorsheet.trade_date >= date_from)
+        if date_to:
+            filters.append(Floorsheet.trade_date <= date_to)
+        return filters
+
+    def _joined_rows_query(
+        self,
+        date: str | None = None,
+        ticker: str | None = None,
+        names: list[str] | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        ordered: bool = True,
+    ):
+        """Floorsheet joined with ticker and broker columns; ``names`` selects plain columns instead of entities.
+
+        Rows come in (trade_date, trade_time, contract_id) order unless ``ordered`` is False, which
+        lets aggregations read the date range straight off the index without a sort.
+        """
         buyer_broker = Broker.__table__.alias("buyer_broker")
         seller_broker = Broker.__table__.alias("seller_broker")
+        joined = {
+            "stock_symbol": Scripts.ticker,
+            "buyer_member_id": buyer_broker.c.member_id,
+            "seller_member_id": seller_broker.c.member_id,
+            "buyer_broker_name": buyer_broker.c.name,
+            "seller_broker_name": seller_broker.c.name,
+        }
+        if names is None:
+            selected = [Floorsheet, *(column.label(name) for name, column in joined.items())]
+        else:
+            selected = [(joined[name] if name in joined else getattr(Floorsheet, name)).label(name) for name in names]
         query = (
-            select(
-                Floorsheet,
-                Scripts.ticker.label("stock_symbol"),
-                buyer_broker.c.member_id.label("buyer_member_id"),
-                seller_broker.c.member_id.label("seller_member_id"),
-                buyer_broker.c.name.label("buyer_broker_name"),
-                seller_broker.c.name.label("seller_broker_name"),
-            )
+            select(*selected)
+            .select_from(Floorsheet)
             .join(Scripts, Floorsheet.script_id == Scripts.id)
             .outerjoin(buyer_broker, Floorsheet.buyer_broker_id == buyer_broker.c.id)
             .outerjoin(seller_broker, Floorsheet.seller_broker_id == seller_broker.c.id)
         )
-        filters = []
-        if date:
-            filters.append(Floorsheet.trade_date == date)
+        filters = self._date_filters(date, date_from, date_to)
         if ticker:
             filters.append(Scripts.ticker == ticker)
         if filters:
             query = query.filter(and_(*filters))
-        query = query.order_by(Floorsheet.trade_time.asc())
+        if not ordered:
+            return query
+        return query.order_by(Floorsheet.trade_date.asc(), Floorsheet.trade_time.asc(), Floorsheet.contract_id.asc())
+
+    @staticmethod
+    def _after(query, after: tuple[str, int] | None):
+        """Keyset filter: rows strictly after the (trade_time, contract_id) position."""
+        if after is None:
+            return query
+        trade_time, contract_id = after
+        return query.filter(
+            or_(
+                Floorsheet.trade_time > trade_time,
+                and_(Floorsheet.trade_time == trade_time, Floorsheet.contract_id > contract_id),
+            )
+        )
+
+    async def query_rows(
+        self,
+        date: str | None = None,
+        ticker: str | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+    ):
+        return (await self.db.execute(self._joined_rows_query(date, ticker, date_from=date_from, date_to=date_to))).all()
+
+    async def query_columns(
+        self,
+        names: list[str],
+        date: str | None = None,
+        ticker: str | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+    ) -> dict[str, list]:
+        """Only the requested columns, as one list per column, without hydrating Floorsheet objects."""
+        query = self._joined_rows_query(date, ticker, names, date_from=date_from, date_to=date_to)
+        rows = (await self.db.execute(query)).all()
+        if not rows:
+            return {name: [] for name in names}
+        return {name: list(values) for name, values in zip(names, zip(*rows))}
+
+    async def query_page(
+        self,
+        date: str | None = None,
+        ticker: str | None = None,
+        after: tuple[str, int] | None = None,
+        limit: int = 500,
+    ):
+        """At most ``limit`` joined rows following ``after`` in (trade_time, contract_id) order."""
+        query = self._after(self._joined_rows_query(date, ticker), after).limit(limit)
         return (await self.db.execute(query)).all()
 
+    async def stream_rows(
+        self,
+        date: str | None = None,
+        ticker: str | None = None,
+        after: tuple[str, int] | None = None,
+        batch_size: int = 1000,
+        date_from: str | None = None,
+        date_to: str | None = None,
+    ) -> AsyncIterator[list]:
+        """Yield joined rows in batches from a server-side cursor instead of materialising the day."""
+        query = self._joined_rows_query(date, ticker, date_from=date_from, date_to=date_to)
+        result = await self.db.stream(self._after(query, after).execution_options(yield_per=batch_size))
+        async for batch in result.partitions():
+            yield batch
+
+    async def stream_columns(
+        self,
+        names: list[str],
+        date_from: str | None = None,
+        date_to: str | None = None,
+        ticker: str | None = None,
+        batch_size: int = 5000,
+    ) -> AsyncIterator[list]:
+        """Yield unordered tuples of ``names`` over a date range, for aggregations that fold batch by batch."""
+        query = self._joined_rows_query(None, ticker, names, date_from=date_from, date_to=date_to, ordered=False)
+        result = await self.db.stream(query.execution_options(yield_per=batch_size))
+        async for batch in result.partitions():
+            yield batch
+
+
+class FloorsheetBrokerDailyRepository:
+    """Maintains and reads the per-(trade_date, script, broker, side) aggregates."""
+
+    _SIDES = (("buy", "buyer_broker_id"), ("sell", "seller_broker_id"))
+
+    def __init__(self, db):
+        self.db = db
+
+    async def add_trades(self, rows: list[dict]) -> None:
+        """Fold newly inserted floorsheet rows into the aggregates (rows must not already be counted)."""
+        totals: dict[tuple, list] = {}
+        for row in rows:
+            trade_time = time_to_micros(row["trade_time"])
+            for side, column in self._SIDES:
+                broker_id = row[column]
+                if broker_id is None:
+                    continue
+                key = (row["trade_date"], row["script_id"], broker_id, side)
+                total = totals.get(key)
+                if total is None:
+                    totals[key] = [
+                        row["contract_quantity"],
+                        row["contract_amount"],
+                        1,
+                        row["contract_rate"],
+                        row["contract_rate"],
+                        trade_time,
+                        trade_time,
+                    ]
+                    continue
+                total[0] += row["contract_quantity"]
+                total[1] += row["contract_amount"]
+                total[2] += 1
+                total[3] = min(total[3], row["contract_rate"])
+                total[4] = max(total[4], row["contract_rate"])
+                total[5] = min(total[5], trade_time)
+                total[6] = max(total[6], trade_time)
+        if not totals:
+            return
+
+        values = [
+            {
+                "trade_date": trade_date,
+                "script_id": script_id,
+                "broker_id": broker_id,
+                "side": side,
+                "quantity": quantity,
+                "amount": amount,
+                "trades": trades,
+                "min_rate": min_rate,
+                "max_rate": max_rate,
+                "first_time": first_time,
+                "last_time": last_time,
+            }
+            for (trade_date, script_id, broker_id, side), (
+                quantity,
+                amount,
+                trades,
+                min_rate,
+                max_rate,
+                first_time,
+                last_time,
+            ) in totals.items()
+        ]
+        batch_size = max(1, _SQLITE_MAX_VARIABLES // (len(values[0]) + 1))
+        table = FloorsheetBrokerDaily.__table__
+        for start in range(0, len(values), batch_size):
+            stmt = insert(FloorsheetBrokerDaily).values(values[start:start + batch_size])
+            excluded = stmt.excluded
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.trade_date, table.c.script_id, table.c.broker_id, table.c.side],
+                set_={
+                    "quantity": table.c.quantity + excluded.quantity,
+                    "amount": table.c.amount + excluded.amount,
+                    "trades": table.c.trades + excluded.trades,
+                    "min_rate": func.min(table.c.min_rate, excluded.min_rate),
+                    "max_rate": func.max(table.c.max_rate, excluded.max_rate),
+                    "first_time": func.min(table.c.first_time, excluded.first_time),
+                    "last_time": func.max(table.c.last_time, excluded.last_time),
+                },
+            )
+            await self.db.execute(stmt)
+
+    async def rebuild(self, script_days: set[tuple[str, int]] | None = None, trade_date: str | None = None) -> None:
+        """Recompute aggregates from the raw floorsheet for (trade_date, script_id) pairs, or a whole date."""
+        if script_days is not None and not script_days:
+            return
+        if script_days is not None:
+            scope = [tuple_(Floorsheet.trade_date, Floorsheet.script_id).in_(list(script_days))]
+            target = [tuple_(FloorsheetBrokerDaily.trade_date, FloorsheetBrokerDaily.script_id).in_(list(script_days))]
+        elif trade_date is not None:
+            scope = [Floorsheet.trade_date == trade_date]
+            target = [FloorsheetBrokerDaily.trade_date == trade_date]
+        else:
+            scope, target = [], []
+
+        await self.db.execute(
+            delete(FloorsheetBrokerDaily).filter(*target).execution_options(synchronize_session=False)
+        )
+        columns = [
+            "trade_date",
+            "script_id",
+            "broker_id",
+            "side",
+            "quantity",
+            "amount",
+            "trades",
+            "min_rate",
+            "max_rate",
+            "first_time",
+            "last_time",
+        ]
+        for side, column in self._SIDES:
+            broker_column = getattr(Floorsheet, column)
+            totals = (
+                select(
+                    Floorsheet.trade_date,
+                    Floorsheet.script_id,
+                    broker_column,
+                    literal(side),
+                    func.sum(Floorsheet.contract_quantity),
+                    func.sum(Floorsheet.contract_amount),
+                    func.count(),
+                    func.min(Floorsheet.contract_rate),
+                    func.max(Floorsheet.contract_rate),
+                    func.min(Floorsheet.trade_time),
+                    func.max(Floorsheet.trade_time),
+                )
+                .filter(broker_column.is_not(None), *scope)
+                .group_by(Floorsheet.trade_date, Floorsheet.script_id, broker_column)
+            )
+            await self.db.execute(insert(FloorsheetBrokerDaily).from_select(columns, totals))
+
+    async def list_broker_sides(self, trade_date: str, ticker: str | None = None):
+        """One row per (broker, side) for a date, summed across scripts unless a ticker is given."""
+        query = (
+            select(
+                FloorsheetBrokerDaily.side,
+                Broker.member_id,
+                Broker.name,
+                func.sum(FloorsheetBrokerDaily.quantity).label("quantity"),
+                func.sum(FloorsheetBrokerDaily.amount).label("amount"),
+                func.sum(FloorsheetBrokerDaily.trades).label("trades"),
+                func.min(FloorsheetBrokerDaily.min_rate).label("min_rate"),
+                func.max(FloorsheetBrokerDaily.max_rate).label("max_rate"),
+                func.min(FloorsheetBrokerDaily.first_time).label("first_time"),
+                func.max(FloorsheetBrokerDaily.last_time).label("last_time"),
+            )
+            .join(Broker, FloorsheetBrokerDaily.broker_id == Broker.id)
+            .filter(FloorsheetBrokerDaily.trade_date == trade_date)
+            .group_by(FloorsheetBrokerDaily.side, FloorsheetBrokerDaily.broker_id, Broker.member_id, Broker.name)
+            .order_by(FloorsheetBrokerDaily.side, func.sum(FloorsheetBrokerDaily.quantity).desc())
+        )
+        if ticker:
+            query = query.join(Scripts, FloorsheetBrokerDaily.script_id == Scripts.id).filter(Scripts.ticker == ticker)
+        return (await self.db.execute(query)).all()
+
+    async def net_positions(
+        self,
+        date_from: str,
+        date_to: str,
+        ticker: str | None = None,
+        broker: str | None = None,
+        rank_by: str | None = None,
+        accumulating: bool = True,
+        limit: int | None = None,
+    ):
+        """Buy/sell totals per (broker, script) over an inclusive date range.
+
+        With ``rank_by`` ("quantity" or "amount"), only net buyers (``accumulating``) or net
+        sellers are returned, largest net position first.
+        """
+        daily = FloorsheetBrokerDaily
+        is_buy = daily.side == "buy"
+        buy_quantity = func.sum(case((is_buy, daily.quantity), else_=0))
+        sell_quantity = func.sum(case((is_buy, 0), else_=daily.quantity))
+        buy_amount = func.sum(case((is_buy, daily.amount), else_=0.0))
+        sell_amount = func.sum(case((is_buy, 0.0), else_=daily.amount))
+        query = (
+            select(
+                Broker.member_id,
+                Broker.name,
+                Scripts.ticker,
+                buy_quantity.label("buy_quantity"),
+                sell_quantity.label("sell_quantity"),
+                buy_amount.label("buy_amount"),
+                sell_amount.label("sell_amount"),
+                func.sum(daily.trades).label("trades"),
+            )
+            .join(Broker, daily.broker_id == Broker.id)
+            .join(Scripts, daily.script_id == Scripts.id)
+            .filter(daily.trade_date >= date_from, daily.trade_date <= date_to)
+            .group_by(daily.broker_id, daily.script_id, Broker.member_id, Broker.name, Scripts.ticker)
+        )
+        if ticker:
+            query = query.filter(Scripts.ticker == ticker)
+        if broker:
+            query = query.filter(Broker.member_id == broker)
+        if rank_by is None:
+            query = query.order_by(Scripts.ticker, Broker.member_id)
+        else:
+            net = (buy_quantity - sell_quantity) if rank_by == "quantity" else (buy_amount - sell_amount)
+            query = query.having(net > 0 if accumulating else net < 0).order_by(net.desc() if accumulating else net.asc())
+        if limit is not None:
+            query = query.limit(limit)
+        return (await self.db.execute(query)).all()
+
+
+class FloorsheetBarRepository:
+    """Maintains and reads intraday OHLCV bars for every width in BAR_INTERVAL_MINUTES."""
+
+    _COLUMNS = [
+        "trade_date",
+        "script_id",
+        "interval_minutes",
+        "bucket",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+        "amount",
+        "trades",
+        "open_time",
+        "open_contract_id",
+        "close_time",
+        "close_contract_id",
+    ]
+
+    def __init__(self, db):
+        self.db = db
+
+    async def add_trades(self, rows: list[dict]) -> None:
+        """Fold newly inserted floorsheet rows into their bars (rows must not already be counted)."""
+        bars: dict[tuple, list] = {}
+        for row in rows:
+            trade_time = time_to_micros(row["trade_time"])
+            rate = row["contract_rate"]
+            order_key = (trade_time, row["contract_id"])
+            for minutes in BAR_INTERVAL_MINUTES:
+                width = minutes * _MICROS_PER_MINUTE
+                key = (row["trade_date"], row["script_id"], minutes, trade_time // width * width)
+                bar = bars.get(key)
+                if bar is None:
+                    quantity, amount = row["contract_quantity"], row["contract_amount"]
+                    bars[key] = [rate, rate, rate, rate, quantity, amount, 1, order_key, order_key]
+                    continue
+                if order_key < bar[7]:
+                    bar[0], bar[7] = rate, order_key
+                if order_key > bar[8]:
+                    bar[3], bar[8] = rate, order_key
+                bar[1] = max(bar[1], rate)
+                bar[2] = min(bar[2], rate)
+                bar[4] += row["contract_quantity"]
+                bar[5] += row["contract_amount"]
+                bar[6] += 1
+        if not bars:
+            return
+
+        values = [
+            dict(
+                zip(
+                    self._COLUMNS,
+                    (*key, open_, high, low, close, volume, amount, trades, *open_key, *close_key),
+                )
+            )
+            for key, (open_, high, low, close, volume, amount, trades, open_key, close_key) in bars.items()
+        ]
+        table = FloorsheetBar.__table__
+        batch_size = max(1, _SQLITE_MAX_VARIABLES // (len(self._COLUMNS) + 1))
+        for start in range(0, len(values), batch_size):
+            stmt = insert(FloorsheetBar).values(values[start:start + batch_size])
+            excluded = stmt.excluded
+            # SET expressions all read the pre-update row, so each CASE compares against the old keys.
+            opens_earlier = or_(
+                excluded.open_time < table.c.open_time,
+                and_(excluded.open_time == table.c.open_time, excluded.open_contract_id < table.c.open_contract_id),
+            )
+            closes_later = or_(
+                excluded.close_time > table.c.close_time,
+                and_(excluded.close_time == table.c.close_time, excluded.close_contract_id > table.c.close_contract_id),
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.script_id, table.c.interval_minutes, table.c.trade_date, table.c.bucket],
+                set_={
+                    "open": case((opens_earlier, excluded.open), else_=table.c.open),
+                    "open_time": case((opens_earlier, excluded.open_time), else_=table.c.open_time),
+                    "open_contract_id": case((opens_earlier, excluded.open_contract_id), else_=table.c.open_contract_id),
+                    "close": case((closes_later, excluded.close), else_=table.c.close),
+                    "close_time": case((closes_later, excluded.close_time), else_=table.c.close_time),
+                    "close_contract_id": case(
+                        (closes_later, excluded.close_contract_id), else_=table.c.close_contract_id
+                    ),
+                    "high": func.max(table.c.high, excluded.high),
+                    "low": func.min(table.c.low, excluded.low),
+                    "volume": table.c.volume + excluded.volume,
+                    "amount": table.c.amount + excluded.amount,
+                    "trades": table.c.trades + excluded.trades,
+                },
+            )
+            await self.db.execute(stmt)
+
+    async def rebuild(self, script_days: set[tuple[str, int]] | None = None, trade_date: str | None = None) -> None:
+        """Recompute bars from the raw floorsheet for (trade_date, script_id) pairs, or a whole date."""
+        if script_days is not None and not script_days:
+            return
+        if script_days is not None:
+            scope = [tuple_(Floorsheet.trade_date, Floorsheet.script_id).in_(list(script_days))]
+            target = [tuple_(FloorsheetBar.trade_date, FloorsheetBar.script_id).in_(list(script_days))]
+        elif trade_date is not None:
+            scope = [Floorsheet.trade_date == trade_date]
+            target = [FloorsheetBar.trade_date == trade_date]
+        else:
+            scope, target = [], []
+
+        await self.db.execute(delete(FloorsheetBar).filter(*target).execution_options(synchronize_session=False))
+        trade_time = type_coerce(Floorsheet.trade_time, Integer)
+        for minutes in BAR_INTERVAL_MINUTES:
+            width = minutes * _MICROS_PER_MINUTE
+            bucket = trade_time // width * width
+            partition = [Floorsheet.trade_date, Floorsheet.script_id, bucket]
+            trades = (
+                select(
+                    Floorsheet.trade_date,
+                    Floorsheet.script_id,
+                    bucket.label("bucket"),
+                    trade_time.label("trade_time"),
+                    Floorsheet.contract_id,
+                    Floorsheet.contract_rate,
+                    Floorsheet.contract_quantity,
+                    Floorsheet.contract_amount,
+                    func.row_number()
+                    .over(partition_by=partition, order_by=[trade_time, Floorsheet.contract_id])
+                    .label("from_open"),
+                    func.row_number()
+                    .over(partition_by=partition, order_by=[trade_time.desc(), Floorsheet.contract_id.desc()])
+                    .label("from_close"),
+                )
+                .filter(*scope)
+                .subquery()
+            )
+            is_open, is_close = trades.c.from_open == 1, trades.c.from_close == 1
+            bars = select(
+                trades.c.trade_date,
+                trades.c.script_id,
+                literal(minutes),
+                trades.c.bucket,
+                func.max(case((is_open, trades.c.contract_rate))),
+                func.max(trades.c.contract_rate),
+                func.min(trades.c.contract_rate),
+                func.max(case((is_close, trades.c.contract_rate))),
+                func.sum(trades.c.contract_quantity),
+                func.sum(trades.c.contract_amount),
+                func.count(),
+                func.max(case((is_open, trades.c.trade_time))),
+                func.max(case((is_open, trades.c.contract_id))),
+                func.max(case((is_close, trades.c.trade_time))),
+                func.max(case((is_close, trades.c.contract_id))),
+            ).group_by(trades.c.trade_date, trades.c.script_id, trades.c.bucket)
+            await self.db.execute(insert(FloorsheetBar).from_select(self._COLUMNS, bars))
+
+    async def list_bars(
+        self,
+        ticker: str,
+        interval_minutes: int,
+        date_from: str,
+        date_to: str,
+    ) -> list[FloorsheetBar]:
+        """Bars for one script over an inclusive date range, in time order, read along the unique key."""
+        query = (
+            select(FloorsheetBar)
+            .join(Scripts, FloorsheetBar.script_id == Scripts.id)
+            .filter(
+                Scripts.ticker == ticker,
+                FloorsheetBar.interval_minutes == interval_minutes,
+                FloorsheetBar.trade_date >= date_from,
+                FloorsheetBar.trade_date <= date_to,
+            )
+            .order_by(FloorsheetBar.trade_date, FloorsheetBar.bucket)
+        )
+        return list((await self.db.execute(query)).scalars().all())
+
+
+class FloorsheetDataVersionRepository:
+    def __init__(self, db):
+        self.db = db
+
+    async def bump(self, script_days: set[tuple[str, int]]) -> None:
+        """Advance the data version of every (trade_date, script_id) written in this transaction."""
+        if not script_days:
+            return
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        table = FloorsheetDataVersion.__table__
+        stmt = insert(FloorsheetDataVersion).values(
+            [
+                {"trade_date": trade_date, "script_id": script_id, "version": 1, "updated_at": now}
+                for trade_date, script_id in sorted(script_days)
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.trade_date, table.c.script_id],
+            set_={"version": table.c.version + 1, "updated_at": stmt.excluded.updated_at},
+        )
+        await self.db.execute(stmt)
+
+    async def get(self, trade_date: str, ticker: str | None = None) -> tuple[int, datetime | None]:
+        """(version, last modified in UTC) for a date, or one ticker on it; (0, None) when nothing was ingested.
+
+        Across a whole date the version is the sum of per-script counters, which still moves on every bump.
+        """
+        query = select(
+            func.coalesce(func.sum(FloorsheetDataVersion.version), 0),
+            func.max(FloorsheetDataVersion.updated_at),
+        ).filter(FloorsheetDataVersion.trade_date == trade_date)
+        if ticker:
+            query = query.join(Scripts, FloorsheetDataVersion.script_id == Scripts.id).filter(Scripts.ticker == ticker)
+        version, updated_at = (await self.db.execute(query)).one()
+        return int(version), updated_at.replace(tzinfo=timezone.utc) if updated_at else None
+
+
+class FloorsheetSyncStateRepository:
+    def __init__(self, db):
+        self.db = db
+
+    async def get_synced_contract_id(self, script_id: int, trade_date: str) -> int | None:
+        result = await self.db.execute(
+            select(FloorsheetSyncState.synced_contract_id).filter(
+                FloorsheetSyncState.script_id == script_id, FloorsheetSyncState.trade_date == trade_date
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def mark_synced(self, script_id: int, trade_date: str, contract_id: int) -> None:
+        """Record that a pass covered every contract up to contract_id; the watermark never moves back."""
+        table = FloorsheetSyncState.__table__
+        stmt = insert(FloorsheetSyncState).values(
+            trade_date=trade_date,
+            script_id=script_id,
+            synced_contract_id=contract_id,
+            updated_at=datetime.now(timezone.utc).replace(tzinfo=None),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.trade_date, table.c.script_id],
+            set_={
+                "synced_contract_id": func.max(table.c.synced_contract_id, stmt.excluded.synced_contract_id),
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        await self.db.execute(stmt)
+
+
+class FloorsheetFetchJobRepository:
+    def __init__(self, db):
+        self.db = db
+
+    async def create(self, items: list[dict], source: str | None = None) -> FloorsheetFetchJob:
+        job = FloorsheetFetchJob(source=source, status="running")
+        job.items = [FloorsheetFetchJobItem(**item) for item in items]
+        self.db.add(job)
+        await self.db.flush()
+        return job
+
+    async def get_by_id(self, job_id: int) -> FloorsheetFetchJob | None:
+        return (await self.db.execute(select(FloorsheetFetchJob).filter(FloorsheetFetchJob.id == job_id))).scalars().first()
+
+    async def get_latest_unfinished(self) -> FloorsheetFetchJob | None:
+        query = (
+            select(FloorsheetFetchJob)
+            .filter(FloorsheetFetchJob.status != "done")
+            .order_by(FloorsheetFetchJob.id.desc())
+        )
+        return (await self.db.execute(query)).scalars().first()
+
+    async def list_unfinished_items(self, job_id: int) -> list[FloorsheetFetchJobItem]:
+        query = (
+            select(FloorsheetFetchJobItem)
+            .filter(
+                FloorsheetFetchJobItem.job_id == job_id,
+                FloorsheetFetchJobItem.status.notin_(["done", "skipped"]),
+            )
+            .order_by(FloorsheetFetchJobItem.id)
+        )
+        return (await self.db.execute(query)).scalars().all()
+
+    async def get_pages_done(self, item_id: int) -> int:
+        result = await self.db.execute(
+            select(FloorsheetFetchJobItem.pages_done).filter(FloorsheetFetchJobItem.id == item_id)
+        )
+        return result.scalar_one()
+
+    async def advance_checkpoint(self, item_id: int, page: int) -> None:
+        """Record page as committed, only if every earlier page already is."""
+        await self.db.execute(
+            update(FloorsheetFetchJobItem)
+            .where(FloorsheetFetchJobItem.id == item_id, FloorsheetFetchJobItem.pages_done == page)
+            .values(pages_done=page + 1)
+        )
+
+    async def set_item_status(self, item_id: int, status: str, reason: str | None = None) -> None:
+        await self.db.execute(
+            update(FloorsheetFetchJobItem)
+            .where(FloorsheetFetchJobItem.id == item_id)
+            .values(status=status, reason=reason)
+        )
+
+    async def count_unfinished_items(self, job_id: int) -> int:
+        result = await self.db.execute(
+            select(func.count()).filter(
+                FloorsheetFetchJobItem.job_id == job_id,
+                FloorsheetFetchJobItem.status.notin_(["done", "skipped"]),
+            )
+        )
+        return result.scalar_one()
+
+    async def set_job_status(self, job_id: int, status: str) -> None:
+        await self.db.execute(update(FloorsheetFetchJob).where(FloorsheetFetchJob.id == job_id).values(status=status))
+
 
 class MeroShareUserRepository:
     def __init__(self, db):
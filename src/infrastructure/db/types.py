@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import datetime
+
+from sqlalchemy import Date, Integer
+from sqlalchemy.types import TypeDecorator
+
+
+MICROS_PER_SECOND = 1_000_000
+
+
+def time_to_micros(value: str) -> int:
+    """'HH:MM:SS[.ffffff]' -> microseconds since midnight."""
+    hours, minutes, rest = value.split(":")
+    seconds, _, fraction = rest.partition(".")
+    return ((int(hours) * 60 + int(minutes)) * 60 + int(seconds)) * MICROS_PER_SECOND + int(fraction.ljust(6, "0")[:6])
+
+
+def micros_to_time(value: int) -> str:
+    """Microseconds since midnight -> 'HH:MM:SS.ffffff'."""
+    seconds, micros = divmod(value, MICROS_PER_SECOND)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{micros:06d}"
+
+
+class IsoDate(TypeDecorator):
+    """DATE column that the application reads and writes as 'YYYY-MM-DD' strings."""
+
+    impl = Date
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, str):
+            return datetime.date.fromisoformat(value)
+        return value
+
+    def process_result_value(self, value, dialect):
+        return value.isoformat() if value is not None else None
+
+
+class TimeOfDayMicros(TypeDecorator):
+    """Integer microseconds since midnight, read and written as 'HH:MM:SS.ffffff' strings.
+
+    Integers keep the column small and make time ordering a plain integer comparison.
+    """
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, str):
+            return time_to_micros(value)
+        return value
+
+    def process_result_value(self, value, dialect):
+        return micros_to_time(value) if value is not None else None
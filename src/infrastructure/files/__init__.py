@@ -0,0 +1,2 @@
+from .floorsheet_archive import FLOORSHEET_ARCHIVE_COLUMNS, FLOORSHEET_ARCHIVE_SCHEMA, FloorsheetArchive
+from .landing import RawPayloadStore
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+
+
+_DICTIONARY_STRING = pa.dictionary(pa.int32(), pa.string())
+
+FLOORSHEET_ARCHIVE_SCHEMA = pa.schema(
+    [
+        ("contract_id", pa.int64()),
+        ("stock_symbol", _DICTIONARY_STRING),
+        ("buyer_member_id", _DICTIONARY_STRING),
+        ("seller_member_id", _DICTIONARY_STRING),
+        ("buyer_broker_name", _DICTIONARY_STRING),
+        ("seller_broker_name", _DICTIONARY_STRING),
+        ("contract_quantity", pa.int64()),
+        ("contract_rate", pa.float64()),
+        ("contract_amount", pa.float64()),
+        ("trade_date", pa.string()),
+        ("trade_time", pa.string()),
+    ]
+)
+FLOORSHEET_ARCHIVE_COLUMNS = FLOORSHEET_ARCHIVE_SCHEMA.names
+
+_COMPLETE_MARKER = "_SUCCESS"
+
+
+class FloorsheetArchive:
+    """Columnar floorsheet history as Arrow IPC files, one per trade date and ticker.
+
+    Layout: ``<root>/trade_date=<YYYY-MM-DD>/ticker=<TICKER>.arrow``. Files are written
+    uncompressed so reads can memory-map them without copying; a ``_SUCCESS`` marker is
+    written last, and dates without it are treated as not archived.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def date_dir(self, trade_date: str) -> Path:
+        return self.root / f"trade_date={trade_date}"
+
+    def has_date(self, trade_date: str) -> bool:
+        return (self.date_dir(trade_date) / _COMPLETE_MARKER).exists()
+
+    def list_dates(self) -> list[str]:
+        if not self.root.exists():
+            return []
+        return sorted(
+            path.name.partition("=")[2]
+            for path in self.root.iterdir()
+            if path.name.startswith("trade_date=") and (path / _COMPLETE_MARKER).exists()
+        )
+
+    def list_tickers(self, trade_date: str) -> list[str]:
+        return sorted(path.stem.partition("=")[2] for path in self.date_dir(trade_date).glob("ticker=*.arrow"))
+
+    def write_date(self, trade_date: str, columns: dict[str, list[Any]]) -> int:
+        """Replace the archive for a trade date with the given rows; returns the row count."""
+        table = pa.table(
+            {name: pa.array(columns[name]) for name in FLOORSHEET_ARCHIVE_COLUMNS}
+        ).cast(FLOORSHEET_ARCHIVE_SCHEMA)
+        date_dir = self.date_dir(trade_date)
+        date_dir.mkdir(parents=True, exist_ok=True)
+        (date_dir / _COMPLETE_MARKER).unlink(missing_ok=True)
+        for stale in date_dir.glob("ticker=*.arrow"):
+            stale.unlink()
+
+        for ticker in pc.unique(table["stock_symbol"].cast(pa.string())).to_pylist():
+            ticker_table = table.filter(pc.equal(table["stock_symbol"].cast(pa.string()), ticker))
+            ticker_table = ticker_table.sort_by([("trade_time", "ascending"), ("contract_id", "ascending")])
+            self._write_table(date_dir / f"ticker={ticker}.arrow", ticker_table)
+
+        (date_dir / _COMPLETE_MARKER).touch()
+        return table.num_rows
+
+    def invalidate(self, trade_date: str) -> None:
+        """Mark a date as stale after new rows were ingested for it, until it is exported again."""
+        (self.date_dir(trade_date) / _COMPLETE_MARKER).unlink(missing_ok=True)
+
+    def read(self, trade_date: str, ticker: str | None = None, columns: list[str] | None = None) -> pa.Table:
+        """Memory-map the archived rows for a date (optionally one ticker), ordered by trade time."""
+        date_dir = self.date_dir(trade_date)
+        paths = [date_dir / f"ticker={ticker}.arrow"] if ticker else sorted(date_dir.glob("ticker=*.arrow"))
+        tables = [self._read_table(path) for path in paths if path.exists()]
+        if not tables:
+            table = FLOORSHEET_ARCHIVE_SCHEMA.empty_table()
+        elif len(tables) == 1:
+            table = tables[0]
+        else:
+            table = pa.concat_tables(tables).unify_dictionaries()
+            table = table.sort_by([("trade_time", "ascending"), ("contract_id", "ascending")])
+        return table.select(columns) if columns else table
+
+    def _write_table(self, path: Path, table: pa.Table) -> None:
+        tmp_path = path.with_suffix(".arrow.tmp")
+        with pa.OSFile(str(tmp_path), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    def _read_table(self, path: Path) -> pa.Table:
+        with pa.memory_map(str(path), "r") as source:
+            return ipc.open_file(source).read_all()
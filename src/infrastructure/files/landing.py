@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+
+from src.shared.time import nepal_now
+
+
+class RawPayloadStore:
+    """Landing zone for raw NEPSE responses, stored as gzip NDJSON per endpoint and business date.
+
+    Layout: ``<root>/<endpoint>/business_date=<YYYY-MM-DD>/<started>-<pid>.ndjson.gz``. Every
+    write appends one gzip member holding one line, so a crash never corrupts earlier pages and
+    each process writes its own file.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._file_name = f"{nepal_now().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}.ndjson.gz"
+        self._lock = threading.Lock()
+
+    def partition_dir(self, endpoint: str, business_date: str) -> Path:
+        return self.root / endpoint / f"business_date={business_date}"
+
+    def write(self, endpoint: str, business_date: str, params: dict[str, Any], payload: Any) -> None:
+        record = {"fetched_at": nepal_now().isoformat(), "params": params, "payload": payload}
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        partition = self.partition_dir(endpoint, business_date)
+        with self._lock:
+            partition.mkdir(parents=True, exist_ok=True)
+            with gzip.open(partition / self._file_name, "at", encoding="utf-8") as handle:
+                handle.write(line)
+
+    def list_dates(self, endpoint: str) -> list[str]:
+        endpoint_dir = self.root / endpoint
+        if not endpoint_dir.exists():
+            return []
+        return sorted(
+            path.name.partition("=")[2]
+            for path in endpoint_dir.iterdir()
+            if path.is_dir() and path.name.startswith("business_date=")
+        )
+
+    def iter_records(self, endpoint: str, business_date: str) -> Iterator[dict[str, Any]]:
+        """Stream landed records for one partition, oldest file first."""
+        for path in sorted(self.partition_dir(endpoint, business_date).glob("*.ndjson.gz")):
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                for line in handle:
+                    if line.strip():
+                        yield json.loads(line)
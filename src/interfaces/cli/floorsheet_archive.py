@@ -0,0 +1,37 @@
+"""
+Export finished floorsheet trade dates to the columnar archive.
+
+Usage: python -m src.interfaces.cli.floorsheet_archive [--dates D [D ...]] [--overwrite]
+"""
+import argparse
+import asyncio
+import logging
+
+from src.infrastructure.db.session import SessionLocal
+from src.modules.market_data import FloorsheetArchiveService
+from src.shared.logging import configure_logging
+
+
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compact floorsheet history into the columnar archive")
+    parser.add_argument("--dates", type=str, nargs="+", help="Trade dates in YYYY-MM-DD format (default: all closed dates)")
+    parser.add_argument("--overwrite", action="store_true", help="Re-export dates that are already archived")
+
+    args = parser.parse_args()
+
+    async with SessionLocal() as db:
+        service = FloorsheetArchiveService(db)
+        if args.dates:
+            for trade_date in args.dates:
+                logger.info("Archived trade_date=%s rows=%s", trade_date, await service.export_date(trade_date))
+        else:
+            exported = await service.export_closed_dates(overwrite=args.overwrite)
+            logger.info("Archived %s trade dates: %s", len(exported), exported)
+
+
+if __name__ == "__main__":
+    configure_logging()
+    asyncio.run(main())
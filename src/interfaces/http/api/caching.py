@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+from src.infrastructure.cache import TradeDateCache, floorsheet_query_cache
+from src.interfaces.http.api.responses import FastJSONResponse, dumps
+from src.shared.time import nepal_now
+
+
+# Bump when the JSON shape of a floorsheet endpoint changes so clients drop old validators.
+_REPRESENTATION_VERSION = 1
+CLOSED_DATE_CACHE_CONTROL = "public, max-age=86400"
+OPEN_DATE_CACHE_CONTROL = "no-cache"
+# Serialized bodies of closed dates are kept server-side for a day.
+_RESPONSE_CACHE_TTL = 24 * 60 * 60
+
+
+class FloorsheetValidators:
+    """ETag / Last-Modified / Cache-Control for one trade date (optionally one ticker)."""
+
+    def __init__(
+        self,
+        trade_date: str,
+        ticker: str | None,
+        version: int,
+        last_modified: datetime | None,
+        variant: str | None = None,
+    ):
+        self.trade_date = trade_date
+        self.closed = trade_date < nepal_now().strftime("%Y-%m-%d")
+        # Each negotiated media type gets its own tag; JSON keeps the unsuffixed one.
+        representation = f"{_REPRESENTATION_VERSION}-{variant}" if variant else f"{_REPRESENTATION_VERSION}"
+        self.etag = f'W/"fs{representation}-{trade_date}-{ticker or "all"}-{version}"'
+        self.version = version
+        self.last_modified = last_modified
+
+    @property
+    def headers(self) -> dict[str, str]:
+        # Version 0 means nothing was ingested yet; a later backfill must not be hidden behind a day-long max-age.
+        cacheable = self.closed and self.version > 0
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": CLOSED_DATE_CACHE_CONTROL if cacheable else OPEN_DATE_CACHE_CONTROL,
+        }
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def not_modified(self, request: Request) -> bool:
+        """RFC 9110 evaluation order: If-None-Match wins; If-Modified-Since only applies without it."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip() for tag in if_none_match.split(",")}
+            return "*" in tags or self.etag in tags or self.etag.removeprefix("W/") in tags
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return self.last_modified.replace(microsecond=0) <= since
+        return False
+
+
+async def conditional_response(
+    request: Request,
+    validators: FloorsheetValidators,
+    render: Callable[[], Awaitable[bytes]],
+    media_type: str,
+    headers: dict[str, str] | None = None,
+    cache: TradeDateCache = floorsheet_query_cache,
+) -> Response:
+    """Serve the body from ``render()`` with validators, 304s, and a server-side cache for closed dates."""
+    headers = {**validators.headers, **(headers or {})}
+    if validators.not_modified(request):
+        return Response(status_code=304, headers=headers)
+
+    cache_key = (validators.trade_date, "response", request.url.path, str(request.url.query), validators.etag)
+    body = cache.get(cache_key) if validators.closed else None
+    if body is None:
+        body = await render()
+        if validators.closed:
+            cache.set(cache_key, body, ttl=_RESPONSE_CACHE_TTL)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+async def conditional_json(
+    request: Request,
+    validators: FloorsheetValidators | None,
+    compute: Callable[[], Awaitable[dict]],
+    headers: dict[str, str] | None = None,
+    cache: TradeDateCache = floorsheet_query_cache,
+) -> Response:
+    """Serve ``compute()`` as JSON with validators, 304s, and a server-side body cache for closed dates."""
+    if validators is None:
+        return FastJSONResponse(await compute(), headers=headers)
+
+    async def render() -> bytes:
+        return dumps(await compute())
+
+    return await conditional_response(request, validators, render, "application/json", headers=headers, cache=cache)
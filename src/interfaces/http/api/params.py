@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import date
+
+from fastapi import HTTPException
+
+
+def parse_date(value: str) -> str:
+    """Validate a single YYYY-MM-DD trade date, raising 400 for anything else."""
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="date must be YYYY-MM-DD")
+
+
+def parse_date_range(date_from: str, date_to: str) -> tuple[str, str]:
+    """Validate an inclusive YYYY-MM-DD range, raising 400 for bad dates or reversed bounds."""
+    try:
+        start, end = date.fromisoformat(date_from), date.fromisoformat(date_to)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="date_from and date_to must be YYYY-MM-DD")
+    if start > end:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    return start.isoformat(), end.isoformat()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any
+
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _column_values(series: pd.Series, fill: Any) -> list:
+    if series.dtype.kind == "M":
+        series = series.astype(str).where(series.notna(), None)
+    elif series.dtype == object:
+        series = series.map(lambda value: str(value) if isinstance(value, (date, datetime)) else value, na_action="ignore")
+    if series.hasnans:
+        series = series.fillna(fill) if fill is not None else series.astype(object).where(series.notna(), None)
+    return series.tolist()
+
+
+def records(frame: pd.DataFrame, fill: Any = None) -> list[dict]:
+    """Row dicts for a DataFrame, converted a column at a time rather than cell by cell.
+
+    Dates render as ``astype(str)`` would (date-only when every time is midnight) and missing cells
+    become ``fill``, so routes hand frames over as they come from the service.
+    """
+    keys = list(frame.columns)
+    columns = [_column_values(series, fill) for _, series in frame.items()]
+    return [dict(zip(keys, row)) for row in zip(*columns)]
+
+
+def _default(value: Any) -> Any:
+    """Types orjson does not encode natively; NaN/NaT/NA all become null."""
+    if isinstance(value, pd.DataFrame):
+        return records(value)
+    if isinstance(value, pd.Series):
+        return value.tolist()
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize API payloads with orjson; DataFrames become record arrays with full float precision."""
+    return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson; accepts numpy values, datetimes and DataFrames."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
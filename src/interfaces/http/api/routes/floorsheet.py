@@ -1,53 +1,267 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query, Request
-from fastapi.responses import JSONResponse
+import asyncio
+from typing import Literal
 
-from src.modules.market_data import FloorsheetQueryService
+import pyarrow as pa
+import pyarrow.ipc as ipc
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
-router = APIRouter(prefix="/api/floorsheet", tags=["floorsheet"])
+from src.infrastructure.db import get_db
+from src.interfaces.http.api.caching import FloorsheetValidators, conditional_json, conditional_response
+from src.interfaces.http.api.params import parse_date, parse_date_range
+from src.interfaces.http.api.responses import FastJSONResponse, dumps
+from src.modules.market_data import (
+    BROKER_RANKING_MAX_LIMIT,
+    FLOORSHEET_MAX_PAGE_LIMIT,
+    FLOORSHEET_PAGE_LIMIT,
+    FloorsheetQueryService,
+    decode_floorsheet_cursor,
+)
+
+
+router = APIRouter(prefix="/api/floorsheet", tags=["floorsheet"], default_response_class=FastJSONResponse)
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# /data picks its representation from Accept, so shared caches must key on it.
+_VARY_ACCEPT = {"Vary": "Accept"}
 
 
 async def get_service(request: Request) -> FloorsheetQueryService:
     return FloorsheetQueryService(request.state.db)
 
 
+async def _validators(
+    service: FloorsheetQueryService, date: str | None, ticker: str | None = None, variant: str | None = None
+) -> FloorsheetValidators | None:
+    # Responses spanning every date have no single data version to validate against.
+    if not date:
+        return None
+    version, last_modified = await service.get_data_version(date, ticker)
+    return FloorsheetValidators(date, ticker, version, last_modified, variant=variant)
+
+
+def _negotiate_format(request: Request, format: str | None) -> str:
+    """Explicit ``format`` wins; otherwise the first binary or streaming type named in Accept."""
+    if format:
+        return format
+    accept = request.headers.get("accept", "")
+    if ARROW_STREAM_MEDIA_TYPE in accept:
+        return "arrow"
+    if NDJSON_MEDIA_TYPE in accept:
+        return "ndjson"
+    return "json"
+
+
+def _arrow_ipc_bytes(table: pa.Table) -> bytes:
+    sink = pa.BufferOutputStream()
+    with ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _optional_date_range(
+    date: str | None, date_from: str | None, date_to: str | None
+) -> tuple[str | None, str | None]:
+    if date_from is None and date_to is None:
+        return None, None
+    if date or date_from is None or date_to is None:
+        raise HTTPException(status_code=400, detail="Pass either date, or both date_from and date_to")
+    return parse_date_range(date_from, date_to)
+
+
+def _optional_date(date: str | None) -> str | None:
+    return parse_date(date) if date else date
+
+
 @router.get("/dates")
 async def get_available_dates(service: FloorsheetQueryService = Depends(get_service)):
-    return JSONResponse(await service.get_available_dates())
+    return FastJSONResponse(await service.get_available_dates())
 
 
 @router.get("/companies")
 async def get_available_companies(
+    request: Request,
     date: str | None = Query(None, description="Filter by trade date"),
+    date_from: str | None = Query(None, description="First trade date (YYYY-MM-DD), inclusive"),
+    date_to: str | None = Query(None, description="Last trade date (YYYY-MM-DD), inclusive"),
     service: FloorsheetQueryService = Depends(get_service),
 ):
-    return JSONResponse(await service.get_companies(date=date))
+    date = _optional_date(date)
+    date_from, date_to = _optional_date_range(date, date_from, date_to)
+    return await conditional_json(
+        request,
+        await _validators(service, date),
+        lambda: service.get_companies(date=date, date_from=date_from, date_to=date_to),
+    )
+
+
+async def _ndjson_lines(
+    date: str | None,
+    ticker: str | None,
+    cursor: str | None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+):
+    # The request-scoped session is closed once the handler returns, before the body is sent,
+    # so the stream owns a session for as long as it is being consumed.
+    async with get_db() as db:
+        batches = FloorsheetQueryService(db).iter_floorsheet_batches(
+            date=date, ticker=ticker, cursor=cursor, date_from=date_from, date_to=date_to
+        )
+        async for batch in batches:
+            yield b"".join(dumps(row) + b"\n" for row in batch)
 
 
 @router.get("/data")
 async def get_floorsheet_data(
+    request: Request,
     date: str | None = Query(None, description="Trade date in YYYY-MM-DD format"),
     ticker: str | None = Query(None, description="Stock ticker symbol"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    limit: int | None = Query(None, ge=1, le=FLOORSHEET_MAX_PAGE_LIMIT, description="Page size"),
+    format: Literal["json", "ndjson", "arrow"] | None = Query(
+        None, description="ndjson streams one row per line; arrow is a columnar Arrow IPC stream"
+    ),
+    date_from: str | None = Query(None, description="First trade date (YYYY-MM-DD), inclusive"),
+    date_to: str | None = Query(None, description="Last trade date (YYYY-MM-DD), inclusive"),
     service: FloorsheetQueryService = Depends(get_service),
 ):
-    return JSONResponse(await service.get_floorsheet_data(date=date, ticker=ticker))
+    date = _optional_date(date)
+    date_from, date_to = _optional_date_range(date, date_from, date_to)
+    if date_from is not None:
+        # Ranges can span millions of rows, so they are only ever streamed.
+        if cursor or limit or format not in (None, "ndjson"):
+            raise HTTPException(status_code=400, detail="Date ranges are streamed as ndjson without cursor or limit")
+        return StreamingResponse(
+            _ndjson_lines(None, ticker, None, date_from, date_to), media_type=NDJSON_MEDIA_TYPE
+        )
+    # The keyset cursor only carries (trade_time, contract_id), so pages are defined within one date.
+    if (cursor or limit) and not date:
+        raise HTTPException(status_code=400, detail="cursor and limit page through a single date; pass date")
+    format = _negotiate_format(request, format)
+    if cursor:
+        try:
+            decode_floorsheet_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if format == "arrow":
+        if cursor or limit:
+            raise HTTPException(status_code=400, detail="The arrow format returns whole days; drop cursor and limit")
+        if not date:
+            raise HTTPException(status_code=400, detail="The arrow format requires a date")
+
+        async def render() -> bytes:
+            table = await service.get_floorsheet_table(date=date, ticker=ticker)
+            return await asyncio.to_thread(_arrow_ipc_bytes, table)
+
+        validators = await _validators(service, date, ticker, variant="arrow")
+        return await conditional_response(request, validators, render, ARROW_STREAM_MEDIA_TYPE, headers=_VARY_ACCEPT)
+    validators = await _validators(service, date, ticker)
+    if format == "ndjson":
+        if validators is not None and validators.not_modified(request):
+            return Response(status_code=304, headers={**validators.headers, **_VARY_ACCEPT})
+        return StreamingResponse(
+            _ndjson_lines(date, ticker, cursor),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers={**(validators.headers if validators is not None else {}), **_VARY_ACCEPT},
+        )
+    if cursor or limit:
+        return await conditional_json(
+            request,
+            validators,
+            lambda: service.get_floorsheet_page(
+                date=date, ticker=ticker, cursor=cursor, limit=limit or FLOORSHEET_PAGE_LIMIT
+            ),
+            headers=_VARY_ACCEPT,
+        )
+    return await conditional_json(
+        request, validators, lambda: service.get_floorsheet_data(date=date, ticker=ticker), headers=_VARY_ACCEPT
+    )
 
 
 @router.get("/summary")
 async def get_floorsheet_summary(
+    request: Request,
     date: str = Query(..., description="Trade date in YYYY-MM-DD format"),
     ticker: str | None = Query(None, description="Stock ticker symbol"),
+    group_by: Literal["buyer", "seller", "pair"] = Query("buyer", description="Run key: buyer, seller or buyer-seller pair"),
     service: FloorsheetQueryService = Depends(get_service),
 ):
-    return JSONResponse(await service.get_floorsheet_summary(date=date, ticker=ticker))
+    date = parse_date(date)
+    return await conditional_json(
+        request,
+        await _validators(service, date, ticker),
+        lambda: service.get_floorsheet_summary(date=date, ticker=ticker, group_by=group_by),
+    )
+
+
+@router.get("/broker-sides")
+async def get_broker_sides(
+    request: Request,
+    date: str = Query(..., description="Trade date in YYYY-MM-DD format"),
+    ticker: str | None = Query(None, description="Stock ticker symbol"),
+    service: FloorsheetQueryService = Depends(get_service),
+):
+    date = parse_date(date)
+    return await conditional_json(
+        request, await _validators(service, date, ticker), lambda: service.get_broker_sides(date=date, ticker=ticker)
+    )
 
 
 @router.get("/price-switch")
 async def get_price_switch(
+    request: Request,
     date: str = Query(..., description="Trade date in YYYY-MM-DD format"),
     ticker: str | None = Query(None, description="Stock ticker symbol"),
     service: FloorsheetQueryService = Depends(get_service),
 ):
-    return JSONResponse(await service.get_price_switch_analysis(date=date, ticker=ticker))
+    date = parse_date(date)
+    return await conditional_json(
+        request,
+        await _validators(service, date, ticker),
+        lambda: service.get_price_switch_analysis(date=date, ticker=ticker),
+    )
+
+
+@router.get("/range-stats")
+async def get_range_statistics(
+    date_from: str = Query(..., description="First trade date (YYYY-MM-DD), inclusive"),
+    date_to: str = Query(..., description="Last trade date (YYYY-MM-DD), inclusive"),
+    ticker: str | None = Query(None, description="Stock ticker symbol"),
+    group_by: Literal["date", "ticker", "buyer", "seller"] = Query("ticker", description="Aggregate per date, ticker or broker side"),
+    service: FloorsheetQueryService = Depends(get_service),
+):
+    date_from, date_to = parse_date_range(date_from, date_to)
+    return FastJSONResponse(
+        await service.get_range_statistics(date_from, date_to, ticker=ticker, group_by=group_by)
+    )
+
+
+@router.get("/brokers/net-positions")
+async def get_broker_net_positions(
+    date_from: str = Query(..., description="First trade date (YYYY-MM-DD), inclusive"),
+    date_to: str = Query(..., description="Last trade date (YYYY-MM-DD), inclusive"),
+    ticker: str | None = Query(None, description="Stock ticker symbol"),
+    broker: str | None = Query(None, description="Broker member id"),
+    service: FloorsheetQueryService = Depends(get_service),
+):
+    date_from, date_to = parse_date_range(date_from, date_to)
+    positions = await service.get_broker_net_positions(date_from, date_to, ticker=ticker, broker=broker)
+    return FastJSONResponse({"date_from": date_from, "date_to": date_to, "positions": positions, "count": len(positions)})
+
+
+@router.get("/brokers/top")
+async def get_top_brokers(
+    date_from: str = Query(..., description="First trade date (YYYY-MM-DD), inclusive"),
+    date_to: str = Query(..., description="Last trade date (YYYY-MM-DD), inclusive"),
+    ticker: str | None = Query(None, description="Stock ticker symbol"),
+    limit: int = Query(10, ge=1, le=BROKER_RANKING_MAX_LIMIT),
+    rank_by: Literal["quantity", "amount"] = Query("quantity", description="Rank by net quantity or net amount"),
+    service: FloorsheetQueryService = Depends(get_service),
+):
+    date_from, date_to = parse_date_range(date_from, date_to)
+    return FastJSONResponse(await service.get_top_brokers(date_from, date_to, ticker=ticker, limit=limit, rank_by=rank_by))
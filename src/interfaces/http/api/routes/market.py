@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from src.interfaces.http.api.params import parse_date_range
+from src.interfaces.http.api.responses import FastJSONResponse
+from src.modules.market_data import IntradayBarService
+
+
+router = APIRouter(prefix="/api/market", tags=["market"], default_response_class=FastJSONResponse)
+
+_INTERVAL_MINUTES = {"1m": 1, "5m": 5, "15m": 15}
+
+
+async def get_bar_service(request: Request) -> IntradayBarService:
+    return IntradayBarService(request.state.db)
+
+
+@router.get("/bars")
+async def get_bars(
+    ticker: str = Query(..., description="Stock ticker symbol"),
+    interval: Literal["1m", "5m", "15m"] = Query("1m", description="Bar width"),
+    date: str | None = Query(None, description="Trade date in YYYY-MM-DD format"),
+    date_from: str | None = Query(None, description="First trade date (YYYY-MM-DD), inclusive"),
+    date_to: str | None = Query(None, description="Last trade date (YYYY-MM-DD), inclusive"),
+    service: IntradayBarService = Depends(get_bar_service),
+):
+    if date:
+        if date_from or date_to:
+            raise HTTPException(status_code=400, detail="Pass either date, or both date_from and date_to")
+        date_from = date_to = date
+    elif not (date_from and date_to):
+        raise HTTPException(status_code=400, detail="Pass either date, or both date_from and date_to")
+    date_from, date_to = parse_date_range(date_from, date_to)
+    return FastJSONResponse(await service.get_bars(ticker, _INTERVAL_MINUTES[interval], date_from, date_to))
@@ -1,19 +1,19 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
 
 from src.app.container import get_portfolio_service
+from src.interfaces.http.api.responses import FastJSONResponse, records
 from src.modules.portfolio import PortfolioQueryService
 from src.shared.exceptions import NotFoundError
 
 
-router = APIRouter(prefix="/api/portfolio", tags=["portfolio"])
+router = APIRouter(prefix="/api/portfolio", tags=["portfolio"], default_response_class=FastJSONResponse)
 
 
 @router.get("/summary")
 async def get_portfolio_summary(service: PortfolioQueryService = Depends(get_portfolio_service)):
-    summary_df = service.get_portfolio_summary(service.get_current_prices()).fillna(0)
+    summary_df = service.get_portfolio_summary(service.get_current_prices())
     total_investment = float(summary_df["Total Investment"].sum()) if not summary_df.empty else 0
     current_holdings_df = summary_df[summary_df["Current Holdings"] > 0] if not summary_df.empty else summary_df
     current_investment = float((current_holdings_df["Current Holdings"] * current_holdings_df["Avg Cost"]).sum()) if not summary_df.empty else 0
@@ -29,45 +29,35 @@ async def get_portfolio_summary(service: PortfolioQueryService = Depends(get_por
         "total_return_pct": float(summary_df["Total P&L"].sum() / total_investment * 100) if total_investment > 0 else 0,
         "net_return_pct": float(summary_df["Net P&L (After Interest)"].sum() / total_investment * 100) if total_investment > 0 else 0,
     }
-    return JSONResponse({"totals": totals, "scripts": summary_df.to_dict("records"), "script_count": len(summary_df)})
+    return FastJSONResponse({"totals": totals, "scripts": records(summary_df, fill=0), "script_count": len(summary_df)})
 
 
 @router.get("/holdings")
 async def get_current_holdings(service: PortfolioQueryService = Depends(get_portfolio_service)):
     holdings_df = service.get_current_holdings(service.get_current_prices())
-    if "First Purchase" in holdings_df.columns:
-        holdings_df["First Purchase"] = holdings_df["First Purchase"].astype(str)
-    holdings_df = holdings_df.fillna(0)
-    return JSONResponse({"holdings": holdings_df.to_dict("records"), "count": len(holdings_df)})
+    return FastJSONResponse({"holdings": records(holdings_df, fill=0), "count": len(holdings_df)})
 
 
 @router.get("/transactions")
 async def get_transaction_history(service: PortfolioQueryService = Depends(get_portfolio_service)):
     trans_df = service.get_transaction_history()
-    if not trans_df.empty:
-        trans_df["Date"] = trans_df["Date"].astype(str)
-    trans_df = trans_df.fillna("")
-    return JSONResponse({"transactions": trans_df.to_dict("records"), "count": len(trans_df)})
+    return FastJSONResponse({"transactions": records(trans_df, fill=""), "count": len(trans_df)})
 
 
 @router.get("/pools")
 async def get_detailed_pools(service: PortfolioQueryService = Depends(get_portfolio_service)):
     pools_df = service.get_detailed_pools(service.get_current_prices())
-    for column in ["First Purchase Date", "Last Purchase Date"]:
-        if column in pools_df.columns:
-            pools_df[column] = pools_df[column].astype(str)
-    pools_df = pools_df.fillna(0)
-    return JSONResponse({"pools": pools_df.to_dict("records"), "count": len(pools_df)})
+    return FastJSONResponse({"pools": records(pools_df, fill=0), "count": len(pools_df)})
 
 
 @router.get("/interest")
 async def get_interest_analysis(service: PortfolioQueryService = Depends(get_portfolio_service)):
-    interest_df = service.get_interest_analysis().fillna(0)
+    interest_df = service.get_interest_analysis()
     total_interest = float(interest_df["Interest Cost"].sum()) if not interest_df.empty else 0
     total_investment = float(interest_df["Investment Amount"].sum()) if not interest_df.empty else 0
-    return JSONResponse(
+    return FastJSONResponse(
         {
-            "analysis": interest_df.to_dict("records"),
+            "analysis": records(interest_df, fill=0),
             "total_interest": total_interest,
             "total_investment": total_investment,
             "avg_interest_pct": total_interest / total_investment * 100 if total_investment > 0 else 0,
@@ -77,10 +67,10 @@ async def get_interest_analysis(service: PortfolioQueryService = Depends(get_por
 
 @router.get("/sold-interest")
 async def get_sold_interest_analysis(service: PortfolioQueryService = Depends(get_portfolio_service)):
-    df = service.get_sold_interest_analysis().fillna(0)
-    return JSONResponse(
+    df = service.get_sold_interest_analysis()
+    return FastJSONResponse(
         {
-            "analysis": df.to_dict("records"),
+            "analysis": records(df, fill=0),
             "total_interest": float(df["Interest Cost"].sum()) if not df.empty else 0,
             "total_investment": float(df["Investment Amount"].sum()) if not df.empty else 0,
             "total_realized_pnl": float(df["Realized P&L"].sum()) if not df.empty else 0,
@@ -95,12 +85,12 @@ async def get_sold_interest_analysis(service: PortfolioQueryService = Depends(ge
 @router.get("/script/{symbol}")
 async def get_script_detail(symbol: str, service: PortfolioQueryService = Depends(get_portfolio_service)):
     try:
-        return JSONResponse(service.get_script_detail(symbol))
+        return FastJSONResponse(service.get_script_detail(symbol))
     except NotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
 
 @router.get("/stats")
 async def get_portfolio_stats(service: PortfolioQueryService = Depends(get_portfolio_service)):
-    return JSONResponse(service.get_portfolio_stats())
+    return FastJSONResponse(service.get_portfolio_stats())
 
@@ -1,2 +1,11 @@
-from .service import FloorsheetQueryService, ScriptRefreshService
-
+from .service import (
+    BROKER_RANKING_MAX_LIMIT,
+    FLOORSHEET_MAX_PAGE_LIMIT,
+    FLOORSHEET_PAGE_LIMIT,
+    FloorsheetArchiveService,
+    FloorsheetQueryService,
+    FloorsheetSyncService,
+    IntradayBarService,
+    ScriptRefreshService,
+    decode_floorsheet_cursor,
+)
@@ -1,11 +1,76 @@
 from __future__ import annotations
 
+import asyncio
 import math
-from datetime import time
+import re
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime, time
+from operator import attrgetter
 
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.core.nepse.client import NEPSE
 from src.core.nepse.fetch import fetch_all_script_details
+from src.core.nepse.floorsheet import FloorsheetFetcher
+from src.infrastructure.cache import TradeDateCache, floorsheet_query_cache
 from src.infrastructure.db.models import ScriptDetails
-from src.infrastructure.db.repositories import FloorsheetRepository, ScriptDetailsRepository, ScriptRepository, TrackerRepository
+from src.infrastructure.db.repositories import (
+    BAR_INTERVAL_MINUTES,
+    FloorsheetBarRepository,
+    FloorsheetBrokerDailyRepository,
+    FloorsheetDataVersionRepository,
+    FloorsheetRepository,
+    ScriptDetailsRepository,
+    ScriptRepository,
+    TrackerRepository,
+)
+from src.infrastructure.files import FLOORSHEET_ARCHIVE_COLUMNS, FLOORSHEET_ARCHIVE_SCHEMA, FloorsheetArchive
+from src.shared.config import settings
+from src.shared.time import nepal_now
+
+
+# Columns selected alongside the Floorsheet entity in FloorsheetRepository.query_rows.
+_JOINED_COLUMNS = {"stock_symbol", "buyer_member_id", "seller_member_id", "buyer_broker_name", "seller_broker_name"}
+
+FLOORSHEET_PAGE_LIMIT = 500
+FLOORSHEET_MAX_PAGE_LIMIT = 5000
+# Rows per chunk when streaming a whole day; small enough that the first chunk arrives quickly.
+_STREAM_BATCH_ROWS = 1000
+# Columns that identify a run of consecutive trades for each summary grouping.
+SUMMARY_GROUPINGS = {
+    "buyer": ("buyer_member_id", "buyer_broker_name"),
+    "seller": ("seller_member_id", "seller_broker_name"),
+    "pair": ("buyer_member_id", "buyer_broker_name", "seller_member_id", "seller_broker_name"),
+}
+# Key columns for each range-statistics grouping; the first column is the group id.
+RANGE_GROUPINGS = {
+    "date": ("trade_date",),
+    "ticker": ("stock_symbol",),
+    "buyer": ("buyer_member_id", "buyer_broker_name"),
+    "seller": ("seller_member_id", "seller_broker_name"),
+}
+# Rows per batch folded into the range aggregates; memory stays O(batch + groups).
+_RANGE_BATCH_ROWS = 5000
+NET_POSITION_RANKINGS = ("quantity", "amount")
+BROKER_RANKING_MAX_LIMIT = 100
+_PRICE_SWITCH_COLUMNS = [
+    "contract_id",
+    "buyer_member_id",
+    "seller_member_id",
+    "buyer_broker_name",
+    "seller_broker_name",
+    "contract_quantity",
+    "contract_rate",
+    "contract_amount",
+    "trade_time",
+]
+# Closed trade dates rarely change, so their price-switch results are kept for a day; the key
+# carries the data version, so a later backfill or re-fetch from any process is never masked.
+_CLOSED_DATE_CACHE_TTL = 24 * 60 * 60
+_CURSOR_PATTERN = re.compile(r"^(\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?)_(\d+)$")
 
 
 def _safe_float(value, default=None):
@@ -24,6 +89,260 @@ def _to_script_href(security_id: int) -> str:
     return f"/company/detail/{security_id}"
 
 
+def _rows_to_columns(rows, names: list[str]) -> dict[str, list]:
+    """Turn joined floorsheet rows into one list per requested column."""
+    getters = [attrgetter(name if name in _JOINED_COLUMNS else f"Floorsheet.{name}") for name in names]
+    columns = {name: [] for name in names}
+    appenders = [columns[name].append for name in names]
+    for row in rows:
+        for append, getter in zip(appenders, getters):
+            append(getter(row))
+    return columns
+
+
+def _columns_to_records(columns: dict[str, list]) -> list[dict]:
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def encode_floorsheet_cursor(trade_time: str, contract_id: int) -> str:
+    """Opaque keyset position: the last row's (trade_time, contract_id)."""
+    return f"{trade_time}_{contract_id}"
+
+
+def decode_floorsheet_cursor(cursor: str) -> tuple[str, int]:
+    match = _CURSOR_PATTERN.match(cursor)
+    if match is None:
+        raise ValueError(f"Invalid floorsheet cursor: {cursor!r}")
+    return match.group(1), int(match.group(2))
+
+
+def _sequential_segment_sums(values: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Per-run sums added strictly left to right, matching a running ``+=`` bit for bit.
+
+    ``np.add.reduceat`` sums pairwise, which changes the last digits of float totals. Instead,
+    runs are ordered longest first and the k-th element of every run still active is added in
+    one vectorized step, so the number of numpy calls is the longest run, not the row count.
+    """
+    order = np.argsort(-lengths, kind="stable")
+    run_starts = starts[order]
+    run_lengths = lengths[order]
+    sums = values[run_starts].copy()
+    descending = -run_lengths
+    for offset in range(1, int(run_lengths[0]) if len(run_lengths) else 0):
+        active = int(np.searchsorted(descending, -offset, side="left"))
+        sums[:active] += values[run_starts[:active] + offset]
+    result = np.empty_like(sums)
+    result[order] = sums
+    return result
+
+
+def _run_length_summary(columns: dict, key_names: tuple[str, ...]) -> list[dict]:
+    """Collapse consecutive trades sharing the same key columns into one summary row per run."""
+    quantity = np.asarray(columns["contract_quantity"], dtype=np.int64)
+    row_count = len(quantity)
+    if row_count == 0:
+        return []
+    keys = {name: np.asarray(columns[name], dtype=object) for name in key_names}
+    # Key columns come in (member_id, broker_name) pairs; runs break on member id changes only.
+    id_names = key_names[::2]
+    boundaries = np.zeros(row_count, dtype=bool)
+    boundaries[0] = True
+    for name in id_names:
+        boundaries[1:] |= keys[name][1:] != keys[name][:-1]
+    starts = np.flatnonzero(boundaries)
+    lengths = np.diff(np.append(starts, row_count))
+
+    # Runs without a broker are dropped, as the row-by-row implementation did.
+    keep = np.ones(len(starts), dtype=bool)
+    for name in id_names:
+        keep &= keys[name][starts] != None  # noqa: E711 - elementwise comparison on object arrays
+
+    rate = np.asarray(columns["contract_rate"], dtype=np.float64)
+    amount = np.asarray(columns["contract_amount"], dtype=np.float64)
+    quantities = np.add.reduceat(quantity, starts)[keep].tolist()
+    amounts = _sequential_segment_sums(amount, starts, lengths)[keep].tolist()
+    averages = [
+        round(total_amount / total_quantity, 2) if total_quantity > 0 else 0
+        for total_amount, total_quantity in zip(amounts, quantities)
+    ]
+    kept_starts = starts[keep]
+    run_keys = [keys[name][kept_starts].tolist() for name in key_names]
+    stats = (
+        quantities,
+        lengths[keep].tolist(),
+        amounts,
+        averages,
+        np.minimum.reduceat(rate, starts)[keep].tolist(),
+        np.maximum.reduceat(rate, starts)[keep].tolist(),
+        np.asarray(columns["trade_time"], dtype=object)[kept_starts].tolist(),
+    )
+    # Literal dicts are markedly cheaper than dict(zip(...)) at hundreds of thousands of runs.
+    if len(key_names) == 2:
+        return [
+            {
+                "broker_id": broker_id,
+                "broker_name": broker_name,
+                "quantity": total_quantity,
+                "trades": trades,
+                "total_amount": total_amount,
+                "average_price": average_price,
+                "min_price": min_price,
+                "max_price": max_price,
+                "start_time": start_time,
+            }
+            for (
+                broker_id,
+                broker_name,
+                total_quantity,
+                trades,
+                total_amount,
+                average_price,
+                min_price,
+                max_price,
+                start_time,
+            ) in zip(*run_keys, *stats)
+        ]
+    return [
+        {
+            "buyer_broker_id": buyer_id,
+            "buyer_broker_name": buyer_name,
+            "seller_broker_id": seller_id,
+            "seller_broker_name": seller_name,
+            "quantity": total_quantity,
+            "trades": trades,
+            "total_amount": total_amount,
+            "average_price": average_price,
+            "min_price": min_price,
+            "max_price": max_price,
+            "start_time": start_time,
+        }
+        for (
+            buyer_id,
+            buyer_name,
+            seller_id,
+            seller_name,
+            total_quantity,
+            trades,
+            total_amount,
+            average_price,
+            min_price,
+            max_price,
+            start_time,
+        ) in zip(*run_keys, *stats)
+    ]
+
+
+def _net_position_record(row) -> dict:
+    buy_quantity, sell_quantity = row.buy_quantity or 0, row.sell_quantity or 0
+    buy_amount, sell_amount = row.buy_amount or 0.0, row.sell_amount or 0.0
+    return {
+        "broker_id": row.member_id,
+        "broker_name": row.name,
+        "ticker": row.ticker,
+        "buy_quantity": buy_quantity,
+        "sell_quantity": sell_quantity,
+        "net_quantity": buy_quantity - sell_quantity,
+        "buy_amount": buy_amount,
+        "sell_amount": sell_amount,
+        "net_amount": buy_amount - sell_amount,
+        "turnover": buy_amount + sell_amount,
+        "buy_vwap": round(buy_amount / buy_quantity, 2) if buy_quantity else None,
+        "sell_vwap": round(sell_amount / sell_quantity, 2) if sell_quantity else None,
+        "trades": row.trades,
+    }
+
+
+@dataclass(slots=True)
+class _RangeAggregate:
+    label: str | None
+    trades: int = 0
+    quantity: int = 0
+    amount: float = 0.0
+    min_rate: float | None = None
+    max_rate: float | None = None
+
+    def add(self, quantity, rate, amount) -> None:
+        self.trades += 1
+        self.quantity += quantity or 0
+        self.amount += amount or 0.0
+        if rate is not None:
+            if self.min_rate is None or rate < self.min_rate:
+                self.min_rate = rate
+            if self.max_rate is None or rate > self.max_rate:
+                self.max_rate = rate
+
+    def to_dict(self, key) -> dict:
+        return {
+            "key": key,
+            "label": self.label,
+            "trades": self.trades,
+            "quantity": self.quantity,
+            "total_amount": round(self.amount, 2),
+            "vwap": round(self.amount / self.quantity, 2) if self.quantity else None,
+            "min_price": self.min_rate,
+            "max_price": self.max_rate,
+        }
+
+
+@dataclass(slots=True)
+class _PriceLevel:
+    rate: float
+    first_index: int
+    first_time: str
+    last_index: int
+    # Last row at this rate traded no later than the first trade of the next higher level.
+    last_index_before_upper: int | None
+
+
+def _top_price_levels(rates, trade_times) -> list[_PriceLevel]:
+    """Single pass over time-ordered trades keeping the three highest distinct rates.
+
+    A new rate can be inserted at any position of the top three. Only the level directly below
+    it gets a new next-higher neighbour, and since that neighbour's first trade is the latest
+    seen so far, every earlier row of the lower level then qualifies.
+    """
+    levels: list[_PriceLevel] = []
+    by_rate: dict[float, _PriceLevel] = {}
+    rates = rates.tolist() if isinstance(rates, np.ndarray) else rates
+    trade_times = trade_times.tolist() if isinstance(trade_times, np.ndarray) else trade_times
+    for index, (rate, trade_time) in enumerate(zip(rates, trade_times)):
+        rate = float(rate)
+        trade_time = trade_time or ""
+        level = by_rate.get(rate)
+        if level is not None:
+            level.last_index = index
+            position = levels.index(level)
+            if position == 0 or trade_time <= levels[position - 1].first_time:
+                level.last_index_before_upper = index
+            continue
+        if len(levels) == 3 and rate < levels[-1].rate:
+            continue
+
+        position = next((i for i, existing in enumerate(levels) if rate > existing.rate), len(levels))
+        qualifies = position == 0 or trade_time <= levels[position - 1].first_time
+        level = _PriceLevel(rate, index, trade_time, index, index if qualifies else None)
+        levels.insert(position, level)
+        by_rate[rate] = level
+        if position + 1 < len(levels):
+            below = levels[position + 1]
+            below.last_index_before_upper = below.last_index
+        if len(levels) > 3:
+            del by_rate[levels.pop().rate]
+    return levels
+
+
+def _record_at(columns: dict, index: int) -> dict:
+    record = {}
+    for name, values in columns.items():
+        value = values[index]
+        record[name] = value.item() if isinstance(value, np.generic) else value
+    return record
+
+
+def _today() -> str:
+    return nepal_now().strftime("%Y-%m-%d")
+
+
 def _map_today_price_to_details(payload: dict, script_id: int) -> dict:
     high = _safe_float(payload.get("highPrice"), 0.0)
     low = _safe_float(payload.get("lowPrice"), 0.0)
@@ -46,14 +365,15 @@ def _map_today_price_to_details(payload: dict, script_id: int) -> dict:
 
 
 class ScriptRefreshService:
-    def __init__(self, db):
+    def __init__(self, db, nepse: NEPSE | None = None):
         self.db = db
+        self.nepse = nepse
         self.scripts = ScriptRepository(db)
         self.details = ScriptDetailsRepository(db)
         self.trackers = TrackerRepository(db)
 
     async def refresh(self, only_tickers: set[str] | None = None) -> dict[str, dict]:
-        payloads = await fetch_all_script_details()
+        payloads = await fetch_all_script_details(nepse=self.nepse)
         if not payloads:
             return {}
         data_by_ticker = {item["symbol"]: item for item in payloads if item.get("symbol")}
@@ -97,100 +417,240 @@ class ScriptRefreshService:
         return True
 
 
+class FloorsheetSyncService:
+    def __init__(self, db, nepse: NEPSE | None = None):
+        self.db = db
+        self.nepse = nepse
+        self.trackers = TrackerRepository(db)
+
+    async def sync_tracked(self, trade_date: str | None = None) -> list[dict]:
+        """Pull only the new contracts of the day for every tracked script."""
+        scripts = await self.trackers.list_tracked_scripts()
+        if not scripts:
+            return []
+        trade_date = trade_date or nepal_now().strftime("%Y-%m-%d")
+        fetch_list = [{"ticker": script.ticker, "date": trade_date, "incremental": True} for script in scripts]
+        async with FloorsheetFetcher(nepse=self.nepse) as fetcher:
+            return await fetcher.fetch_from_list(fetch_list)
+
+
+class FloorsheetArchiveService:
+    def __init__(self, db, archive: FloorsheetArchive | None = None):
+        self.db = db
+        self.floorsheets = FloorsheetRepository(db)
+        self.archive = archive or FloorsheetArchive(settings.floorsheet_archive_dir)
+
+    async def export_date(self, trade_date: str) -> int:
+        rows = await self.floorsheets.query_rows(date=trade_date)
+        columns = _rows_to_columns(rows, FLOORSHEET_ARCHIVE_COLUMNS)
+        return await asyncio.to_thread(self.archive.write_date, trade_date, columns)
+
+    async def export_closed_dates(self, overwrite: bool = False) -> dict[str, int]:
+        """Archive every finished trade date that is missing (or, with overwrite, all of them)."""
+        today = _today()
+        exported = {}
+        for trade_date in await self.floorsheets.list_available_dates():
+            if trade_date >= today or (not overwrite and self.archive.has_date(trade_date)):
+                continue
+            exported[trade_date] = await self.export_date(trade_date)
+        return exported
+
+
 class FloorsheetQueryService:
-    def __init__(self, db):
+    def __init__(self, db, archive: FloorsheetArchive | None = None, cache: TradeDateCache | None = None):
         self.db = db
         self.floorsheets = FloorsheetRepository(db)
+        self.broker_daily = FloorsheetBrokerDailyRepository(db)
+        self.versions = FloorsheetDataVersionRepository(db)
+        self.archive = archive or FloorsheetArchive(settings.floorsheet_archive_dir)
+        self.cache = cache if cache is not None else floorsheet_query_cache
+
+    def _is_archived(self, date: str | None) -> bool:
+        return bool(date) and date != _today() and self.archive.has_date(date)
+
+    async def _load_columns(self, date: str | None, ticker: str | None, names: list[str]) -> dict[str, list]:
+        """Requested columns in trade-time order: closed dates from the archive, the rest from SQLite."""
+        if self._is_archived(date):
+            table = await asyncio.to_thread(self.archive.read, date, ticker, names)
+            return table.to_pydict()
+        return await self.floorsheets.query_columns(names, date=date, ticker=ticker)
+
+    async def _load_arrays(self, date: str | None, ticker: str | None, names: list[str]) -> dict:
+        """Like _load_columns, but archived columns come back as numpy arrays instead of Python lists."""
+        if self._is_archived(date):
+            table = await asyncio.to_thread(self.archive.read, date, ticker, names)
+            arrays = {}
+            for name in names:
+                column = table.column(name)
+                # Decode dictionary strings first: to_numpy() on a dictionary column loses nulls.
+                if pa.types.is_dictionary(column.type):
+                    column = column.cast(pa.string())
+                arrays[name] = column.to_numpy()
+            return arrays
+        return await self.floorsheets.query_columns(names, date=date, ticker=ticker)
+
+    async def get_data_version(self, date: str, ticker: str | None = None) -> tuple[int, datetime | None]:
+        """Ingestion counter and last write time (UTC) for a date, or one ticker on it."""
+        return await self.versions.get(date, ticker)
 
     async def get_available_dates(self) -> dict:
         dates = await self.floorsheets.list_available_dates()
         return {"dates": dates, "count": len(dates)}
 
-    async def get_companies(self, date: str | None = None) -> dict:
-        rows = await self.floorsheets.query_rows(date=date)
-        companies = sorted({row.stock_symbol for row in rows})
-        return {"companies": companies, "count": len(companies)}
+    async def get_companies(
+        self, date: str | None = None, date_from: str | None = None, date_to: str | None = None
+    ) -> dict:
+        # Range results are keyed on None so a write to any date drops them.
+        cache_key = (date or None, "companies", date_from, date_to)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        rows = await self.floorsheets.company_stats(trade_date=date, date_from=date_from, date_to=date_to)
+        result = {
+            "companies": [row.ticker for row in rows],
+            "stats": [
+                {"ticker": row.ticker, "trades": row.trades, "turnover": round(row.turnover or 0.0, 2)}
+                for row in rows
+            ],
+            "count": len(rows),
+        }
+        self.cache.set(cache_key, result)
+        return result
+
+    def _read_archived_after(
+        self, date: str, ticker: str | None, after: tuple[str, int] | None, limit: int | None = None
+    ):
+        table = self.archive.read(date, ticker, FLOORSHEET_ARCHIVE_COLUMNS)
+        if after is not None:
+            trade_time, contract_id = after
+            table = table.filter(
+                pc.or_(
+                    pc.greater(table["trade_time"], trade_time),
+                    pc.and_(pc.equal(table["trade_time"], trade_time), pc.greater(table["contract_id"], contract_id)),
+                )
+            )
+        return table.slice(0, limit) if limit is not None else table
 
     async def get_floorsheet_data(self, date: str | None = None, ticker: str | None = None) -> dict:
-        rows = await self.floorsheets.query_rows(date=date, ticker=ticker)
-        payload = [
-            {
-                "contract_id": row.Floorsheet.contract_id,
-                "stock_symbol": row.stock_symbol,
-                "buyer_member_id": row.buyer_member_id,
-                "seller_member_id": row.seller_member_id,
-                "buyer_broker_name": row.buyer_broker_name,
-                "seller_broker_name": row.seller_broker_name,
-                "contract_quantity": row.Floorsheet.contract_quantity,
-                "contract_rate": row.Floorsheet.contract_rate,
-                "contract_amount": row.Floorsheet.contract_amount,
-                "trade_date": row.Floorsheet.trade_date,
-                "trade_time": row.Floorsheet.trade_time,
-            }
-            for row in rows
-        ]
+        columns = await self._load_columns(date, ticker, FLOORSHEET_ARCHIVE_COLUMNS)
+        payload = _columns_to_records(columns)
         return {"floorsheet": payload, "count": len(payload)}
 
-    async def get_floorsheet_summary(self, date: str, ticker: str | None = None) -> dict:
-        rows = await self.floorsheets.query_rows(date=date, ticker=ticker)
-        summaries = []
-        current_broker_id = None
-        current_broker_name = None
-        current_quantity = 0
-        current_trade_count = 0
-        current_total_amount = 0.0
-        current_prices = []
-        current_start_time = None
-        for row in rows:
-            buyer_id = row.buyer_member_id
-            buyer_name = row.buyer_broker_name
-            quantity = row.Floorsheet.contract_quantity
-            price = row.Floorsheet.contract_rate
-            amount = row.Floorsheet.contract_amount
-            trade_time = row.Floorsheet.trade_time
-            if buyer_id == current_broker_id:
-                current_quantity += quantity
-                current_trade_count += 1
-                current_total_amount += amount
-                current_prices.append(price)
-                continue
-            if current_broker_id is not None:
-                avg_price = current_total_amount / current_quantity if current_quantity > 0 else 0
-                summaries.append(
-                    {
-                        "broker_id": current_broker_id,
-                        "broker_name": current_broker_name,
-                        "quantity": current_quantity,
-                        "trades": current_trade_count,
-                        "total_amount": current_total_amount,
-                        "average_price": round(avg_price, 2),
-                        "min_price": min(current_prices),
-                        "max_price": max(current_prices),
-                        "start_time": current_start_time,
-                    }
-                )
-            current_broker_id = buyer_id
-            current_broker_name = buyer_name
-            current_quantity = quantity
-            current_trade_count = 1
-            current_total_amount = amount
-            current_prices = [price]
-            current_start_time = trade_time
-        if current_broker_id is not None:
-            avg_price = current_total_amount / current_quantity if current_quantity > 0 else 0
-            summaries.append(
-                {
-                    "broker_id": current_broker_id,
-                    "broker_name": current_broker_name,
-                    "quantity": current_quantity,
-                    "trades": current_trade_count,
-                    "total_amount": current_total_amount,
-                    "average_price": round(avg_price, 2),
-                    "min_price": min(current_prices),
-                    "max_price": max(current_prices),
-                    "start_time": current_start_time,
-                }
-            )
+    async def get_floorsheet_table(self, date: str | None = None, ticker: str | None = None) -> pa.Table:
+        """The day as one Arrow table with dictionary-encoded ticker and broker columns."""
+        if self._is_archived(date):
+            table = await asyncio.to_thread(self.archive.read, date, ticker, FLOORSHEET_ARCHIVE_COLUMNS)
+        else:
+            columns = await self.floorsheets.query_columns(FLOORSHEET_ARCHIVE_COLUMNS, date=date, ticker=ticker)
+            table = pa.Table.from_pydict(columns, schema=FLOORSHEET_ARCHIVE_SCHEMA)
+        return table.combine_chunks()
+
+    async def get_floorsheet_page(
+        self,
+        date: str | None = None,
+        ticker: str | None = None,
+        cursor: str | None = None,
+        limit: int = FLOORSHEET_PAGE_LIMIT,
+    ) -> dict:
+        """One keyset page ordered by (trade_time, contract_id); ``next_cursor`` is None on the last page."""
+        after = decode_floorsheet_cursor(cursor) if cursor else None
+        if self._is_archived(date):
+            table = await asyncio.to_thread(self._read_archived_after, date, ticker, after, limit + 1)
+            columns = table.to_pydict()
+        else:
+            rows = await self.floorsheets.query_page(date=date, ticker=ticker, after=after, limit=limit + 1)
+            columns = _rows_to_columns(rows, FLOORSHEET_ARCHIVE_COLUMNS)
+        payload = _columns_to_records(columns)
+        next_cursor = None
+        if len(payload) > limit:
+            payload = payload[:limit]
+            next_cursor = encode_floorsheet_cursor(payload[-1]["trade_time"], payload[-1]["contract_id"])
+        return {"floorsheet": payload, "count": len(payload), "next_cursor": next_cursor}
+
+    async def iter_floorsheet_batches(
+        self,
+        date: str | None = None,
+        ticker: str | None = None,
+        cursor: str | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+    ) -> AsyncIterator[list[dict]]:
+        """Yield the rows after ``cursor`` in bounded batches without holding the whole day in memory.
+
+        A ``date_from``/``date_to`` range is read from SQLite in one pass, in (trade_date, trade_time)
+        order; cursors only apply to single dates.
+        """
+        after = decode_floorsheet_cursor(cursor) if cursor else None
+        if self._is_archived(date):
+            table = await asyncio.to_thread(self._read_archived_after, date, ticker, after)
+            for batch in table.to_batches(max_chunksize=_STREAM_BATCH_ROWS):
+                yield batch.to_pylist()
+            return
+        async for rows in self.floorsheets.stream_rows(
+            date=date,
+            ticker=ticker,
+            after=after,
+            batch_size=_STREAM_BATCH_ROWS,
+            date_from=date_from,
+            date_to=date_to,
+        ):
+            yield _columns_to_records(_rows_to_columns(rows, FLOORSHEET_ARCHIVE_COLUMNS))
+
+    async def get_range_statistics(
+        self, date_from: str, date_to: str, ticker: str | None = None, group_by: str = "ticker"
+    ) -> dict:
+        """Trades, quantity, turnover, VWAP and price range per group over an inclusive date range.
+
+        Rows are folded into the totals batch by batch as the cursor yields them, so memory is
+        bounded by the number of groups rather than the number of trades.
+        """
+        if group_by not in RANGE_GROUPINGS:
+            raise ValueError(f"group_by must be one of {', '.join(RANGE_GROUPINGS)}")
+        cache_key = (None, "range_statistics", date_from, date_to, ticker, group_by)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        key_names = RANGE_GROUPINGS[group_by]
+        names = [*key_names, "contract_quantity", "contract_rate", "contract_amount"]
+        labelled = len(key_names) > 1
+        groups: dict = {}
+        async for batch in self.floorsheets.stream_columns(
+            names, date_from=date_from, date_to=date_to, ticker=ticker, batch_size=_RANGE_BATCH_ROWS
+        ):
+            for row in batch:
+                key = row[0]
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = _RangeAggregate(row[1] if labelled else None)
+                group.add(row[-3], row[-2], row[-1])
+
+        entries = [group.to_dict(key) for key, group in groups.items()]
+        entries.sort(key=lambda entry: entry["total_amount"], reverse=True)
+        result = {
+            "date_from": date_from,
+            "date_to": date_to,
+            "group_by": group_by,
+            "groups": entries,
+            "statistics": {
+                "total_groups": len(entries),
+                "total_trades": sum(entry["trades"] for entry in entries),
+                "total_quantity": sum(entry["quantity"] for entry in entries),
+                "total_amount": round(sum(group.amount for group in groups.values()), 2),
+            },
+        }
+        self.cache.set(cache_key, result)
+        return result
+
+    async def get_floorsheet_summary(self, date: str, ticker: str | None = None, group_by: str = "buyer") -> dict:
+        """Runs of consecutive trades by the same buyer, seller or buyer-seller pair."""
+        key_names = SUMMARY_GROUPINGS[group_by]
+        columns = await self._load_arrays(
+            date,
+            ticker,
+            [*key_names, "contract_quantity", "contract_rate", "contract_amount", "trade_time"],
+        )
+        summaries = _run_length_summary(columns, key_names)
         return {
             "summaries": summaries,
             "statistics": {
@@ -201,6 +661,80 @@ class FloorsheetQueryService:
             },
         }
 
+    async def get_broker_sides(self, date: str, ticker: str | None = None) -> dict:
+        """Buyer- and seller-side totals per broker, read from the ingestion-maintained aggregates."""
+        sides = {"buy": [], "sell": []}
+        for row in await self.broker_daily.list_broker_sides(trade_date=date, ticker=ticker):
+            sides[row.side].append(
+                {
+                    "broker_id": row.member_id,
+                    "broker_name": row.name,
+                    "quantity": row.quantity,
+                    "trades": row.trades,
+                    "total_amount": row.amount,
+                    "average_price": round(row.amount / row.quantity, 2) if row.quantity else 0,
+                    "min_price": row.min_rate,
+                    "max_price": row.max_rate,
+                    "first_time": row.first_time,
+                    "last_time": row.last_time,
+                }
+            )
+        totals = {side: sum(entry["quantity"] for entry in entries) for side, entries in sides.items()}
+        for side, entries in sides.items():
+            for entry in entries:
+                entry["percentage"] = entry["quantity"] / totals[side] * 100 if totals[side] else 0
+        return {
+            "buyers": sides["buy"],
+            "sellers": sides["sell"],
+            "totals": {"buyer": totals["buy"], "seller": totals["sell"]},
+        }
+
+    async def get_broker_net_positions(
+        self,
+        date_from: str,
+        date_to: str,
+        ticker: str | None = None,
+        broker: str | None = None,
+    ) -> list[dict]:
+        """Net buy/sell quantity, turnover and VWAP per broker per ticker over a date range."""
+        # Keyed on None so any floorsheet write drops it along with the per-date entries.
+        cache_key = (None, "broker_net_positions", date_from, date_to, ticker, broker)
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            rows = await self.broker_daily.net_positions(date_from, date_to, ticker=ticker, broker=broker)
+            cached = [_net_position_record(row) for row in rows]
+            self.cache.set(cache_key, cached)
+        return cached
+
+    async def get_top_brokers(
+        self,
+        date_from: str,
+        date_to: str,
+        ticker: str | None = None,
+        limit: int = 10,
+        rank_by: str = "quantity",
+    ) -> dict:
+        """Largest net accumulators and distributors per (broker, ticker) over a date range."""
+        if rank_by not in NET_POSITION_RANKINGS:
+            raise ValueError(f"rank_by must be one of {', '.join(NET_POSITION_RANKINGS)}")
+        cache_key = (None, "top_brokers", date_from, date_to, ticker, limit, rank_by)
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            ranked = {}
+            for name, accumulating in (("accumulators", True), ("distributors", False)):
+                rows = await self.broker_daily.net_positions(
+                    date_from,
+                    date_to,
+                    ticker=ticker,
+                    rank_by=rank_by,
+                    accumulating=accumulating,
+                    limit=limit,
+                )
+                ranked[name] = [_net_position_record(row) for row in rows]
+            cached = {"date_from": date_from, "date_to": date_to, "rank_by": rank_by, **ranked}
+            self.cache.set(cache_key, cached)
+        return cached
+
     def _parse_trade_time_seconds(self, value: str | None) -> float | None:
         if not value:
             return None
@@ -227,22 +761,21 @@ class FloorsheetQueryService:
         return f"{sign}{remainder:.3f}s"
 
     async def get_price_switch_analysis(self, date: str, ticker: str | None = None) -> dict:
-        rows = await self.floorsheets.query_rows(date=date, ticker=ticker)
-        payload = [
-            {
-                "contract_id": row.Floorsheet.contract_id,
-                "buyer_member_id": row.buyer_member_id,
-                "seller_member_id": row.seller_member_id,
-                "buyer_broker_name": row.buyer_broker_name,
-                "seller_broker_name": row.seller_broker_name,
-                "contract_quantity": row.Floorsheet.contract_quantity,
-                "contract_rate": row.Floorsheet.contract_rate,
-                "contract_amount": row.Floorsheet.contract_amount,
-                "trade_time": row.Floorsheet.trade_time,
-            }
-            for row in rows
-        ]
-        unique_rates = sorted({float(item["contract_rate"]) for item in payload}, reverse=True)
+        closed = bool(date) and date < _today()
+        if closed:
+            version, _ = await self.versions.get(date, ticker)
+            cache_key = (date, "price_switch", ticker, version)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        result = await self._compute_price_switch_analysis(date, ticker)
+        if closed:
+            self.cache.set(cache_key, result, ttl=_CLOSED_DATE_CACHE_TTL)
+        return result
+
+    async def _compute_price_switch_analysis(self, date: str, ticker: str | None) -> dict:
+        columns = await self._load_arrays(date, ticker, _PRICE_SWITCH_COLUMNS)
+        levels = _top_price_levels(columns["contract_rate"], columns["trade_time"])
         empty_response = {
             "levels": {"highest": None, "second": None, "third": None},
             "rows": [],
@@ -255,23 +788,18 @@ class FloorsheetQueryService:
                 "selected_date": date,
             },
         }
-        if len(unique_rates) < 3:
+        if len(levels) < 3:
             return empty_response
 
-        highest, second, third = unique_rates[:3]
-        by_time = sorted(payload, key=lambda item: item["trade_time"] or "")
-        first_highest = next((item for item in by_time if float(item["contract_rate"]) == highest), None)
-        first_second = next((item for item in by_time if float(item["contract_rate"]) == second), None)
-        third_candidates = [item for item in by_time if float(item["contract_rate"]) == third]
-        if first_second:
-            third_before_second = [
-                item for item in third_candidates if (item["trade_time"] or "") <= (first_second["trade_time"] or "")
-            ]
-            last_third = third_before_second[-1] if third_before_second else None
-        else:
-            last_third = None
-        if last_third is None and third_candidates:
-            last_third = third_candidates[-1]
+        highest_level, second_level, third_level = levels
+        highest, second, third = highest_level.rate, second_level.rate, third_level.rate
+        first_highest = _record_at(columns, highest_level.first_index)
+        first_second = _record_at(columns, second_level.first_index)
+        # Last third-level trade up to the first second-level trade, else the last one of the day.
+        last_third_index = third_level.last_index_before_upper
+        if last_third_index is None:
+            last_third_index = third_level.last_index
+        last_third = _record_at(columns, last_third_index)
 
         tagged_rows = []
         if last_third:
@@ -335,3 +863,37 @@ class FloorsheetQueryService:
                 "selected_date": date,
             },
         }
+
+
+class IntradayBarService:
+    """Reads the 1/5/15 minute OHLCV bars maintained at ingestion."""
+
+    def __init__(self, db):
+        self.bars = FloorsheetBarRepository(db)
+
+    async def get_bars(self, ticker: str, interval_minutes: int, date_from: str, date_to: str) -> dict:
+        if interval_minutes not in BAR_INTERVAL_MINUTES:
+            raise ValueError(f"interval must be one of {', '.join(f'{m}m' for m in BAR_INTERVAL_MINUTES)}")
+        bars = [
+            {
+                "date": bar.trade_date,
+                "time": bar.bucket[:8],
+                "open": bar.open,
+                "high": bar.high,
+                "low": bar.low,
+                "close": bar.close,
+                "volume": bar.volume,
+                "vwap": round(bar.amount / bar.volume, 2) if bar.volume else None,
+                "amount": bar.amount,
+                "trades": bar.trades,
+            }
+            for bar in await self.bars.list_bars(ticker, interval_minutes, date_from, date_to)
+        ]
+        return {
+            "ticker": ticker,
+            "interval": f"{interval_minutes}m",
+            "date_from": date_from,
+            "date_to": date_to,
+            "bars": bars,
+            "count": len(bars),
+        }
@@ -46,7 +46,7 @@ async def process_ticker(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return TICKER
         context.user_data["script_id"] = script.id
         context.user_data["ticker"] = script.ticker
-        ltp = await get_script_ltp(db, script)
+        ltp = await get_script_ltp(db, script, context.bot_data.get("nepse"))
     if not ltp:
         message = await update.message.reply_text(f"Failed to fetch LTP for {script.ticker}. Please try again later.")
         context.user_data["message_ids"].extend([update.message.message_id])
@@ -197,7 +197,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             script = await ScriptRepository(db).get_by_ticker(ticker, with_details=True)
             if not script:
                 return await update.message.reply_text(f"Script with ticker {ticker} not found.")
-            ltp = await get_script_ltp(db, script)
+            ltp = await get_script_ltp(db, script, context.bot_data.get("nepse"))
             if not ltp:
                 return await update.message.reply_text(f"Failed to fetch LTP for {script.ticker}. Please try again later.")
     except Exception as e:
@@ -28,6 +28,11 @@ class Settings:
     static_dir: Path
     log_level: str
     nepse_cache_ttl: int
+    nepse_max_rps: float
+    floorsheet_concurrency: int
+    nepse_landing_dir: Path | None
+    floorsheet_archive_dir: Path
+    floorsheet_cache_ttl: int
     telegram_bot_token: str | None
     telegram_chat_id: str | None
     webhook_url: str | None
@@ -63,6 +68,11 @@ def _build_settings() -> Settings:
         static_dir=base_dir / "src" / "web" / "static",
         log_level=os.getenv("LOG_LEVEL", "INFO"),
         nepse_cache_ttl=int(os.getenv("NEPSE_CACHE_TTL", "900")),
+        nepse_max_rps=float(os.getenv("NEPSE_MAX_RPS", "8")),
+        floorsheet_concurrency=int(os.getenv("FLOORSHEET_CONCURRENCY", "4")),
+        nepse_landing_dir=Path(os.getenv("NEPSE_LANDING_DIR")) if os.getenv("NEPSE_LANDING_DIR") else None,
+        floorsheet_archive_dir=Path(os.getenv("FLOORSHEET_ARCHIVE_DIR", str(data_dir / "floorsheet_archive"))),
+        floorsheet_cache_ttl=int(os.getenv("FLOORSHEET_CACHE_TTL", "300")),
         telegram_bot_token=os.getenv("TELEGRAM_BOT_TOKEN"),
         telegram_chat_id=os.getenv("TELEGRAM_CHAT_ID"),
         webhook_url=os.getenv("WEBHOOK_URL"),
@@ -0,0 +1,225 @@
+// Reader for the Arrow IPC streams served by /api/floorsheet/data?format=arrow.
+// It understands the floorsheet archive schema only: int, float64, utf8 and
+// dictionary-encoded utf8 columns, uncompressed, little-endian.
+(function (global) {
+    'use strict';
+
+    const HEADER_SCHEMA = 1;
+    const HEADER_DICTIONARY_BATCH = 2;
+    const HEADER_RECORD_BATCH = 3;
+    const TYPE_INT = 2;
+    const TYPE_FLOATING_POINT = 3;
+    const TYPE_UTF8 = 5;
+    const PRECISION_DOUBLE = 2;
+    const INT_ARRAYS = {
+        8: [Int8Array, Uint8Array],
+        16: [Int16Array, Uint16Array],
+        32: [Int32Array, Uint32Array],
+        64: [BigInt64Array, BigUint64Array],
+    };
+    const utf8 = new TextDecoder();
+
+    // FlatBuffers table over the message metadata; slots are the field ids from the Arrow .fbs files.
+    class Table {
+        constructor(view, pos) {
+            this.view = view;
+            this.pos = pos;
+            this.vtable = pos - view.getInt32(pos, true);
+            this.vtableSize = view.getUint16(this.vtable, true);
+        }
+
+        offset(slot) {
+            const entry = 4 + 2 * slot;
+            return entry < this.vtableSize ? this.view.getUint16(this.vtable + entry, true) : 0;
+        }
+
+        uint8(slot, fallback = 0) {
+            const offset = this.offset(slot);
+            return offset ? this.view.getUint8(this.pos + offset) : fallback;
+        }
+
+        int16(slot, fallback = 0) {
+            const offset = this.offset(slot);
+            return offset ? this.view.getInt16(this.pos + offset, true) : fallback;
+        }
+
+        int32(slot, fallback = 0) {
+            const offset = this.offset(slot);
+            return offset ? this.view.getInt32(this.pos + offset, true) : fallback;
+        }
+
+        int64(slot, fallback = 0) {
+            const offset = this.offset(slot);
+            return offset ? Number(this.view.getBigInt64(this.pos + offset, true)) : fallback;
+        }
+
+        indirect(slot) {
+            const offset = this.offset(slot);
+            if (!offset) return 0;
+            const at = this.pos + offset;
+            return at + this.view.getUint32(at, true);
+        }
+
+        table(slot) {
+            const at = this.indirect(slot);
+            return at ? new Table(this.view, at) : null;
+        }
+
+        string(slot) {
+            const at = this.indirect(slot);
+            if (!at) return null;
+            const bytes = new Uint8Array(this.view.buffer, this.view.byteOffset + at + 4, this.view.getUint32(at, true));
+            return utf8.decode(bytes);
+        }
+
+        tables(slot) {
+            const at = this.indirect(slot);
+            if (!at) return [];
+            return Array.from({ length: this.view.getUint32(at, true) }, (_, i) => {
+                const element = at + 4 + 4 * i;
+                return new Table(this.view, element + this.view.getUint32(element, true));
+            });
+        }
+
+        // Vector of 16-byte structs of two int64s (FieldNode and Buffer).
+        int64Pairs(slot) {
+            const at = this.indirect(slot);
+            if (!at) return [];
+            return Array.from({ length: this.view.getUint32(at, true) }, (_, i) => {
+                const element = at + 4 + 16 * i;
+                return [
+                    Number(this.view.getBigInt64(element, true)),
+                    Number(this.view.getBigInt64(element + 8, true)),
+                ];
+            });
+        }
+    }
+
+    function readType(typeType, type) {
+        if (typeType === TYPE_INT) {
+            return { kind: 'int', bitWidth: type.int32(0), signed: Boolean(type.uint8(1)) };
+        }
+        if (typeType === TYPE_FLOATING_POINT && type.int16(0) === PRECISION_DOUBLE) {
+            return { kind: 'float64' };
+        }
+        if (typeType === TYPE_UTF8) {
+            return { kind: 'utf8' };
+        }
+        throw new Error(`Unsupported Arrow type ${typeType}`);
+    }
+
+    function readField(field) {
+        const dictionary = field.table(4);
+        const indexType = dictionary && dictionary.table(1);
+        return {
+            name: field.string(0),
+            type: readType(field.uint8(2), field.table(3)),
+            dictionaryId: dictionary ? dictionary.int64(0) : null,
+            // The spec defaults a missing index type to signed int32.
+            indexType: dictionary
+                ? (indexType ? readType(TYPE_INT, indexType) : { kind: 'int', bitWidth: 32, signed: true })
+                : null,
+        };
+    }
+
+    function typedArray(Type, buffer, byteOffset, length) {
+        if (byteOffset % Type.BYTES_PER_ELEMENT === 0) return new Type(buffer, byteOffset, length);
+        return new Type(buffer.slice(byteOffset, byteOffset + length * Type.BYTES_PER_ELEMENT));
+    }
+
+    function readValues(type, length, buffers, buffer, bodyStart) {
+        if (type.kind === 'utf8') {
+            const [offsetsAt] = buffers.shift();
+            const [dataAt, dataLength] = buffers.shift();
+            const offsets = typedArray(Int32Array, buffer, bodyStart + offsetsAt, length + 1);
+            const data = new Uint8Array(buffer, bodyStart + dataAt, dataLength);
+            // ASCII data (dates, times, ids) decodes once and is sliced, since byte and char offsets agree.
+            if (data.every(byte => byte < 0x80)) {
+                const text = utf8.decode(data);
+                return Array.from({ length }, (_, i) => text.slice(offsets[i], offsets[i + 1]));
+            }
+            return Array.from({ length }, (_, i) => utf8.decode(data.subarray(offsets[i], offsets[i + 1])));
+        }
+        const [dataAt] = buffers.shift();
+        const Type = type.kind === 'float64' ? Float64Array : INT_ARRAYS[type.bitWidth][type.signed ? 0 : 1];
+        const values = typedArray(Type, buffer, bodyStart + dataAt, length);
+        return type.bitWidth === 64 ? Array.from(values, Number) : Array.from(values);
+    }
+
+    // One array of values per field, in schema order, with nulls applied from the validity bitmaps.
+    function readBatch(batch, types, buffer, bodyStart) {
+        const nodes = batch.int64Pairs(1);
+        const buffers = batch.int64Pairs(2);
+        return types.map((type, index) => {
+            const [length, nullCount] = nodes[index];
+            const [validityAt, validityLength] = buffers.shift();
+            const values = readValues(type, length, buffers, buffer, bodyStart);
+            if (nullCount > 0 && validityLength > 0) {
+                const validity = new Uint8Array(buffer, bodyStart + validityAt, validityLength);
+                for (let i = 0; i < length; i++) {
+                    if (!((validity[i >> 3] >> (i & 7)) & 1)) values[i] = null;
+                }
+            }
+            return values;
+        });
+    }
+
+    // Decode a whole IPC stream into row objects keyed by field name, like the JSON API rows.
+    function readRows(buffer) {
+        const view = new DataView(buffer);
+        const dictionaries = new Map();
+        let fields = [];
+        let columns = [];
+        let pos = 0;
+        while (pos + 4 <= buffer.byteLength) {
+            let metadataLength = view.getInt32(pos, true);
+            pos += 4;
+            // 0xFFFFFFFF continuation marker precedes the length in the current format.
+            if (metadataLength === -1) {
+                metadataLength = view.getInt32(pos, true);
+                pos += 4;
+            }
+            if (metadataLength === 0) break;
+
+            const metadata = new DataView(buffer, pos, metadataLength);
+            const message = new Table(metadata, metadata.getUint32(0, true));
+            const headerType = message.uint8(1);
+            const header = message.table(2);
+            const bodyStart = pos + metadataLength;
+            pos = bodyStart + message.int64(3);
+
+            if (headerType === HEADER_SCHEMA) {
+                fields = header.tables(1).map(readField);
+                columns = fields.map(() => []);
+            } else if (headerType === HEADER_DICTIONARY_BATCH) {
+                const id = header.int64(0);
+                const field = fields.find(candidate => candidate.dictionaryId === id);
+                const [values] = readBatch(header.table(1), [field.type], buffer, bodyStart);
+                const isDelta = Boolean(header.uint8(2));
+                dictionaries.set(id, isDelta ? dictionaries.get(id).concat(values) : values);
+            } else if (headerType === HEADER_RECORD_BATCH) {
+                const types = fields.map(field => field.indexType || field.type);
+                readBatch(header, types, buffer, bodyStart).forEach((values, index) => {
+                    const field = fields[index];
+                    if (field.dictionaryId !== null) {
+                        const dictionary = dictionaries.get(field.dictionaryId);
+                        values = values.map(key => (key === null ? null : dictionary[key]));
+                    }
+                    columns[index] = columns[index].concat(values);
+                });
+            }
+        }
+
+        const names = fields.map(field => field.name);
+        const rowCount = columns.length ? columns[0].length : 0;
+        const rows = new Array(rowCount);
+        for (let i = 0; i < rowCount; i++) {
+            const row = {};
+            for (let index = 0; index < names.length; index++) row[names[index]] = columns[index][i];
+            rows[i] = row;
+        }
+        return rows;
+    }
+
+    global.ArrowStream = { readRows };
+})(typeof window !== 'undefined' ? window : globalThis);
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import unittest
+from datetime import datetime, timezone
+
+import pyarrow as pa
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from src.infrastructure.cache import floorsheet_query_cache
+from src.infrastructure.files import FLOORSHEET_ARCHIVE_SCHEMA
+from src.interfaces.http.api.routes.floorsheet import get_floorsheet_data, get_floorsheet_summary
+
+
+def make_request(path, query, headers=None):
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query.encode(),
+            "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+        }
+    )
+
+
+class FakeFloorsheetService:
+    def __init__(self):
+        self.version = 3
+        self.summary_calls = 0
+
+    async def get_data_version(self, date, ticker=None):
+        return self.version, datetime(2026, 4, 16, 9, 15, tzinfo=timezone.utc)
+
+    async def get_floorsheet_summary(self, date, ticker=None, group_by="buyer"):
+        self.summary_calls += 1
+        return {"summaries": [], "statistics": {"total_groups": 0}}
+
+    async def get_floorsheet_data(self, date=None, ticker=None):
+        return {"floorsheet": [], "count": 0}
+
+    async def get_floorsheet_table(self, date=None, ticker=None):
+        row = {name: None for name in FLOORSHEET_ARCHIVE_SCHEMA.names}
+        row.update(contract_id=1, stock_symbol="AAA", buyer_broker_name="Broker 10", contract_quantity=10)
+        return pa.Table.from_pylist([row, {**row, "contract_id": 2}], schema=FLOORSHEET_ARCHIVE_SCHEMA)
+
+
+class FloorsheetRouteCachingTests(unittest.TestCase):
+    def setUp(self):
+        floorsheet_query_cache.invalidate()
+        self.addCleanup(floorsheet_query_cache.invalidate)
+        self.service = FakeFloorsheetService()
+
+    def summary(self, headers=None, date="2026-04-16"):
+        request = make_request("/api/floorsheet/summary", f"date={date}&ticker=AAA", headers)
+        return asyncio.run(
+            get_floorsheet_summary(request, date=date, ticker="AAA", group_by="buyer", service=self.service)
+        )
+
+    def test_closed_date_is_validated_and_served_from_response_cache(self):
+        first = self.summary()
+        revalidated = self.summary({"If-None-Match": first.headers["etag"]})
+        since = self.summary({"If-Modified-Since": first.headers["last-modified"]})
+        reloaded = self.summary()
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(json.loads(first.body)["statistics"]["total_groups"], 0)
+        self.assertEqual(first.headers["cache-control"], "public, max-age=86400")
+        self.assertEqual(first.headers["last-modified"], "Thu, 16 Apr 2026 09:15:00 GMT")
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(since.status_code, 304)
+        self.assertEqual(reloaded.body, first.body)
+        self.assertEqual(self.service.summary_calls, 1)
+
+    def test_ingestion_version_changes_the_etag(self):
+        first = self.summary()
+        self.service.version = 4
+        second = self.summary({"If-None-Match": first.headers["etag"]})
+
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second.headers["etag"], first.headers["etag"])
+        self.assertEqual(self.service.summary_calls, 2)
+
+    def test_open_date_must_revalidate_and_is_not_cached_server_side(self):
+        first = self.summary(date="2999-01-01")
+        self.summary(date="2999-01-01")
+
+        self.assertEqual(first.headers["cache-control"], "no-cache")
+        self.assertEqual(self.service.summary_calls, 2)
+
+    def test_closed_date_without_ingested_data_must_revalidate(self):
+        self.service.version = 0
+
+        response = self.summary()
+
+        self.assertEqual(response.headers["cache-control"], "no-cache")
+
+    def test_malformed_date_is_rejected_before_querying(self):
+        with self.assertRaises(HTTPException) as caught:
+            self.summary(date="2026-4-2")
+
+        self.assertEqual(caught.exception.status_code, 400)
+        self.assertEqual(self.service.summary_calls, 0)
+
+
+class FloorsheetContentNegotiationTests(unittest.TestCase):
+    def setUp(self):
+        floorsheet_query_cache.invalidate()
+        self.addCleanup(floorsheet_query_cache.invalidate)
+        self.service = FakeFloorsheetService()
+
+    def data(self, headers=None, date="2026-04-16", limit=None):
+        request = make_request("/api/floorsheet/data", f"date={date}" if date else "", headers)
+        return asyncio.run(
+            get_floorsheet_data(
+                request,
+                date=date,
+                ticker=None,
+                cursor=None,
+                limit=limit,
+                format=None,
+                date_from=None,
+                date_to=None,
+                service=self.service,
+            )
+        )
+
+    def test_accept_header_selects_dictionary_encoded_arrow_stream(self):
+        arrow = self.data({"Accept": "application/vnd.apache.arrow.stream"})
+        plain = self.data()
+
+        table = pa.ipc.open_stream(arrow.body).read_all()
+        self.assertEqual(arrow.media_type, "application/vnd.apache.arrow.stream")
+        self.assertEqual(arrow.headers["vary"], "Accept")
+        self.assertEqual(table.column("contract_id").to_pylist(), [1, 2])
+        self.assertTrue(pa.types.is_dictionary(table.schema.field("buyer_broker_name").type))
+        self.assertEqual(plain.media_type, "application/json")
+        self.assertNotEqual(arrow.headers["etag"], plain.headers["etag"])
+
+    def test_paging_requires_a_single_date(self):
+        with self.assertRaises(HTTPException) as caught:
+            self.data(date=None, limit=10)
+
+        self.assertEqual(caught.exception.status_code, 400)
+
+    def test_malformed_date_is_rejected(self):
+        with self.assertRaises(HTTPException) as caught:
+            self.data(date="today")
+
+        self.assertEqual(caught.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
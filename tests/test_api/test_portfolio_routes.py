@@ -1,9 +1,15 @@
 import unittest
 import asyncio
+import json
 
+import numpy as np
 import pandas as pd
 
-from src.interfaces.http.api.routes.portfolio import get_portfolio_summary
+from src.interfaces.http.api.routes.portfolio import (
+    get_current_holdings,
+    get_portfolio_summary,
+    get_transaction_history,
+)
 
 
 class FakePortfolioService:
@@ -30,10 +36,25 @@ class FakePortfolioService:
         )
 
     def get_current_holdings(self, _current_prices):
-        return pd.DataFrame()
+        return pd.DataFrame(
+            {
+                "Scrip": ["AAA", "BBB"],
+                "Quantity": np.array([10, 5], dtype=np.int64),
+                "Current Price": [120.0, np.nan],
+                "First Purchase": pd.to_datetime(["2024-01-02", None]),
+            }
+        )
 
     def get_transaction_history(self):
-        return pd.DataFrame()
+        return pd.DataFrame(
+            {
+                "Scrip": ["AAA", "BBB"],
+                "Date": pd.to_datetime(["2024-01-02", "2024-01-03"]),
+                "Quantity": np.array([10, 5], dtype=np.int64),
+                "Rate": [0.1 + 0.2, 123.456789012345],
+                "Description": ["IPO", np.nan],
+            }
+        )
 
     def get_detailed_pools(self, _current_prices):
         return pd.DataFrame()
@@ -55,13 +76,28 @@ class PortfolioRouteTests(unittest.TestCase):
     def test_summary_route_returns_expected_payload(self):
         response = asyncio.run(get_portfolio_summary(FakePortfolioService()))
         self.assertEqual(response.status_code, 200)
-        payload = response.body.decode()
-        import json
-        payload = json.loads(payload)
+        payload = json.loads(response.body)
         self.assertEqual(payload["script_count"], 1)
         self.assertEqual(payload["totals"]["current_value"], 1200.0)
         self.assertEqual(payload["scripts"][0]["Scrip"], "AAA")
 
+    def test_transactions_keep_date_only_strings_and_blank_missing_text(self):
+        response = asyncio.run(get_transaction_history(FakePortfolioService()))
+        transactions = json.loads(response.body)["transactions"]
+
+        self.assertEqual([row["Date"] for row in transactions], ["2024-01-02", "2024-01-03"])
+        self.assertEqual(transactions[1]["Description"], "")
+        self.assertEqual(transactions[0]["Quantity"], 10)
+        self.assertEqual([row["Rate"] for row in transactions], [0.1 + 0.2, 123.456789012345])
+
+    def test_holdings_fill_missing_values(self):
+        response = asyncio.run(get_current_holdings(FakePortfolioService()))
+        holdings = json.loads(response.body)["holdings"]
+
+        self.assertEqual(holdings[0]["First Purchase"], "2024-01-02")
+        self.assertEqual(holdings[1]["First Purchase"], 0)
+        self.assertEqual(holdings[1]["Current Price"], 0)
+
 
 if __name__ == "__main__":
     unittest.main()
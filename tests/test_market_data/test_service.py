@@ -1,8 +1,27 @@
 import asyncio
+import tempfile
 import unittest
+from pathlib import Path
 from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from src.modules.market_data.service import FloorsheetQueryService
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.infrastructure.cache import TradeDateCache
+from src.infrastructure.db.models import Broker, Floorsheet, Scripts
+from src.infrastructure.db.repositories import FloorsheetBarRepository, FloorsheetBrokerDailyRepository, FloorsheetRepository
+from src.infrastructure.db.session import Base
+from src.infrastructure.files import FloorsheetArchive
+from src.modules.market_data.service import (
+    FloorsheetQueryService,
+    FloorsheetSyncService,
+    IntradayBarService,
+    ScriptRefreshService,
+    _rows_to_columns,
+)
 
 
 def make_row(contract_id, buyer, seller, quantity, rate, amount, trade_time):
@@ -21,6 +40,32 @@ def make_row(contract_id, buyer, seller, quantity, rate, amount, trade_time):
     )
 
 
+class AppScopedClientTests(unittest.TestCase):
+    """The scheduler jobs fetch through the client they are given, never the module fallback."""
+
+    def setUp(self):
+        self.nepse = MagicMock()
+        self.tracked = [SimpleNamespace(ticker="AAA")]
+
+    def test_floorsheet_sync_hands_its_client_to_the_fetcher(self):
+        service = FloorsheetSyncService(MagicMock(), self.nepse)
+        service.trackers = MagicMock(list_tracked_scripts=AsyncMock(return_value=self.tracked))
+        with patch("src.modules.market_data.service.FloorsheetFetcher") as fetcher_class:
+            fetcher = fetcher_class.return_value.__aenter__.return_value
+            fetcher.fetch_from_list = AsyncMock(return_value=[])
+            asyncio.run(service.sync_tracked("2026-04-16"))
+
+        fetcher_class.assert_called_once_with(nepse=self.nepse)
+
+    def test_script_refresh_fetches_through_its_client(self):
+        service = ScriptRefreshService(MagicMock(), self.nepse)
+        service.trackers = MagicMock(list_tracked_scripts=AsyncMock(return_value=self.tracked))
+        with patch("src.modules.market_data.service.fetch_all_script_details", AsyncMock(return_value=[])) as fetch:
+            asyncio.run(service.refresh_tracked())
+
+        fetch.assert_awaited_once_with(nepse=self.nepse)
+
+
 class StubFloorsheetRepository:
     def __init__(self, rows):
         self._rows = rows
@@ -28,6 +73,17 @@ class StubFloorsheetRepository:
     async def query_rows(self, date=None, ticker=None):
         return self._rows
 
+    async def query_columns(self, names, date=None, ticker=None):
+        return _rows_to_columns(self._rows, names)
+
+
+class StubVersionRepository:
+    def __init__(self):
+        self.version = 1
+
+    async def get(self, date, ticker=None):
+        return self.version, None
+
 
 class FloorsheetQueryServiceTests(unittest.TestCase):
     def test_price_switch_analysis_is_computed_server_side(self):
@@ -40,6 +96,7 @@ class FloorsheetQueryServiceTests(unittest.TestCase):
         ]
         service = FloorsheetQueryService(db=None)
         service.floorsheets = StubFloorsheetRepository(rows)
+        service.versions = StubVersionRepository()
 
         result = asyncio.run(service.get_price_switch_analysis(date="2026-04-16", ticker="AAA"))
 
@@ -53,6 +110,473 @@ class FloorsheetQueryServiceTests(unittest.TestCase):
         self.assertEqual(result["stats"]["switch_interval"], "20.000s")
         self.assertEqual(result["stats"]["minutes_after_open"], "40.000s")
 
+    def test_closed_date_price_switch_is_memoized_per_ticker_and_version(self):
+        rows = [
+            make_row(1, "10", "20", 100, 98.0, 9800.0, "11:00:10.000"),
+            make_row(2, "11", "21", 100, 99.0, 9900.0, "11:00:20.000"),
+            make_row(3, "12", "22", 100, 100.0, 10000.0, "11:00:30.000"),
+        ]
+        service = FloorsheetQueryService(db=None, cache=TradeDateCache(ttl=60))
+        service.floorsheets = StubFloorsheetRepository(rows)
+        service.versions = StubVersionRepository()
+
+        first = asyncio.run(service.get_price_switch_analysis(date="2020-01-02", ticker="AAA"))
+        service.floorsheets = StubFloorsheetRepository([])
+        cached = asyncio.run(service.get_price_switch_analysis(date="2020-01-02", ticker="AAA"))
+        other_ticker = asyncio.run(service.get_price_switch_analysis(date="2020-01-02", ticker="BBB"))
+        # A re-fetch in another process bumps the data version without touching this cache.
+        service.versions.version = 2
+        refetched = asyncio.run(service.get_price_switch_analysis(date="2020-01-02", ticker="AAA"))
+
+        self.assertEqual(first["levels"], {"highest": 100.0, "second": 99.0, "third": 98.0})
+        self.assertIs(cached, first)
+        self.assertEqual(other_ticker["rows"], [])
+        self.assertEqual(refetched["rows"], [])
+
+
+class FloorsheetSummaryTests(unittest.TestCase):
+    def setUp(self):
+        self.rows = [
+            make_row(1, "10", "20", 100, 0.1, 0.1, "11:00:01.000"),
+            make_row(2, "10", "20", 100, 0.2, 0.2, "11:00:02.000"),
+            make_row(3, "10", "21", 100, 0.3, 0.3, "11:00:03.000"),
+            make_row(4, None, "21", 100, 0.4, 0.4, "11:00:04.000"),
+            make_row(5, "11", "21", 50, 99.0, 4950.0, "11:00:05.000"),
+            make_row(6, "10", "21", 50, 98.0, 4900.0, "11:00:06.000"),
+        ]
+        self.service = FloorsheetQueryService(db=None)
+        self.service.floorsheets = StubFloorsheetRepository(self.rows)
+
+    def test_buyer_runs_match_row_by_row_totals(self):
+        result = asyncio.run(self.service.get_floorsheet_summary(date="2026-04-16"))
+
+        first = result["summaries"][0]
+        self.assertEqual([s["broker_id"] for s in result["summaries"]], ["10", "11", "10"])
+        # Amounts are accumulated left to right, so float totals keep their exact digits.
+        self.assertEqual(first["total_amount"], 0.1 + 0.2 + 0.3)
+        self.assertEqual(
+            first,
+            {
+                "broker_id": "10",
+                "broker_name": "Buyer 10",
+                "quantity": 300,
+                "trades": 3,
+                "total_amount": 0.1 + 0.2 + 0.3,
+                "average_price": 0.0,
+                "min_price": 0.1,
+                "max_price": 0.3,
+                "start_time": "11:00:01.000",
+            },
+        )
+        self.assertEqual(result["statistics"]["total_trades"], 5)
+
+    def test_seller_and_pair_groupings(self):
+        sellers = asyncio.run(self.service.get_floorsheet_summary(date="2026-04-16", group_by="seller"))
+        pairs = asyncio.run(self.service.get_floorsheet_summary(date="2026-04-16", group_by="pair"))
+
+        self.assertEqual([(s["broker_id"], s["trades"]) for s in sellers["summaries"]], [("20", 2), ("21", 4)])
+        self.assertEqual(
+            [(s["buyer_broker_id"], s["seller_broker_id"], s["trades"]) for s in pairs["summaries"]],
+            [("10", "20", 2), ("10", "21", 1), ("11", "21", 1), ("10", "21", 1)],
+        )
+
+
+class ArchivedFloorsheetQueryTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.archive = FloorsheetArchive(Path(tmp.name))
+        self.archive.write_date(
+            "2026-04-16",
+            {
+                "contract_id": [1, 2, 3],
+                "stock_symbol": ["BBB", "AAA", "AAA"],
+                "buyer_member_id": ["10", "11", "11"],
+                "seller_member_id": ["20", "21", "22"],
+                "buyer_broker_name": ["Buyer 10", "Buyer 11", "Buyer 11"],
+                "seller_broker_name": ["Seller 20", "Seller 21", "Seller 22"],
+                "contract_quantity": [10, 20, 30],
+                "contract_rate": [100.0, 99.0, 98.0],
+                "contract_amount": [1000.0, 1980.0, 2940.0],
+                "trade_date": ["2026-04-16"] * 3,
+                "trade_time": ["11:00:30.000000", "11:00:10.000000", "11:00:20.000000"],
+            },
+        )
+        self.service = FloorsheetQueryService(db=None, archive=self.archive)
+        self.service.floorsheets = StubFloorsheetRepository([])
+
+    def test_closed_date_is_served_from_archive_in_trade_time_order(self):
+        result = asyncio.run(self.service.get_floorsheet_data(date="2026-04-16"))
+
+        self.assertEqual(result["count"], 3)
+        self.assertEqual([row["contract_id"] for row in result["floorsheet"]], [2, 3, 1])
+        self.assertEqual(result["floorsheet"][0]["seller_broker_name"], "Seller 21")
+
+    def test_archive_serves_summary(self):
+        summary = asyncio.run(self.service.get_floorsheet_summary(date="2026-04-16", ticker="AAA"))
+
+        self.assertEqual(len(summary["summaries"]), 1)
+        self.assertEqual(summary["summaries"][0]["quantity"], 50)
+
+    def test_invalidated_date_falls_back_to_database(self):
+        self.archive.invalidate("2026-04-16")
+
+        result = asyncio.run(self.service.get_floorsheet_data(date="2026-04-16"))
+
+        self.assertEqual(result["count"], 0)
+
+    def test_archived_date_pages_by_cursor(self):
+        first = asyncio.run(self.service.get_floorsheet_page(date="2026-04-16", limit=2))
+        second = asyncio.run(self.service.get_floorsheet_page(date="2026-04-16", cursor=first["next_cursor"], limit=2))
+
+        self.assertEqual([row["contract_id"] for row in first["floorsheet"]], [2, 3])
+        self.assertEqual(first["next_cursor"], "11:00:20.000000_3")
+        self.assertEqual([row["contract_id"] for row in second["floorsheet"]], [1])
+        self.assertIsNone(second["next_cursor"])
+
+
+class KeysetFloorsheetQueryTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_async_engine(
+            "sqlite+aiosqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.session_factory = sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.archive = FloorsheetArchive(Path(tmp.name))
+
+        async def seed():
+            async with self.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            async with self.session_factory() as db:
+                db.add_all([Scripts(id=1, ticker="AAA", name="AAA Limited", href="/company/detail/1"), Broker(id=1, member_id="10", name="Broker 10")])
+                await db.flush()
+                # Two contracts share a trade time so the contract_id tie-breaker is exercised.
+                trade_times = ["11:00:01.000000", "11:00:02.000000", "11:00:02.000000", "11:00:03.500000", "11:00:04.000000"]
+                await FloorsheetRepository(db).upsert_many(
+                    [
+                        {
+                            "contract_id": contract_id,
+                            "script_id": 1,
+                            "buyer_broker_id": 1,
+                            "seller_broker_id": 1,
+                            "contract_quantity": 10,
+                            "contract_rate": 100.0,
+                            "contract_amount": 1000.0,
+                            "trade_book_id": 1,
+                            "trade_date": "2026-04-16",
+                            "trade_time": trade_time,
+                        }
+                        for contract_id, trade_time in zip([5, 4, 3, 2, 1], trade_times)
+                    ]
+                )
+                await db.commit()
+
+        asyncio.run(seed())
+
+    def test_pages_follow_trade_time_then_contract_id(self):
+        async def collect_pages():
+            pages = []
+            cursor = None
+            async with self.session_factory() as db:
+                service = FloorsheetQueryService(db, archive=self.archive)
+                while True:
+                    page = await service.get_floorsheet_page(date="2026-04-16", cursor=cursor, limit=2)
+                    pages.append([row["contract_id"] for row in page["floorsheet"]])
+                    cursor = page["next_cursor"]
+                    if cursor is None:
+                        return pages
+
+        self.assertEqual(asyncio.run(collect_pages()), [[5, 3], [4, 2], [1]])
+
+    def test_stream_yields_every_row_after_cursor(self):
+        async def collect():
+            async with self.session_factory() as db:
+                service = FloorsheetQueryService(db, archive=self.archive)
+                batches = service.iter_floorsheet_batches(date="2026-04-16", cursor="11:00:02.000000_3")
+                return [row["contract_id"] async for batch in batches for row in batch]
+
+        self.assertEqual(asyncio.run(collect()), [4, 2, 1])
+
+    def test_companies_are_counted_in_sql_and_cached_until_invalidated(self):
+        cache = TradeDateCache(ttl=60)
+
+        async def companies():
+            async with self.session_factory() as db:
+                return await FloorsheetQueryService(db, archive=self.archive, cache=cache).get_companies(date="2026-04-16")
+
+        async def delete_rows():
+            async with self.session_factory() as db:
+                await db.execute(delete(Floorsheet))
+                await db.commit()
+
+        first = asyncio.run(companies())
+        asyncio.run(delete_rows())
+        cached = asyncio.run(companies())
+        cache.invalidate("2026-04-16")
+        refreshed = asyncio.run(companies())
+
+        self.assertEqual(first["companies"], ["AAA"])
+        self.assertEqual(first["stats"], [{"ticker": "AAA", "trades": 5, "turnover": 5000.0}])
+        self.assertIs(cached, first)
+        self.assertEqual(refreshed["count"], 0)
+
+    def test_malformed_cursor_is_rejected(self):
+        service = FloorsheetQueryService(db=None, archive=self.archive)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(service.get_floorsheet_page(date="2026-04-16", cursor="not-a-cursor"))
+
+
+class BrokerNetPositionTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_async_engine(
+            "sqlite+aiosqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.session_factory = sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+
+        def trade(contract_id, trade_date, buyer, seller, quantity, rate):
+            return {
+                "contract_id": contract_id,
+                "script_id": 1,
+                "buyer_broker_id": buyer,
+                "seller_broker_id": seller,
+                "contract_quantity": quantity,
+                "contract_rate": rate,
+                "contract_amount": quantity * rate,
+                "trade_date": trade_date,
+                "trade_time": "11:00:00.000000",
+            }
+
+        async def seed():
+            async with self.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            async with self.session_factory() as db:
+                db.add_all(
+                    [
+                        Scripts(id=1, ticker="AAA", name="AAA Limited", href="/company/detail/1"),
+                        Broker(id=1, member_id="10", name="Broker 10"),
+                        Broker(id=2, member_id="20", name="Broker 20"),
+                    ]
+                )
+                await db.flush()
+                await FloorsheetBrokerDailyRepository(db).add_trades(
+                    [
+                        trade(1, "2026-04-15", 1, 2, 100, 10.0),
+                        trade(2, "2026-04-16", 1, 2, 50, 12.0),
+                        trade(3, "2026-04-16", 2, 1, 30, 11.0),
+                        # Outside the queried range.
+                        trade(4, "2026-04-20", 2, 1, 500, 9.0),
+                    ]
+                )
+                await db.commit()
+
+        asyncio.run(seed())
+
+    def _service(self, db):
+        return FloorsheetQueryService(db, cache=TradeDateCache(ttl=60))
+
+    def test_net_positions_sum_both_sides_over_the_range(self):
+        async def positions():
+            async with self.session_factory() as db:
+                return await self._service(db).get_broker_net_positions("2026-04-15", "2026-04-16")
+
+        by_broker = {row["broker_id"]: row for row in asyncio.run(positions())}
+
+        self.assertEqual(by_broker["10"]["buy_quantity"], 150)
+        self.assertEqual(by_broker["10"]["sell_quantity"], 30)
+        self.assertEqual(by_broker["10"]["net_quantity"], 120)
+        self.assertEqual(by_broker["10"]["net_amount"], 1600.0 - 330.0)
+        self.assertEqual(by_broker["10"]["turnover"], 1600.0 + 330.0)
+        self.assertEqual(by_broker["10"]["buy_vwap"], round(1600.0 / 150, 2))
+        self.assertEqual(by_broker["20"]["net_quantity"], -120)
+        self.assertEqual(by_broker["20"]["buy_vwap"], 11.0)
+
+    def test_top_brokers_split_accumulators_and_distributors(self):
+        async def top():
+            async with self.session_factory() as db:
+                return await self._service(db).get_top_brokers("2026-04-15", "2026-04-16", ticker="AAA", limit=5)
+
+        result = asyncio.run(top())
+
+        self.assertEqual([row["broker_id"] for row in result["accumulators"]], ["10"])
+        self.assertEqual([row["broker_id"] for row in result["distributors"]], ["20"])
+
+    def test_unknown_ranking_is_rejected(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(self._service(None).get_top_brokers("2026-04-15", "2026-04-16", rank_by="trades"))
+
+
+class RangeFloorsheetQueryTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_async_engine(
+            "sqlite+aiosqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.session_factory = sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+
+        def trade(contract_id, trade_date, script_id, buyer, quantity, rate, trade_time="11:00:00.000000"):
+            return {
+                "contract_id": contract_id,
+                "script_id": script_id,
+                "buyer_broker_id": buyer,
+                "seller_broker_id": 2,
+                "contract_quantity": quantity,
+                "contract_rate": rate,
+                "contract_amount": quantity * rate,
+                "trade_book_id": 1,
+                "trade_date": trade_date,
+                "trade_time": trade_time,
+            }
+
+        async def seed():
+            async with self.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            async with self.session_factory() as db:
+                db.add_all(
+                    [
+                        Scripts(id=1, ticker="AAA", name="AAA Limited", href="/company/detail/1"),
+                        Scripts(id=2, ticker="BBB", name="BBB Limited", href="/company/detail/2"),
+                        Broker(id=1, member_id="10", name="Broker 10"),
+                        Broker(id=2, member_id="20", name="Broker 20"),
+                    ]
+                )
+                await db.flush()
+                await FloorsheetRepository(db).upsert_many(
+                    [
+                        trade(1, "2026-04-15", 1, 1, 10, 100.0, "14:00:00.000000"),
+                        trade(2, "2026-04-16", 1, 1, 20, 110.0, "12:00:00.000000"),
+                        trade(3, "2026-04-16", 2, 2, 5, 50.0),
+                        trade(4, "2026-04-17", 1, 1, 99, 1.0),
+                    ]
+                )
+                await db.commit()
+
+        asyncio.run(seed())
+
+    def _service(self, db):
+        return FloorsheetQueryService(db, cache=TradeDateCache(ttl=60))
+
+    def test_range_stream_is_ordered_by_date_then_time(self):
+        async def collect():
+            async with self.session_factory() as db:
+                batches = self._service(db).iter_floorsheet_batches(date_from="2026-04-15", date_to="2026-04-16")
+                return [row["contract_id"] async for batch in batches for row in batch]
+
+        self.assertEqual(asyncio.run(collect()), [1, 3, 2])
+
+    def test_range_statistics_fold_every_day_in_range(self):
+        async def statistics(group_by):
+            async with self.session_factory() as db:
+                return await self._service(db).get_range_statistics("2026-04-15", "2026-04-16", group_by=group_by)
+
+        by_ticker = {group["key"]: group for group in asyncio.run(statistics("ticker"))["groups"]}
+        by_buyer = {group["key"]: group for group in asyncio.run(statistics("buyer"))["groups"]}
+
+        self.assertEqual(by_ticker["AAA"]["trades"], 2)
+        self.assertEqual(by_ticker["AAA"]["quantity"], 30)
+        self.assertEqual(by_ticker["AAA"]["vwap"], round(3200.0 / 30, 2))
+        self.assertEqual((by_ticker["AAA"]["min_price"], by_ticker["AAA"]["max_price"]), (100.0, 110.0))
+        self.assertEqual(by_ticker["BBB"]["total_amount"], 250.0)
+        self.assertEqual(by_buyer["10"]["label"], "Broker 10")
+        self.assertEqual(by_buyer["20"]["trades"], 1)
+
+    def test_companies_over_a_range(self):
+        async def companies():
+            async with self.session_factory() as db:
+                return await self._service(db).get_companies(date_from="2026-04-16", date_to="2026-04-17")
+
+        self.assertEqual(
+            asyncio.run(companies())["stats"],
+            [{"ticker": "AAA", "trades": 2, "turnover": 2299.0}, {"ticker": "BBB", "trades": 1, "turnover": 250.0}],
+        )
+
+
+class IntradayBarTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_async_engine(
+            "sqlite+aiosqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.session_factory = sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+        # (contract_id, trade_time, quantity, rate); the 11:00 minute arrives in two out-of-order pages.
+        trades = [
+            (3, "11:00:40.000000", 10, 102.0),
+            (4, "11:01:05.000000", 5, 99.0),
+            (1, "11:00:05.000000", 20, 100.0),
+            (2, "11:00:05.000000", 10, 105.0),
+        ]
+        self.rows = [
+            {
+                "contract_id": contract_id,
+                "script_id": 1,
+                "buyer_broker_id": 1,
+                "seller_broker_id": 1,
+                "contract_quantity": quantity,
+                "contract_rate": rate,
+                "contract_amount": quantity * rate,
+                "trade_book_id": 1,
+                "trade_date": "2026-04-16",
+                "trade_time": trade_time,
+            }
+            for contract_id, trade_time, quantity, rate in trades
+        ]
+
+        async def seed():
+            async with self.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            async with self.session_factory() as db:
+                db.add_all([Scripts(id=1, ticker="AAA", name="AAA Limited", href="/company/detail/1"), Broker(id=1, member_id="10", name="Broker 10")])
+                await db.flush()
+                await FloorsheetRepository(db).upsert_many(self.rows)
+                bars = FloorsheetBarRepository(db)
+                await bars.add_trades(self.rows[:2])
+                await bars.add_trades(self.rows[2:])
+                await db.commit()
+
+        asyncio.run(seed())
+
+    def _bars(self, interval_minutes):
+        async def read():
+            async with self.session_factory() as db:
+                return await IntradayBarService(db).get_bars("AAA", interval_minutes, "2026-04-16", "2026-04-16")
+
+        return asyncio.run(read())["bars"]
+
+    def test_incremental_bars_track_open_and_close_across_pages(self):
+        one_minute = self._bars(1)
+        five_minute = self._bars(5)
+
+        self.assertEqual([bar["time"] for bar in one_minute], ["11:00:00", "11:01:00"])
+        first = one_minute[0]
+        self.assertEqual((first["open"], first["high"], first["low"], first["close"]), (100.0, 105.0, 100.0, 102.0))
+        self.assertEqual(first["volume"], 40)
+        self.assertEqual(first["vwap"], round((2000.0 + 1050.0 + 1020.0) / 40, 2))
+        self.assertEqual(len(five_minute), 1)
+        self.assertEqual((five_minute[0]["open"], five_minute[0]["close"], five_minute[0]["trades"]), (100.0, 99.0, 4))
+
+    def test_rebuild_matches_incremental_bars(self):
+        incremental = {minutes: self._bars(minutes) for minutes in (1, 5, 15)}
+
+        async def rebuild():
+            async with self.session_factory() as db:
+                await FloorsheetBarRepository(db).rebuild({("2026-04-16", 1)})
+                await db.commit()
+
+        asyncio.run(rebuild())
+
+        self.assertEqual({minutes: self._bars(minutes) for minutes in (1, 5, 15)}, incremental)
+
+    def test_unknown_interval_is_rejected(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(IntradayBarService(None).get_bars("AAA", 3, "2026-04-16", "2026-04-16"))
+
 
 if __name__ == "__main__":
     unittest.main()
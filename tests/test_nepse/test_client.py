@@ -0,0 +1,226 @@
+import asyncio
+import base64
+import json
+import tempfile
+import time
+import unittest
+from dataclasses import replace
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+from wasmtime import wat2wasm
+
+from src.core.nepse import client
+from src.core.nepse.errors import NEPSERequestError, NEPSEUnavailableError
+from src.core.nepse.throttle import RetryPolicy
+from src.core.nepse.fetch import fetch_all_script_details
+
+
+class SharedNEPSEClientTests(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(client, "NEPSE", side_effect=lambda: MagicMock(aclose=AsyncMock()))
+        self.nepse_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: setattr(client, "_shared_client", None))
+        client._shared_client = None
+
+    def test_one_client_is_reused_until_closed(self):
+        first = client.get_shared_nepse()
+        second = client.get_shared_nepse()
+        asyncio.run(client.close_shared_nepse())
+        reopened = client.get_shared_nepse()
+
+        self.assertIs(first, second)
+        first.aclose.assert_awaited_once()
+        self.assertIsNot(reopened, first)
+        self.assertEqual(self.nepse_class.call_count, 2)
+
+    def test_fetchers_use_the_shared_client(self):
+        shared = client.get_shared_nepse()
+        shared.fetch_today_price = AsyncMock(return_value={"content": [{"symbol": "AAA"}], "last": True})
+
+        rows = asyncio.run(fetch_all_script_details("2026-04-16"))
+
+        self.assertEqual(rows, [{"symbol": "AAA"}])
+        shared.fetch_today_price.assert_awaited_once()
+        shared.aclose.assert_not_called()
+        self.assertEqual(self.nepse_class.call_count, 1)
+
+
+# Each export returns a fixed offset from one of its salt arguments, so argument order matters.
+_SALT_WAT = """
+(module
+  (func (export "cdx") (param i32 i32 i32 i32 i32) (result i32) local.get 0)
+  (func (export "rdx") (param i32 i32 i32 i32 i32) (result i32) (i32.add (local.get 2) (i32.const 2)))
+  (func (export "bdx") (param i32 i32 i32 i32 i32) (result i32) (i32.add (local.get 3) (i32.const 6)))
+  (func (export "ndx") (param i32 i32 i32 i32 i32) (result i32) (i32.add (local.get 1) (i32.const 9)))
+  (func (export "mdx") (param i32 i32 i32 i32 i32) (result i32) (i32.add (local.get 4) (i32.const 12)))
+)
+"""
+
+
+class WasmTokenTrimTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.data_dir = Path(tmp.name)
+        (self.data_dir / "css.wasm").write_bytes(wat2wasm(_SALT_WAT))
+        patcher = patch.object(client, "config", replace(client.config, data_dir=self.data_dir, nepse_landing_dir=None))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(client._compiled_modules.clear)
+        client._compiled_modules.clear()
+
+    def test_compiled_module_is_reused_across_processes(self):
+        client.NEPSE()
+        cached = list(self.data_dir.glob("css.*.cwasm"))
+        self.assertEqual(len(cached), 1)
+
+        # A fresh process only has the serialized build on disk.
+        client._compiled_modules.clear()
+        with patch.object(client, "Module", wraps=client.Module) as module_class:
+            nepse = client.NEPSE()
+        module_class.assert_not_called()
+        module_class.deserialize_file.assert_called_once()
+        self.assertEqual(nepse._trim_access_token("abcdefghijklmnopqrstuvwxyz", [1, 2, 3, 4, 5]), "acdefhikmnopqstuvwxyz")
+
+    def test_tokens_trim_at_memoized_salt_positions(self):
+        nepse = client.NEPSE()
+        calls = []
+        nepse._salt_exports = tuple(
+            (lambda store, *salts, func=func: calls.append(salts) or func(store, *salts)) for func in nepse._salt_exports
+        )
+        token = "abcdefghijklmnopqrstuvwxyz"
+
+        access = nepse._trim_access_token(token, [1, 2, 3, 4, 5])
+        refresh = nepse._trim_refresh_token(token, [1, 2, 3, 4, 5])
+        self.assertEqual(nepse._trim_access_token(token, [1, 2, 3, 4, 5]), access)
+
+        # Access positions are 1, 6, 9, 11, 17 and refresh positions 2, 5, 9, 10, 17.
+        self.assertEqual(access, "acdefhikmnopqstuvwxyz")
+        self.assertEqual(refresh, "abdeghilmnopqstuvwxyz")
+        self.assertEqual(len(calls), 10)
+
+
+def _jwt(exp: float) -> str:
+    claims = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).rstrip(b"=").decode()
+    return f"header.{claims}.signature"
+
+
+class TokenRefreshTests(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(client.NEPSE, "_setup_wasm")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.nepse = client.NEPSE()
+        self.refreshes = 0
+
+        async def refresh_access_token():
+            self.refreshes += 1
+            await asyncio.sleep(0.01)
+            self.nepse.access_token = f"token-{self.refreshes}"
+            self.nepse._mark_token_issued()
+            return True
+
+        self.nepse.refresh_access_token = refresh_access_token
+
+    def test_expiry_is_read_from_the_token(self):
+        self.assertAlmostEqual(client._token_ttl(_jwt(time.time() + 300)), 300, delta=1)
+        self.assertEqual(client._token_ttl("not-a-jwt"), client._TOKEN_TTL_SECONDS)
+
+    def test_expiring_token_is_refreshed_once_for_concurrent_callers(self):
+        self.nepse.access_token = _jwt(time.time() + 2)
+        self.nepse._mark_token_issued()
+        self.assertFalse(self.nepse._token_is_fresh())
+
+        async def run():
+            return await asyncio.gather(*(self.nepse.ensure_authenticated() for _ in range(20)))
+
+        self.assertTrue(all(asyncio.run(run())))
+        self.assertEqual(self.refreshes, 1)
+        self.assertEqual(self.nepse.access_token, "token-1")
+
+    def test_concurrent_401s_share_one_refresh(self):
+        self.nepse.access_token = "token-0"
+        self.nepse.salt_values = [1, 2, 3, 4, 5]
+        self.nepse._mark_token_issued()
+
+        async def request(method, url, params=None, headers=None, content=None):
+            await asyncio.sleep(0)
+            status = 401 if headers["Authorization"] == "Salter token-0" else 200
+            return httpx.Response(status, request=httpx.Request("POST", url))
+
+        async def run():
+            http = await self.nepse._ensure_client()
+            with patch.object(http, "request", side_effect=request):
+                return await asyncio.gather(*(self.nepse._post_authorized("/api/x") for _ in range(10)))
+
+        responses = asyncio.run(run())
+        self.assertEqual({response.status_code for response in responses}, {200})
+        self.assertEqual(self.refreshes, 1)
+
+
+class RetryPolicyTests(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(client.NEPSE, "_setup_wasm")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.nepse = client.NEPSE()
+        self.nepse.access_token = "token"
+        self.nepse.salt_values = [1, 2, 3, 4, 5]
+        self.nepse._mark_token_issued()
+        self.nepse.retry_policies[client.TODAY_PRICE_PATH] = RetryPolicy(attempts=3, base_delay=0)
+        self.bodies = []
+
+    def _fetch(self, statuses):
+        statuses = iter(statuses)
+
+        async def request(method, url, params=None, headers=None, content=None):
+            self.bodies.append(content)
+            status = next(statuses)
+            if status is None:
+                raise httpx.ReadTimeout("timed out", request=httpx.Request(method, url))
+            return httpx.Response(status, json={"content": [], "last": True}, request=httpx.Request(method, url))
+
+        async def run():
+            http = await self.nepse._ensure_client()
+            with patch.object(http, "request", side_effect=request):
+                return await self.nepse.fetch_today_price(business_date="2026-04-16")
+
+        return asyncio.run(run())
+
+    def test_transient_failures_are_retried_with_a_fresh_request_id(self):
+        with patch.object(self.nepse, "calculate_request_id", side_effect=[11, 12, 13]):
+            data = self._fetch([None, 503, 200])
+
+        self.assertEqual(data, {"content": [], "last": True})
+        self.assertEqual([json.loads(body)["id"] for body in self.bodies], [11, 12, 13])
+
+    def test_exhausted_retries_raise_instead_of_returning_empty(self):
+        with self.assertRaises(NEPSERequestError) as caught:
+            self._fetch([503, 503, 502])
+
+        self.assertEqual(caught.exception.status_code, 502)
+        self.assertEqual(len(self.bodies), 3)
+
+    def test_client_errors_are_not_retried(self):
+        with self.assertRaises(NEPSERequestError) as caught:
+            self._fetch([404])
+
+        self.assertEqual(caught.exception.status_code, 404)
+        self.assertEqual(len(self.bodies), 1)
+
+    def test_open_circuit_during_authentication_is_not_reported_as_bad_credentials(self):
+        self.nepse.access_token = None
+        self.nepse.breaker._opened_at = time.monotonic()
+
+        with self.assertRaises(NEPSEUnavailableError):
+            self._fetch([])
+        with self.assertRaises(NEPSEUnavailableError):
+            asyncio.run(self.nepse.authenticate())
+        self.assertEqual(self.bodies, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,414 @@
+import asyncio
+import unittest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.core.nepse.floorsheet import FloorsheetFetcher
+from src.database.schemas import FloorsheetSchema, parse_floorsheet_page
+from src.infrastructure.db.models import Broker, Floorsheet, FloorsheetBrokerDaily, Scripts
+from src.infrastructure.db.repositories import FloorsheetBrokerDailyRepository, FloorsheetDataVersionRepository
+from src.infrastructure.db.session import Base
+
+
+def make_item(contract_id, buyer="10", seller="20", rate=100.0, trade_time="2026-04-02T11:00:33.197375"):
+    return {
+        "contractId": contract_id,
+        "stockSymbol": "AAA",
+        "stockId": 101,
+        "buyerMemberId": buyer,
+        "sellerMemberId": seller,
+        "buyerBrokerName": f"Broker {buyer}",
+        "sellerBrokerName": f"Broker {seller}",
+        "contractQuantity": 10,
+        "contractRate": rate,
+        "contractAmount": rate * 10,
+        "tradeBookId": 1,
+        "tradeTime": trade_time,
+        "securityName": "AAA Limited",
+    }
+
+
+class FloorsheetFetcherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_async_engine(
+            "sqlite+aiosqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.session_factory = sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+
+        @asynccontextmanager
+        async def get_test_db():
+            async with self.session_factory() as session:
+                yield session
+
+        async def create_tables():
+            async with self.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+        asyncio.run(create_tables())
+        patchers = [
+            patch("src.core.nepse.floorsheet.get_db", get_test_db),
+            patch("src.core.nepse.floorsheet.get_shared_nepse"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.fetcher = FloorsheetFetcher()
+
+    def count(self, model):
+        async def run():
+            async with self.session_factory() as session:
+                return (await session.execute(select(func.count()).select_from(model))).scalar_one()
+
+        return asyncio.run(run())
+
+
+class SaveFloorsheetDataTests(FloorsheetFetcherTestCase):
+    def test_page_is_upserted_with_new_updated_and_skipped_counts(self):
+        page = [make_item(1), make_item(2, buyer="11"), {"contractId": 3}]
+
+        first = asyncio.run(self.fetcher.save_floorsheet_data(page))
+        second = asyncio.run(self.fetcher.save_floorsheet_data([make_item(2, rate=101.0), make_item(4)]))
+
+        self.assertEqual(first, (2, 0, 1))
+        self.assertEqual(second, (1, 1, 0))
+        self.assertEqual(self.count(Floorsheet), 3)
+        self.assertEqual(self.count(Broker), 3)
+        self.assertEqual(self.count(Scripts), 1)
+
+    def test_upsert_updates_existing_contract_in_place(self):
+        asyncio.run(self.fetcher.save_floorsheet_data([make_item(1)]))
+        asyncio.run(FloorsheetFetcher().save_floorsheet_data([make_item(1, rate=120.0)]))
+
+        async def load():
+            async with self.session_factory() as session:
+                return (await session.execute(select(Floorsheet))).scalars().one()
+
+        row = asyncio.run(load())
+        self.assertEqual(row.contract_rate, 120.0)
+        self.assertEqual(row.trade_date, "2026-04-02")
+        self.assertIsNotNone(row.created_at)
+
+    def test_each_saved_page_bumps_the_data_version(self):
+        asyncio.run(self.fetcher.save_floorsheet_data([make_item(1)]))
+        asyncio.run(self.fetcher.save_floorsheet_data([make_item(2)]))
+
+        async def load():
+            async with self.session_factory() as session:
+                return await FloorsheetDataVersionRepository(session).get("2026-04-02", "AAA")
+
+        version, last_modified = asyncio.run(load())
+        self.assertEqual(version, 2)
+        self.assertIsNotNone(last_modified.tzinfo)
+
+
+class BrokerDailyAggregateTests(FloorsheetFetcherTestCase):
+    def load_aggregates(self):
+        async def run():
+            async with self.session_factory() as session:
+                rows = (await session.execute(select(FloorsheetBrokerDaily))).scalars().all()
+                return {
+                    (row.broker_id, row.side): (
+                        row.quantity,
+                        row.amount,
+                        row.trades,
+                        row.min_rate,
+                        row.max_rate,
+                        row.first_time,
+                        row.last_time,
+                    )
+                    for row in rows
+                }
+
+        return asyncio.run(run())
+
+    def rebuilt_aggregates(self):
+        async def run():
+            async with self.session_factory() as session:
+                await FloorsheetBrokerDailyRepository(session).rebuild(trade_date="2026-04-02")
+                await session.commit()
+
+        asyncio.run(run())
+        return self.load_aggregates()
+
+    def test_pages_are_folded_into_daily_broker_totals(self):
+        asyncio.run(self.fetcher.save_floorsheet_data([make_item(1), make_item(2, buyer="11", rate=102.0)]))
+        asyncio.run(
+            self.fetcher.save_floorsheet_data(
+                [make_item(3, rate=98.0, trade_time="2026-04-02T11:05:00.000000"), make_item(4, buyer="11")]
+            )
+        )
+
+        aggregates = self.load_aggregates()
+
+        self.assertEqual(len(aggregates), 3)
+        self.assertIn((2020.0, 102.0), {(value[1], value[4]) for value in aggregates.values()})
+        seller = next(value for (_, side), value in aggregates.items() if side == "sell")
+        self.assertEqual(seller[:5], (40, 4000.0, 4, 98.0, 102.0))
+        self.assertEqual(seller[5:], ("11:00:33.197375", "11:05:00.000000"))
+        self.assertEqual(aggregates, self.rebuilt_aggregates())
+
+    def test_refetched_contract_recomputes_its_script_day(self):
+        asyncio.run(self.fetcher.save_floorsheet_data([make_item(1), make_item(2)]))
+        asyncio.run(self.fetcher.save_floorsheet_data([make_item(2, rate=150.0), make_item(3)]))
+
+        aggregates = self.load_aggregates()
+
+        buyer = next(value for (_, side), value in aggregates.items() if side == "buy")
+        self.assertEqual(buyer[:5], (30, 3500.0, 3, 100.0, 150.0))
+        self.assertEqual(aggregates, self.rebuilt_aggregates())
+
+
+class ParseFloorsheetPageTests(unittest.TestCase):
+    def test_columns_match_floorsheet_schema(self):
+        items = [
+            make_item(1),
+            make_item(2, trade_time="2026-04-02T11:00:33"),
+            make_item(3, trade_time="2026-04-02T11:00:33.5Z"),
+            {**make_item(4), "contractQuantity": "25", "buyerMemberId": None},
+        ]
+
+        page = parse_floorsheet_page(items)
+
+        self.assertEqual(page.errors, [])
+        for index, item in enumerate(items):
+            schema = FloorsheetSchema(**item)
+            for name in ("contract_id", "buyer_member_id", "contract_quantity", "contract_rate", "trade_date", "trade_time"):
+                self.assertEqual(getattr(page, name)[index], getattr(schema, name), name)
+
+    def test_bad_rows_are_reported_with_index_and_field(self):
+        items = [make_item(1), {**make_item(2), "contractRate": "n/a"}, {**make_item(3), "tradeTime": "yesterday"}, {"contractId": 4}]
+
+        page = parse_floorsheet_page(items)
+
+        self.assertEqual(page.contract_id, [1])
+        self.assertEqual(
+            [(error.index, error.contract_id, error.field) for error in page.errors],
+            [(1, 2, "contractRate"), (2, 3, "tradeTime"), (3, 4, "stockSymbol")],
+        )
+
+
+class FakeNEPSE:
+    def __init__(self):
+        self.access_token = None
+        self.authenticate_calls = 0
+        self.closed = False
+
+    async def ensure_authenticated(self):
+        if not self.access_token:
+            self.authenticate_calls += 1
+            self.access_token = "token"
+        return True
+
+    async def aclose(self):
+        self.closed = True
+
+
+class BackfillTests(unittest.TestCase):
+    def test_backfill_bounds_concurrency_and_shares_one_session(self):
+        nepse = FakeNEPSE()
+        fetcher = FloorsheetFetcher(nepse=nepse)
+        running = 0
+        peak = 0
+
+        async def fake_fetch_and_save(ticker, date, force=False, incremental=False, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {"ticker": ticker, "date": date, "status": "success"}
+
+        fetcher.fetch_and_save = fake_fetch_and_save
+        fetch_list = [{"ticker": f"T{i}", "date": "2026-04-02"} for i in range(6)] + [{"date": "2026-04-02"}]
+
+        async def run():
+            async with fetcher:
+                return [result async for result in fetcher.backfill(fetch_list, concurrency=2)]
+
+        results = asyncio.run(run())
+
+        self.assertEqual(len(results), 7)
+        self.assertEqual(peak, 2)
+        self.assertEqual(nepse.authenticate_calls, 1)
+        self.assertEqual(sum(result["status"] == "error" for result in results), 1)
+        self.assertFalse(nepse.closed)
+
+
+class PipelinedFetchTests(unittest.TestCase):
+    def make_fetcher(self, pages):
+        fetcher = FloorsheetFetcher(nepse=FakeNEPSE())
+        events = []
+
+        async def fake_check_existing_data(ticker, date):
+            return False
+
+        async def fake_get_stock_id(ticker):
+            return 101
+
+        async def fake_fetch_floorsheet(stock_id, ticker, date, page=0, size=500):
+            events.append(("fetch", page))
+            await asyncio.sleep(0.01)
+            content = [{"contractId": contract_id} for contract_id in pages[page]]
+            return {"floorsheets": {"content": content, "last": page == len(pages) - 1}}
+
+        async def fake_save(content, checkpoint=None):
+            events.append(("save_start", content[0]["contractId"]))
+            await asyncio.sleep(0.02)
+            events.append(("save_end", content[0]["contractId"]))
+            return len(content), 0, 0
+
+        fetcher.check_existing_data = fake_check_existing_data
+        fetcher.get_stock_id = fake_get_stock_id
+        fetcher.fetch_floorsheet = fake_fetch_floorsheet
+        fetcher.save_floorsheet_data = fake_save
+        fetcher.mark_synced = AsyncMock()
+        return fetcher, events
+
+    def test_next_page_is_fetched_while_previous_page_is_saved(self):
+        fetcher, events = self.make_fetcher([[0, 1], [2, 3], [4]])
+
+        result = asyncio.run(fetcher.fetch_and_save("AAA", "2026-04-02"))
+
+        self.assertEqual(result["new"], 5)
+        self.assertLess(events.index(("fetch", 1)), events.index(("save_end", 0)))
+        self.assertEqual([event for event in events if event[0] == "save_start"], [("save_start", 0), ("save_start", 2), ("save_start", 4)])
+
+    def test_fetch_error_propagates_instead_of_hanging(self):
+        fetcher, _ = self.make_fetcher([[0]])
+
+        async def failing_fetch(*args, **kwargs):
+            raise RuntimeError("boom")
+
+        fetcher.fetch_floorsheet = failing_fetch
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(fetcher.fetch_and_save("AAA", "2026-04-02"))
+
+    def test_save_error_is_reported_instead_of_counted_as_skipped(self):
+        fetcher, _ = self.make_fetcher([[0], [1]])
+
+        async def failing_save(content, checkpoint=None):
+            raise RuntimeError("database is locked")
+
+        fetcher.save_floorsheet_data = failing_save
+
+        result = asyncio.run(fetcher._run_fetch_item({"ticker": "AAA", "date": "2026-04-02"}))
+
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["reason"], "database is locked")
+
+
+class IncrementalSyncTests(FloorsheetFetcherTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pages = []
+        self.requested_pages = []
+        self.fail_on_page = set()
+
+        async def fake_get_stock_id(ticker):
+            return 101
+
+        async def fake_fetch_floorsheet(stock_id, ticker, date, page=0, size=500):
+            self.requested_pages.append(page)
+            if page in self.fail_on_page:
+                raise RuntimeError("connection reset")
+            return {"floorsheets": {"content": self.pages[page], "last": page == len(self.pages) - 1}}
+
+        self.fetcher.get_stock_id = fake_get_stock_id
+        self.fetcher.fetch_floorsheet = fake_fetch_floorsheet
+
+    def sync(self, pages):
+        self.pages = pages
+        self.requested_pages.clear()
+        return asyncio.run(self.fetcher.fetch_and_save("AAA", "2026-04-02", incremental=True))
+
+    def test_incremental_sync_stops_at_last_completed_pass(self):
+        self.sync([[make_item(2), make_item(1)]])
+
+        result = self.sync([[make_item(5), make_item(4)], [make_item(3), make_item(2)], [make_item(1)]])
+
+        self.assertEqual(self.requested_pages, [0, 1])
+        self.assertEqual((result["new"], result["updated"]), (3, 0))
+        self.assertEqual(self.count(Floorsheet), 5)
+
+    def test_interrupted_sync_is_completed_by_the_next_poll(self):
+        pages = [[make_item(6), make_item(5)], [make_item(4), make_item(3)], [make_item(2), make_item(1)]]
+        self.fail_on_page = {1}
+        with self.assertRaises(RuntimeError):
+            self.sync(pages)
+        self.assertEqual(self.count(Floorsheet), 2)
+
+        self.fail_on_page = set()
+        result = self.sync(pages)
+
+        self.assertEqual(self.requested_pages, [0, 1, 2])
+        self.assertEqual(result["new"], 4)
+        self.assertEqual(self.count(Floorsheet), 6)
+
+        self.sync([[make_item(7), make_item(6)], *pages])
+        self.assertEqual(self.requested_pages, [0])
+        self.assertEqual(self.count(Floorsheet), 7)
+
+
+class ResumableJobTests(FloorsheetFetcherTestCase):
+    def run_interrupted_job(self, incremental=False):
+        """Fail the first run on page 1, then resume; returns both results and the resumed pages."""
+        pages = [[make_item(6), make_item(5)], [make_item(4), make_item(3)], [make_item(2), make_item(1)]]
+        requested_pages = []
+        fail_on_page = {1}
+
+        async def fake_get_stock_id(ticker):
+            return 101
+
+        async def fake_fetch_floorsheet(stock_id, ticker, date, page=0, size=500):
+            requested_pages.append(page)
+            if page in fail_on_page:
+                raise RuntimeError("connection reset")
+            return {"floorsheets": {"content": pages[page], "last": page == len(pages) - 1}}
+
+        self.fetcher.nepse.ensure_authenticated = AsyncMock(return_value=True)
+        self.fetcher.get_stock_id = fake_get_stock_id
+        self.fetcher.fetch_floorsheet = fake_fetch_floorsheet
+
+        async def run_all(iterator):
+            return [result async for result in iterator]
+
+        fetch_list = [{"ticker": "AAA", "date": "2026-04-02", "incremental": incremental}]
+        job_id = asyncio.run(self.fetcher.create_job(fetch_list, source="test"))
+        first = asyncio.run(run_all(self.fetcher.run_job(job_id)))
+
+        fail_on_page.clear()
+        requested_pages.clear()
+        second = asyncio.run(run_all(self.fetcher.resume_job()))
+
+        self.assertEqual(asyncio.run(run_all(self.fetcher.resume_job())), [])
+        return first[0], second[0], requested_pages
+
+    def test_resume_continues_from_last_committed_page(self):
+        first, second, requested_pages = self.run_interrupted_job()
+
+        self.assertEqual(first["status"], "error")
+        self.assertEqual(second["status"], "success")
+        self.assertEqual(requested_pages, [1, 2])
+        self.assertEqual(second["new"], 4)
+        self.assertEqual(self.count(Floorsheet), 6)
+
+    def test_incremental_resume_fetches_pages_below_the_committed_ones(self):
+        first, second, requested_pages = self.run_interrupted_job(incremental=True)
+
+        self.assertEqual(first["status"], "error")
+        self.assertEqual(second["status"], "success")
+        self.assertEqual(requested_pages, [1, 2])
+        self.assertEqual(second["new"], 4)
+        self.assertEqual(self.count(Floorsheet), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core.nepse.replay import replay_floorsheet
+from src.infrastructure.db.models import Floorsheet
+from src.infrastructure.files import RawPayloadStore
+from tests.test_nepse.test_floorsheet import FloorsheetFetcherTestCase, make_item
+
+
+class RawPayloadStoreTests(unittest.TestCase):
+    def test_records_round_trip_per_endpoint_and_date(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = RawPayloadStore(Path(tmp))
+            store.write("floorsheet", "2026-04-02", {"page": 0}, {"floorsheets": {"content": [1]}})
+            store.write("floorsheet", "2026-04-02", {"page": 1}, {"floorsheets": {"content": [2]}})
+            store.write("floorsheet", "2026-04-03", {"page": 0}, {"floorsheets": {"content": [3]}})
+
+            records = list(store.iter_records("floorsheet", "2026-04-02"))
+
+            self.assertEqual(store.list_dates("floorsheet"), ["2026-04-02", "2026-04-03"])
+            self.assertEqual([record["params"]["page"] for record in records], [0, 1])
+            self.assertEqual(store.list_dates("today-price"), [])
+
+
+class ReplayFloorsheetTests(FloorsheetFetcherTestCase):
+    def test_replay_rebuilds_floorsheet_without_network(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = RawPayloadStore(Path(tmp))
+            store.write("floorsheet", "2026-04-02", {"page": 0}, {"floorsheets": {"content": [make_item(2), make_item(1)]}})
+            store.write("floorsheet", "2026-04-02", {"page": 0}, {"floorsheets": {"content": [make_item(2)]}})
+
+            totals = asyncio.run(replay_floorsheet(store))
+
+        self.assertEqual(totals, {"pages": 2, "new": 2, "updated": 1, "skipped": 0})
+        self.assertEqual(self.count(Floorsheet), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
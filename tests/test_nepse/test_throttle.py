@@ -0,0 +1,98 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from src.core.nepse import client
+from src.core.nepse.errors import NEPSEUnavailableError
+from src.core.nepse.throttle import AdaptiveRateLimiter, CircuitBreaker
+
+
+class AdaptiveRateLimiterTests(unittest.TestCase):
+    def test_burst_then_paced_reservations(self):
+        limiter = AdaptiveRateLimiter(2.0, burst=2)
+
+        delays = [limiter.reserve() for _ in range(4)]
+
+        self.assertEqual(delays[:2], [0.0, 0.0])
+        self.assertAlmostEqual(delays[2], 0.5, delta=0.05)
+        self.assertAlmostEqual(delays[3], 1.0, delta=0.05)
+
+    def test_rate_backs_off_on_throttling_and_recovers(self):
+        limiter = AdaptiveRateLimiter(8.0, min_rate=1.0, increase=1.0)
+
+        limiter.record_throttled(retry_after=3)
+        limiter.record_success(elapsed=10.0)
+        self.assertEqual(limiter.rate, 2.0)
+        self.assertGreaterEqual(limiter.reserve(), 2.9)
+
+        for _ in range(10):
+            limiter.record_success(elapsed=0.1)
+        self.assertEqual(limiter.rate, 8.0)
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def test_opens_after_consecutive_failures_and_probes_once(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+
+        with self.assertRaises(NEPSEUnavailableError):
+            breaker.before_call()
+
+        breaker._opened_at -= 30
+        breaker.before_call()
+        with self.assertRaises(NEPSEUnavailableError):
+            breaker.before_call()
+        breaker.record_success()
+        breaker.before_call()
+        self.assertFalse(breaker.is_open)
+
+
+class GuardedSendTests(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(client.NEPSE, "_setup_wasm")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.nepse = client.NEPSE()
+        self.calls = 0
+
+    def _run(self, handler, count):
+        async def request(method, url, **kwargs):
+            self.calls += 1
+            return handler(httpx.Request(method, url))
+
+        async def run():
+            http = await self.nepse._ensure_client()
+            outcomes = []
+            with patch.object(http, "request", side_effect=request):
+                for _ in range(count):
+                    try:
+                        outcomes.append((await self.nepse._send("GET", "https://nepse.test/x")).status_code)
+                    except Exception as exc:
+                        outcomes.append(type(exc))
+            return outcomes
+
+        return asyncio.run(run())
+
+    def test_outage_trips_the_breaker_instead_of_waiting_on_timeouts(self):
+        def timeout(request):
+            raise httpx.ConnectTimeout("timed out", request=request)
+
+        outcomes = self._run(timeout, 8)
+
+        self.assertEqual(self.calls, self.nepse.breaker.failure_threshold)
+        self.assertEqual(outcomes[-1], NEPSEUnavailableError)
+
+    def test_throttled_responses_slow_the_client_without_opening_the_circuit(self):
+        outcomes = self._run(lambda request: httpx.Response(429, request=request), 3)
+
+        self.assertEqual(outcomes, [429, 429, 429])
+        self.assertLess(self.nepse.rate_limiter.rate, self.nepse.rate_limiter.max_rate)
+        self.assertFalse(self.nepse.breaker.is_open)
+
+
+if __name__ == "__main__":
+    unittest.main()